@@ -0,0 +1,197 @@
+'''Benchmarking harness.
+
+measure(fn, *args) times fn(*args) with time.perf_counter_ns: a few
+warmup calls, then a calibrated number of calls per sample so every
+sample lasts long enough to time reliably, then repeat samples with the
+garbage collector switched off. The Result keeps every per-call sample
+and summarises them as min/mean/median/percentiles/max/stddev and
+operations per second. Results save to JSON and compare() diffs them
+against a stored baseline:
+
+    results = [measure(zebra_puzzle), measure(best_hand, hand)]
+    save(results, 'bench.json')
+    compare(results, load('baseline.json'), threshold=0.10)
+
+From the command line any function of any module can be timed with
+literal arguments:
+
+    python benchmarks/harness.py poker/poker.py hand_rank \\
+        "['AS','KS','QS','JS','TS']"
+'''
+import argparse
+import ast
+import gc
+import importlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections import namedtuple
+
+Result = namedtuple('Result', 'name number samples stats')
+
+PERCENTILES = (50, 90, 99)
+
+
+def calibrate(fn, args, kwargs, min_sample_ns):
+    """Return how many calls make one sample last at least min_sample_ns,
+    growing the count 1, 2, 5, 10, 20, 50, ... like timeit.autorange."""
+    number = 1
+    while True:
+        for factor in (1, 2, 5):
+            count = number * factor
+            t0 = time.perf_counter_ns()
+            for _ in range(count):
+                fn(*args, **kwargs)
+            if time.perf_counter_ns() - t0 >= min_sample_ns:
+                return count
+        number *= 10
+
+
+def summarize(samples):
+    "Return a dict of summary statistics of per-call times in ns."
+    ordered = sorted(samples)
+    stats = {
+        'min': ordered[0],
+        'mean': statistics.fmean(ordered),
+        'max': ordered[-1],
+        'stddev': statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+    }
+    for p in PERCENTILES:
+        stats['p%d' % p] = percentile(ordered, p)
+    stats['ops_per_sec'] = 1e9 / stats['p50'] if stats['p50'] else 0.0
+    return stats
+
+
+def percentile(ordered, p):
+    "Return the p-th percentile of sorted values, interpolating linearly."
+    position = (len(ordered) - 1) * p / 100.0
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(fn, *args, name=None, warmup=3, repeat=20, number=None,
+            min_sample_ns=10 ** 7, disable_gc=True, **kwargs):
+    """Time fn(*args, **kwargs) and return a Result whose samples are
+    the mean time per call, in ns, of each of repeat samples of number
+    calls. number is calibrated from min_sample_ns if not given."""
+    for _ in range(warmup):
+        fn(*args, **kwargs)
+    if number is None:
+        number = calibrate(fn, args, kwargs, min_sample_ns)
+    enabled = gc.isenabled()
+    if disable_gc:
+        gc.collect()
+        gc.disable()
+    try:
+        samples = []
+        for _ in range(repeat):
+            t0 = time.perf_counter_ns()
+            for _ in range(number):
+                fn(*args, **kwargs)
+            samples.append((time.perf_counter_ns() - t0) / number)
+    finally:
+        if enabled:
+            gc.enable()
+    return Result(name or getattr(fn, '__name__', repr(fn)), number,
+                  samples, summarize(samples))
+
+
+def environment():
+    "Describe the machine and interpreter the results came from."
+    return {'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'system': platform.system()}
+
+
+def save(results, path):
+    "Write results and the environment to a JSON file."
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(),
+                   'results': [r._asdict() for r in results]},
+                  f, indent=2, sort_keys=True)
+
+
+def load(path):
+    "Read results written by save() back as a list of Result tuples."
+    with open(path) as f:
+        return [Result(**r) for r in json.load(f)['results']]
+
+
+def compare(results, baseline, threshold=0.10, statistic='p50',
+            thresholds=None):
+    """Return a list of (name, baseline, current, ratio) for every result
+    whose statistic is more than threshold slower than in baseline.
+    thresholds maps result names to their own threshold."""
+    before = {r.name: r for r in baseline}
+    thresholds = thresholds or {}
+    regressions = []
+    for result in results:
+        if result.name in before:
+            old = before[result.name].stats[statistic]
+            new = result.stats[statistic]
+            limit = thresholds.get(result.name, threshold)
+            if old and new / old > 1 + limit:
+                regressions.append((result.name, old, new, new / old))
+    return regressions
+
+
+def report(results, out=sys.stdout):
+    "Print one line per result."
+    for r in results:
+        s = r.stats
+        out.write('%-30s %12.0f ops/s  p50 %s  p90 %s  p99 %s  '
+                  'sd %s  (%d x %d)\n' % (
+                      r.name, s['ops_per_sec'], format_ns(s['p50']),
+                      format_ns(s['p90']), format_ns(s['p99']),
+                      format_ns(s['stddev']), len(r.samples), r.number))
+
+
+def format_ns(ns):
+    "Format a duration in ns with a readable unit."
+    for unit, scale in (('s', 1e9), ('ms', 1e6), ('us', 1e3)):
+        if ns >= scale:
+            return '%.2f%s' % (ns / scale, unit)
+    return '%.0fns' % ns
+
+
+def load_function(path, name):
+    "Import the module at path (adding its directory to sys.path)."
+    directory, filename = os.path.split(os.path.abspath(path))
+    sys.path.insert(0, directory)
+    module = importlib.import_module(os.path.splitext(filename)[0])
+    return getattr(module, name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time one function.')
+    parser.add_argument('module', help='path to a .py file')
+    parser.add_argument('function')
+    parser.add_argument('args', nargs='*', help='Python literals')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--baseline', help='compare with this file')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    options = parser.parse_args(argv)
+    fn = load_function(options.module, options.function)
+    args = [ast.literal_eval(arg) for arg in options.args]
+    results = [measure(fn, *args, repeat=options.repeat)]
+    report(results)
+    if options.json:
+        save(results, options.json)
+    if options.baseline:
+        regressions = compare(results, load(options.baseline),
+                              options.threshold)
+        for name, old, new, ratio in regressions:
+            print('REGRESSION %s: %s -> %s (%.2fx)' % (
+                name, format_ns(old), format_ns(new), ratio))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,443 @@
+'''Benchmark suite with fixed, seeded workloads.
+
+Every workload builds the same inputs for a given seed and runs them
+through each implementation of one job:
+
+    hand_rank   1,000,000 random 5-card hands
+    best_hand     100,000 random 7-card hands
+    wild            2,000 7-card hands holding one or two jokers
+    showdown       10,000 tables of six 5-card hands
+    omaha           2,000 Omaha boards with six players
+    deal          100,000 deals of six 5-card hands
+    zebra              20 solves of the zebra puzzle
+
+The suite reports items per second and peak traced memory for each
+implementation, saves the results as JSON and fails if any result is
+slower than a baseline by more than its threshold. --check instead runs
+every implementation on the workload inputs and compares its answers
+with the reference implementations in poker.py (and the original
+generator-expression zebra_puzzle):
+
+    python benchmarks/suite.py --json baseline.json
+    python benchmarks/suite.py --baseline baseline.json --threshold 0.05
+    python benchmarks/suite.py --check --scale 0.1 hand_rank wild
+'''
+import argparse
+import itertools
+import os
+import random
+import sys
+import tracemalloc
+from collections import namedtuple
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+for directory in ('poker', 'zebra_puzzle'):
+    sys.path.insert(0, os.path.join(os.path.dirname(HERE), directory))
+
+import harness  # noqa: E402
+import bitset  # noqa: E402
+import get_best_hand  # noqa: E402
+import hand_cache  # noqa: E402
+import hand_lookup  # noqa: E402
+import omaha  # noqa: E402
+import poker  # noqa: E402
+import puzzle  # noqa: E402
+import replace_wild_cards  # noqa: E402
+from cards import DECK  # noqa: E402
+
+try:
+    import batch
+except ImportError:  # NumPy is not installed
+    batch = None
+
+Workload = namedtuple('Workload', 'name size make reference implementations')
+
+# An implementation is (name, prepare, run, normalize): prepare(inputs)
+# converts the inputs outside the timed region, run(prepared) is timed,
+# and normalize(output, inputs) turns its output into the reference form.
+Implementation = namedtuple('Implementation', 'name prepare run normalize')
+
+# Regression thresholds of the noisier workloads, as a fraction of the
+# baseline time; the others use --threshold.
+THRESHOLDS = {'deal': 0.20, 'zebra': 0.25}
+
+
+def same(inputs):
+    return inputs
+
+
+def as_is(output, inputs):
+    return output
+
+
+def implementation(name, run, normalize=as_is, prepare=same):
+    return Implementation(name, prepare, run, normalize)
+
+
+def ranks_of(output, inputs):
+    "Normalize a list of hands to their poker.hand_rank tuples."
+    return [poker.hand_rank(hand) for hand in output]
+
+
+def classes_of(output, inputs):
+    "Normalize an array of hand_lookup scores to hand_rank tuples."
+    return [hand_lookup.rank_tuple(score) for score in output.tolist()]
+
+
+def reference_best_hand(hand):
+    return max(itertools.combinations(hand, 5), key=poker.hand_rank)
+
+
+# hand_rank: 5-card hands
+
+def make_hands(n):
+    def make(size, rng):
+        return [rng.sample(DECK, n) for _ in range(size)]
+    return make
+
+
+def hand_rank_reference(hands):
+    return [poker.hand_rank(hand) for hand in hands]
+
+
+def mapper(fn):
+    "Return run(inputs) applying fn to every input."
+    def run(inputs):
+        return [fn(item) for item in inputs]
+    run.__name__ = getattr(fn, '__name__', 'run')
+    return run
+
+
+# The cache implementations are timed warm, as a long-running process
+# would see them: the warmup run fills the cache.
+HAND_RANK = [
+    implementation('poker', mapper(poker.hand_rank)),
+    implementation('lookup', mapper(hand_lookup.hand_rank)),
+    implementation('cache', mapper(hand_cache.hand_rank)),
+]
+
+# best_hand: 7-card hands
+
+BEST_HAND = [
+    implementation('combinations',
+                   mapper(get_best_hand.best_hand_combinations), ranks_of),
+    implementation('seven_card', mapper(get_best_hand.best_hand), ranks_of),
+    implementation('cache', mapper(hand_cache.best_hand), ranks_of),
+]
+
+if batch is not None:
+    HAND_RANK.append(implementation('batch', batch.evaluate, classes_of,
+                                    batch.encode))
+    BEST_HAND.append(implementation('batch', batch.evaluate, classes_of,
+                                    batch.encode))
+
+
+def best_hand_reference(hands):
+    return [poker.hand_rank(reference_best_hand(hand)) for hand in hands]
+
+
+# wild: best_wild_hand on 7-card hands with jokers
+
+def make_wild(size, rng):
+    "Deal 5 or 6 cards and make up 7 cards with '?B' and '?R' jokers."
+    hands = []
+    for _ in range(size):
+        jokers = 1 if rng.random() < 0.7 else 2
+        hand = rng.sample(DECK, 7 - jokers)
+        hand += rng.sample(['?B', '?R'] * 2, jokers)
+        rng.shuffle(hand)
+        hands.append(hand)
+    return hands
+
+
+def wild_reference(hands):
+    "Try every distinct substitution of the jokers with poker.hand_rank."
+    result = []
+    for hand in hands:
+        fixed = [card for card in hand if card not in replace_wild_cards.cards]
+        wild = [replace_wild_cards.cards[card] for card in hand
+                if card in replace_wild_cards.cards]
+        best = max((reference_best_hand(fixed + list(chosen))
+                    for chosen in itertools.product(*wild)
+                    if len(set(fixed + list(chosen))) == len(hand)),
+                   key=poker.hand_rank)
+        result.append(poker.hand_rank(best))
+    return result
+
+
+# 'substitution' is the teacher's solution, which tries every joker card.
+WILD = [
+    implementation('categories', mapper(replace_wild_cards.best_wild_hand),
+                   ranks_of),
+    implementation('substitution',
+                   mapper(replace_wild_cards.best_wild_hand_teacher),
+                   ranks_of),
+    implementation('cache', mapper(hand_cache.best_wild_hand), ranks_of),
+]
+
+# showdown: poker() over many tables
+
+
+def make_tables(size, rng):
+    return [poker.deal(6, 5, rng=rng) for _ in range(size)]
+
+
+def winner_indices(output, inputs):
+    "Normalize the winning hands of every table to their positions."
+    return [[table.index(hand) for hand in hands]
+            for hands, table in zip(output, inputs)]
+
+
+def showdown_reference(tables):
+    return winner_indices([poker.poker(table) for table in tables], tables)
+
+
+SHOWDOWN = [
+    implementation('poker', mapper(poker.poker), winner_indices),
+    implementation('lookup', mapper(hand_lookup.poker), winner_indices),
+]
+
+if batch is not None:
+    SHOWDOWN.append(implementation(
+        'batch', batch.poker,
+        lambda output, inputs: [row.tolist() for row in output],
+        lambda tables: batch.encode(
+            [hand for table in tables for hand in table]).reshape(
+                len(tables), 6, 5)))
+
+# omaha: six players with four hole cards on a five-card board
+
+
+def make_omaha(size, rng):
+    tables = []
+    for _ in range(size):
+        cards = rng.sample(DECK, 29)
+        tables.append((cards[:5], [cards[5 + 4 * i:9 + 4 * i]
+                                   for i in range(6)]))
+    return tables
+
+
+def omaha_reference(tables):
+    "Rank all 60 hands of two hole and three board cards of every player."
+    result = []
+    for board, holes in tables:
+        ranks = [max(poker.hand_rank(list(two) + list(three))
+                     for two in itertools.combinations(hole, 2)
+                     for three in itertools.combinations(board, 3))
+                 for hole in holes]
+        result.append(poker.winners(ranks, indices=True)[2])
+    return result
+
+
+OMAHA = [implementation('parts', lambda tables: [
+    omaha.showdown(board, holes) for board, holes in tables])]
+
+# deal: six hands of five cards per deal
+
+
+def make_deals(size, rng):
+    return size, rng.randrange(2 ** 32)
+
+
+def deal_reference(inputs):
+    return [True] * inputs[0]
+
+
+def valid_deals(output, inputs):
+    "Normalize each deal to whether it holds 30 distinct cards."
+    return [len(set(card for hand in deal for card in hand)) == 30
+            for deal in output]
+
+
+def deal_poker(inputs):
+    count, seed = inputs
+    rng = random.Random(seed)
+    return [poker.deal(6, 5, rng=rng) for _ in range(count)]
+
+
+DEAL = [implementation('poker', deal_poker, valid_deals)]
+
+if batch is not None:
+    DEAL.append(implementation(
+        'batch', lambda inputs: batch.deal(inputs[0], 6, 5, rng=inputs[1]),
+        lambda output, inputs: valid_deals(output.tolist(), inputs)))
+
+# zebra: solve the puzzle repeatedly
+
+
+def make_zebra(size, rng):
+    return size
+
+
+def zebra_reference(count):
+    return [puzzle.zebra_puzzle() for _ in range(count)]
+
+
+def zebra_bitset():
+    solution = bitset.solve(puzzle.ZEBRA)
+    return solution['WATER'], solution['ZEBRA']
+
+
+def repeat(fn):
+    "Return run(count) calling fn() count times."
+    def run(count):
+        return [fn() for _ in range(count)]
+    return run
+
+
+ZEBRA = [
+    implementation('generator', repeat(puzzle.zebra_puzzle)),
+    implementation('csp', repeat(puzzle.zebra_puzzle_csp)),
+    implementation('bitset', repeat(zebra_bitset)),
+]
+
+WORKLOADS = [
+    Workload('hand_rank', 1000000, make_hands(5), hand_rank_reference,
+             HAND_RANK),
+    Workload('best_hand', 100000, make_hands(7), best_hand_reference,
+             BEST_HAND),
+    Workload('wild', 2000, make_wild, wild_reference, WILD),
+    Workload('showdown', 10000, make_tables, showdown_reference, SHOWDOWN),
+    Workload('omaha', 2000, make_omaha, omaha_reference, OMAHA),
+    Workload('deal', 100000, make_deals, deal_reference, DEAL),
+    Workload('zebra', 20, make_zebra, zebra_reference, ZEBRA),
+]
+
+
+def inputs_for(workload, scale, seed):
+    "Return (items, inputs) of a workload for a scale and seed."
+    items = max(1, int(workload.size * scale))
+    rng = random.Random('%s:%d' % (workload.name, seed))
+    return items, workload.make(items, rng)
+
+
+def peak_memory(fn, *args):
+    "Return the peak traced memory, in bytes, of one call of fn(*args)."
+    tracemalloc.start()
+    try:
+        fn(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run(workloads, scale=1.0, seed=0, repeat=5, warmup=1):
+    """Time every implementation of the workloads and return a list of
+    harness.Result, named 'workload/implementation', whose stats also
+    hold items_per_sec and peak_bytes."""
+    results = []
+    for workload in workloads:
+        items, inputs = inputs_for(workload, scale, seed)
+        for impl in workload.implementations:
+            prepared = impl.prepare(inputs)
+            result = harness.measure(
+                impl.run, prepared, name='%s/%s' % (workload.name, impl.name),
+                warmup=warmup, repeat=repeat, number=1)
+            result.stats['items'] = items
+            result.stats['items_per_sec'] = items * 1e9 / result.stats['p50']
+            result.stats['peak_bytes'] = peak_memory(impl.run, prepared)
+            results.append(result)
+    return results
+
+
+def check(workloads, scale=1.0, seed=0):
+    """Compare every implementation with the reference on the workload
+    inputs. Return a list of (name, mismatches, items, first mismatch),
+    where first mismatch is (input, expected, got) or None."""
+    report = []
+    for workload in workloads:
+        items, inputs = inputs_for(workload, scale, seed)
+        expected = workload.reference(inputs)
+        for impl in workload.implementations:
+            got = impl.normalize(impl.run(impl.prepare(inputs)), inputs)
+            bad = [i for i, (a, b) in enumerate(zip(expected, got)) if a != b]
+            if len(got) != len(expected):
+                bad.append(min(len(got), len(expected)))
+            first = None
+            if bad:
+                i = bad[0]
+                first = (inputs[i] if isinstance(inputs, list) else inputs,
+                         expected[i] if i < len(expected) else None,
+                         got[i] if i < len(got) else None)
+            report.append(('%s/%s' % (workload.name, impl.name), len(bad),
+                           items, first))
+    return report
+
+
+def thresholds_for(results, overrides, default):
+    "Map result names to the threshold of their workload."
+    limits = dict(THRESHOLDS, **overrides)
+    return {r.name: limits.get(r.name, limits.get(r.name.split('/')[0],
+                                                   default))
+            for r in results}
+
+
+def print_results(results, out=sys.stdout):
+    for r in results:
+        s = r.stats
+        out.write('%-22s %14.0f items/s  p50 %-9s sd %-9s peak %8.1f KiB\n'
+                  % (r.name, s['items_per_sec'], harness.format_ns(s['p50']),
+                     harness.format_ns(s['stddev']), s['peak_bytes'] / 1024.))
+
+
+def threshold_option(text):
+    name, _, value = text.partition('=')
+    return name, float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite.')
+    parser.add_argument('workloads', nargs='*',
+                        help='workload names (default: all)')
+    parser.add_argument('--scale', type=float,
+                        help='fraction of every workload size '
+                        '(default 1, or 0.1 with --check)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--check', action='store_true',
+                        help='compare answers with the reference instead')
+    parser.add_argument('--json', help='write results to this file')
+    parser.add_argument('--baseline', help='compare with this file')
+    parser.add_argument('--threshold', type=float, default=0.10)
+    parser.add_argument('--threshold-for', type=threshold_option,
+                        action='append', default=[], metavar='NAME=FRACTION',
+                        help='threshold of one workload or result')
+    options = parser.parse_args(argv)
+    names = {w.name: w for w in WORKLOADS}
+    unknown = [name for name in options.workloads if name not in names]
+    if unknown:
+        parser.error('unknown workloads: %s (choose from %s)'
+                     % (', '.join(unknown), ', '.join(names)))
+    workloads = [names[name] for name in options.workloads] or WORKLOADS
+    if options.check:
+        scale = 0.1 if options.scale is None else options.scale
+        failed = 0
+        for name, mismatches, items, first in check(workloads, scale,
+                                                    options.seed):
+            print('%-22s %s' % (name, 'ok' if not mismatches else
+                                '%d of %d differ, first %r'
+                                % (mismatches, items, first)))
+            failed += bool(mismatches)
+        return 1 if failed else 0
+    scale = 1.0 if options.scale is None else options.scale
+    results = run(workloads, scale, options.seed, options.repeat,
+                  options.warmup)
+    print_results(results)
+    if options.json:
+        harness.save(results, options.json)
+    if options.baseline:
+        limits = thresholds_for(results, dict(options.threshold_for),
+                                options.threshold)
+        regressions = harness.compare(results, harness.load(options.baseline),
+                                      options.threshold, thresholds=limits)
+        for name, old, new, ratio in regressions:
+            print('REGRESSION %s: %s -> %s (%.2fx, limit %.2fx)' % (
+                name, harness.format_ns(old), harness.format_ns(new), ratio,
+                1 + limits[name]))
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
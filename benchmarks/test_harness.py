@@ -0,0 +1,40 @@
+import os
+import tempfile
+import unittest
+import harness
+
+
+class TestHarness(unittest.TestCase):
+    '''Test measure(), summaries and baseline comparison.'''
+
+    def test_measure(self):
+        '''Test a fixed number of calls gives one sample per repeat'''
+        calls = []
+        result = harness.measure(calls.append, 1, warmup=2, repeat=5,
+                                 number=3)
+        self.assertEqual(len(calls), 2 + 5 * 3)
+        self.assertEqual(result.name, 'append')
+        self.assertEqual(len(result.samples), 5)
+        self.assertTrue(result.stats['min'] <= result.stats['p50']
+                        <= result.stats['p99'] <= result.stats['max'])
+
+    def test_percentile(self):
+        '''Test linear interpolation between samples'''
+        self.assertEqual(harness.percentile([1, 2, 3, 4, 5], 50), 3)
+        self.assertEqual(harness.percentile([0, 10], 90), 9)
+
+    def test_compare(self):
+        '''Test a saved baseline flags slower results only'''
+        fast = harness.Result('f', 1, [1.0], harness.summarize([100.0]))
+        slow = harness.Result('f', 1, [1.0], harness.summarize([150.0]))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'baseline.json')
+            harness.save([fast], path)
+            baseline = harness.load(path)
+        self.assertEqual(harness.compare([fast], baseline), [])
+        self.assertEqual(harness.compare([slow], baseline),
+                         [('f', 100.0, 150.0, 1.5)])
+
+
+if __name__ == '__main__':
+    unittest.main()
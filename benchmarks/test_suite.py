@@ -0,0 +1,43 @@
+import unittest
+import suite
+
+
+class TestSuite(unittest.TestCase):
+    '''Test the workloads on a small scale.'''
+
+    def test_check(self):
+        '''Test every implementation agrees with the reference'''
+        for name, mismatches, items, first in suite.check(suite.WORKLOADS,
+                                                          scale=0.001):
+            self.assertEqual(mismatches, 0, (name, first))
+
+    def test_seeded_inputs(self):
+        '''Test the same seed builds the same inputs'''
+        workload = suite.WORKLOADS[0]
+        self.assertEqual(suite.inputs_for(workload, 0.0001, 7),
+                         suite.inputs_for(workload, 0.0001, 7))
+        self.assertNotEqual(suite.inputs_for(workload, 0.0001, 7),
+                            suite.inputs_for(workload, 0.0001, 8))
+
+    def test_run(self):
+        '''Test results carry throughput and memory'''
+        zebra = [w for w in suite.WORKLOADS if w.name == 'zebra']
+        results = suite.run(zebra, scale=0.05, repeat=2, warmup=0)
+        self.assertEqual([r.name for r in results],
+                         ['zebra/generator', 'zebra/csp', 'zebra/bitset'])
+        for r in results:
+            self.assertEqual(r.stats['items'], 1)
+            self.assertGreater(r.stats['items_per_sec'], 0)
+            self.assertGreater(r.stats['peak_bytes'], 0)
+
+    def test_thresholds(self):
+        '''Test per-workload thresholds and overrides'''
+        results = suite.run([suite.WORKLOADS[-1]], scale=0.05, repeat=1,
+                            warmup=0)
+        limits = suite.thresholds_for(results, {'zebra/csp': 0.5}, 0.1)
+        self.assertEqual(limits['zebra/csp'], 0.5)
+        self.assertEqual(limits['zebra/bitset'], suite.THRESHOLDS['zebra'])
+
+
+if __name__ == '__main__':
+    unittest.main()
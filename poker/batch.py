@@ -0,0 +1,157 @@
+'''Vectorized evaluation of many hands at once with NumPy.
+
+Cards are the integer ids 0-51 defined in the cards module, and a batch
+is an (N, k) integer array with 5 <= k <= 7. Rank histograms and
+per-suit rank masks are computed for the whole batch with array
+operations, the best category and kickers are packed into a sortable
+key, and the keys are mapped onto hand_lookup scores, so batch scores are
+interchangeable with hand_lookup.evaluate and seven_card.evaluate.
+'''
+import numpy as np
+
+from cards import DECK, parse
+from hand_lookup import CLASSES, CLASS_RANKS
+from seven_card import POPCOUNT, STRAIGHT, WHEEL, top_ranks
+
+CHUNK = 1 << 18  # hands per vectorized pass, to bound temporary memory
+
+
+def pack_ranks(ranks):
+    "Pack rank indices into left-aligned nibbles of a 20-bit key."
+    return sum(r << (16 - 4 * i) for i, r in enumerate(ranks))
+
+
+def class_key(score):
+    "Return the packed (category, ranks) key of a hand_lookup score."
+    category = CLASSES[score][0]
+    ranks, is_flush = CLASS_RANKS[score]
+    if category in (8, 4):
+        mask = sum(1 << r for r in ranks)
+        high = 3 if mask == WHEEL else max(ranks)
+        return category << 20 | high << 16
+    ordered = sorted(set(ranks), key=lambda r: (ranks.count(r), r),
+                     reverse=True)
+    return category << 20 | pack_ranks(ordered)
+
+
+KEYS = np.array([class_key(score) for score in range(len(CLASSES))],
+                dtype=np.int64)
+POPCOUNTS = np.array(POPCOUNT, dtype=np.int64)
+STRAIGHTS = np.array(STRAIGHT, dtype=np.int64)
+TOP = {n: np.array([pack_ranks(top_ranks(mask, n)) >> (4 * (5 - n))
+                    for mask in range(1 << 13)], dtype=np.int64)
+       for n in (1, 2, 3, 5)}
+
+
+def encode(hands):
+    "Encode a list of hands of cards in either form as an (N, k) array."
+    return np.array([parse(hand) for hand in hands], dtype=np.int8)
+
+
+def decode(cards):
+    "Decode an (N, k) array of card ids back to lists of 'RS' strings."
+    return [[DECK[c] for c in row] for row in np.asarray(cards).tolist()]
+
+
+def evaluate(cards):
+    """Return an N-length array of scores for an (N, k) array of card ids,
+    5 <= k <= 7; each score is the best 5-card hand within its row."""
+    cards = np.asarray(cards)
+    if cards.ndim != 2 or not 5 <= cards.shape[1] <= 7:
+        raise ValueError('expected an (N, 5..7) array of card ids')
+    scores = np.empty(len(cards), dtype=np.int64)
+    for start in range(0, len(cards), CHUNK):
+        stop = start + CHUNK
+        scores[start:stop] = np.searchsorted(KEYS, keys(cards[start:stop]))
+    return scores
+
+
+def keys(cards):
+    "Return the packed category keys of an (N, k) array of card ids."
+    cards = cards.astype(np.int64)
+    n = len(cards)
+    ranks, suits = cards >> 2, cards & 3
+    counts = np.bincount(
+        (ranks + 13 * np.arange(n)[:, None]).ravel(),
+        minlength=13 * n).reshape(n, 13)
+    bits = 1 << ranks
+    masks = np.stack(
+        [np.where(suits == j, bits, 0).sum(axis=1) for j in range(4)],
+        axis=1)
+    rank_mask = masks[:, 0] | masks[:, 1] | masks[:, 2] | masks[:, 3]
+
+    suit_counts = POPCOUNTS[masks]
+    has_flush = suit_counts.max(axis=1) >= 5
+    flush_mask = masks[np.arange(n), suit_counts.argmax(axis=1)]
+    flush_high = np.where(has_flush, STRAIGHTS[flush_mask], -1)
+    high = STRAIGHTS[rank_mask]
+
+    # Ranks ordered by (count, rank), highest first.
+    groups = np.sort(counts * 16 + np.arange(13), axis=1)
+    most, first = groups[:, -1] >> 4, groups[:, -1] & 15
+    second, other = groups[:, -2] >> 4, groups[:, -2] & 15
+    without_first = rank_mask & ~(1 << first)
+    without_both = without_first & ~(1 << other)
+
+    conditions = [
+        flush_high >= 0,
+        most == 4,
+        (most == 3) & (second >= 2),
+        has_flush,
+        high >= 0,
+        most == 3,
+        (most == 2) & (second == 2),
+        most == 2,
+    ]
+    choices = [
+        8 << 20 | flush_high << 16,
+        7 << 20 | first << 16 | TOP[1][without_first] << 12,
+        6 << 20 | first << 16 | other << 12,
+        5 << 20 | TOP[5][flush_mask],
+        4 << 20 | high << 16,
+        3 << 20 | first << 16 | TOP[2][without_first] << 8,
+        2 << 20 | first << 16 | other << 12 | TOP[1][without_both] << 8,
+        1 << 20 | first << 16 | TOP[3][without_first] << 4,
+    ]
+    return np.select(conditions, choices, default=TOP[5][rank_mask])
+
+
+def winners(scores):
+    "Return a boolean mask of the maximum scores along the last axis."
+    scores = np.asarray(scores)
+    return scores == scores.max(axis=-1, keepdims=True)
+
+
+def poker(tables):
+    """Batched poker(): given a (T, P, k) array of T tables of P hands,
+    return a list holding the winning hand indices of each table."""
+    tables = np.asarray(tables)
+    t, p, k = tables.shape
+    mask = winners(evaluate(tables.reshape(t * p, k)).reshape(t, p))
+    return [np.flatnonzero(row) for row in mask]
+
+
+def deal(k, numhands, n=5, deck=None, out=None, rng=None):
+    """Deal k independent deals of numhands hands of n cards at once.
+
+    Each deal is a Fisher-Yates shuffle of deck (all 52 card ids by
+    default) stopped after numhands * n swaps, run for all k deals in
+    lockstep. The result is written to out, a preallocated integer array
+    of shape (k, numhands, n), or to a new int8 array. rng is a
+    numpy.random.Generator or a seed; nothing outside is modified."""
+    rng = np.random.default_rng(rng)
+    deck = np.arange(52, dtype=np.int8) if deck is None else np.asarray(deck)
+    size, m = len(deck), numhands * n
+    if m > size:
+        raise ValueError('cannot deal %d cards from %d' % (m, size))
+    decks = np.tile(deck, (k, 1))
+    rows = np.arange(k)
+    for i in range(m):
+        j = rng.integers(i, size, size=k)
+        picked = decks[rows, j]
+        decks[rows, j] = decks[:, i]
+        decks[:, i] = picked
+    if out is None:
+        out = np.empty((k, numhands, n), dtype=decks.dtype)
+    out[...] = decks[:, :m].reshape(k, numhands, n)
+    return out
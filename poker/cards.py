@@ -0,0 +1,65 @@
+'''Compact card representations shared by the poker modules.
+
+A card is either the usual two-character 'RS' string ('AS', 'TD', ...)
+or an integer id 0-51 equal to 4 * rank + suit, with ranks in
+'23456789TJQKA' order and suits in 'SHDC' order, so DECK[id] is the
+string form and DECK is the order poker.deal builds its deck in. A whole
+hand can also be stored as a 52-bit mask with bit id set for each card.
+
+The *_OF tables are keyed by both forms, so evaluators can accept either
+without branching in their inner loops.
+'''
+RANKS = '23456789TJQKA'
+SUITS = 'SHDC'
+DECK = [r + s for r in RANKS for s in SUITS]
+CARD_ID = {card: i for i, card in enumerate(DECK)}
+
+# Rank index (0 = deuce, 12 = ace) and suit index of each card, keyed by
+# both the string and the integer form.
+RANK_OF = {}
+SUIT_OF = {}
+for _i, _card in enumerate(DECK):
+    RANK_OF[_card] = RANK_OF[_i] = _i >> 2
+    SUIT_OF[_card] = SUIT_OF[_i] = _i & 3
+del _i, _card
+
+
+def card_id(card):
+    "Return the integer id of a card given in either form."
+    return card if type(card) is int else CARD_ID[card]
+
+
+def card_str(card):
+    "Return the 'RS' string of a card given in either form."
+    return DECK[card] if type(card) is int else card
+
+
+def parse(hand):
+    """Return a list of card ids from a list of cards in either form or
+    a space-separated string such as 'AS KS QS'."""
+    if isinstance(hand, str):
+        hand = hand.split()
+    return [card if type(card) is int else CARD_ID[card] for card in hand]
+
+
+def to_strings(hand):
+    "Return a list of 'RS' strings from a list of cards in either form."
+    return [DECK[card] if type(card) is int else card for card in hand]
+
+
+def to_mask(hand):
+    "Return the 52-bit mask of a list of cards in either form."
+    mask = 0
+    for card in hand:
+        mask |= 1 << (card if type(card) is int else CARD_ID[card])
+    return mask
+
+
+def from_mask(mask):
+    "Return the list of card ids set in a 52-bit mask, lowest first."
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
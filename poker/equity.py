@@ -0,0 +1,114 @@
+'''Monte Carlo equity simulator.
+
+equity() takes the known hole cards of every player and an optional
+partial board, completes the deal from the rest of the deck over and over
+again and reports how often each player wins, ties and loses. Trials are
+split into chunks that run across a process pool; every chunk draws from
+its own random.Random seeded from (seed, chunk number), so a run is
+reproducible for a given seed whatever the number of workers.
+'''
+import math
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import parse
+from incremental import board_profile, board_scores
+from poker import winners
+
+Equity = namedtuple('Equity', 'trials win tie loss equity low high')
+
+Z = 1.96  # 95% confidence
+
+
+def simulate(holes, board, trials, seed, dead=()):
+    """Run trials deals and return a list of per-player tallies
+    [wins, ties, share, share squared], where share is the fraction of
+    the pot won (1/k when k players tie). dead cards are never dealt."""
+    rng = random.Random(seed)
+    known = set(board).union(dead, *holes)
+    deck = [card for card in range(52) if card not in known]
+    needed = 5 - len(board)
+    tallies = [[0, 0, 0.0, 0.0] for _ in holes]
+    for _ in range(trials):
+        full_board = board + rng.sample(deck, needed)
+        scores = board_scores(board_profile(full_board), holes)
+        positions = winners(scores, indices=True)[2]
+        share = 1.0 / len(positions)
+        for i in positions:
+            tally = tallies[i]
+            tally[0 if share == 1.0 else 1] += 1
+            tally[2] += share
+            tally[3] += share * share
+    return tallies
+
+
+def summarize(tallies, trials):
+    "Turn per-player tallies into a list of Equity tuples."
+    result = []
+    for wins, ties, share, squares in tallies:
+        mean = share / trials
+        variance = max(squares / trials - mean * mean, 0.0)
+        error = Z * math.sqrt(variance / trials)
+        result.append(Equity(trials, wins / trials, ties / trials,
+                             (trials - wins - ties) / trials, mean,
+                             mean - error, mean + error))
+    return result
+
+
+def merge(total, tallies):
+    "Add one chunk's tallies into the running totals."
+    for player, tally in zip(total, tallies):
+        for i, value in enumerate(tally):
+            player[i] += value
+
+
+def equity(holes, board=(), trials=100000, workers=None, seed=None,
+           precision=None, chunk=5000):
+    """Estimate each player's equity by dealing out the board trials times.
+
+    holes is a list of hands (lists or strings of cards in either form)
+    and board the cards already dealt. workers is the size of the process
+    pool (None means one per core, 1 runs in this process). If precision
+    is given, chunks are run until every player's 95% confidence interval
+    is no wider than +/- precision, with trials as the upper limit.
+    Returns one Equity tuple per player."""
+    holes = [parse(hole) for hole in holes]
+    board = parse(board)
+    cards = board + [card for hole in holes for card in hole]
+    if len(set(cards)) != len(cards):
+        raise ValueError('duplicate cards in %r' % cards)
+    if len(board) > 5:
+        raise ValueError('a board has at most 5 cards')
+    if trials < 1 or chunk < 1:
+        raise ValueError('trials and chunk must be at least 1')
+    if seed is None:
+        seed = random.randrange(1 << 63)
+    sizes = [min(chunk, trials - start) for start in range(0, trials, chunk)]
+    seeds = ['%s:%d' % (seed, i) for i in range(len(sizes))]
+    total = [[0, 0, 0.0, 0.0] for _ in holes]
+    done = 0
+
+    def run(mapper):
+        nonlocal done
+        step = (len(sizes) if precision is None
+                else workers or os.cpu_count() or 1)
+        for start in range(0, len(sizes), step):
+            results = mapper(simulate, [holes] * step, [board] * step,
+                             sizes[start:start + step],
+                             seeds[start:start + step])
+            for size, tallies in zip(sizes[start:start + step], results):
+                merge(total, tallies)
+                done += size
+            if precision is not None and all(
+                    (e.high - e.equity) <= precision
+                    for e in summarize(total, done)):
+                return
+
+    if workers == 1:
+        run(map)
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            run(executor.map)
+    return summarize(total, done)
@@ -0,0 +1,162 @@
+'''Hand evaluators behind one interface, with a backend registry.
+
+Every backend provides
+
+    hand_rank(hand)     the poker.hand_rank tuple of a 5-card hand
+    best_hand(hand)     the best 5 cards of a 5 to 7 card hand, as a list
+    hand_ranks(hands)   hand_rank of many hands of 5 to 7 cards at once
+                        (of their best 5 cards)
+
+and the module-level functions of the same names call the selected
+backend. Registered backends, fastest first:
+
+    vectorized   NumPy batches (batch.py); single hands as 'lookup'
+    lookup       prime-product tables (hand_lookup.py, seven_card.py)
+    reference    poker.hand_rank and all 5-card combinations
+
+and 'table' (rank_table.py) once its file has been built; it looks up
+batches of 5-card hands fastest but single hands slower than 'lookup',
+so it is only used when asked for.
+
+The fastest available backend is used unless the POKER_BACKEND
+environment variable or use() names another. use(name, verify=other),
+or POKER_VERIFY=other, runs a second backend next to the selected one on
+every call and raises AssertionError as soon as they disagree.
+'''
+import itertools
+import os
+from collections import namedtuple
+
+import hand_lookup
+import poker
+import rank_table
+import seven_card
+
+try:
+    import batch
+except ImportError:  # NumPy is not installed
+    batch = None
+
+Backend = namedtuple('Backend', 'name hand_rank best_hand hand_ranks')
+
+BACKENDS = {}
+PREFERENCE = []  # backend names, fastest first
+
+
+def register(backend, fastest=False):
+    "Add a Backend to the registry, as the fastest one if fastest is set."
+    BACKENDS[backend.name] = backend
+    if backend.name in PREFERENCE:
+        PREFERENCE.remove(backend.name)
+    PREFERENCE.insert(0 if fastest else len(PREFERENCE), backend.name)
+
+
+def reference_best_hand(hand):
+    "Best 5 of the hand's cards by trying every combination, as a list."
+    return list(max(itertools.combinations(hand, 5), key=poker.hand_rank))
+
+
+def reference_hand_ranks(hands):
+    "hand_rank of the best 5 cards of every hand, by brute force."
+    return [poker.hand_rank(reference_best_hand(hand)) for hand in hands]
+
+
+def lookup_hand_ranks(hands):
+    "hand_rank of the best 5 cards of every hand, one at a time."
+    return [hand_lookup.CLASSES[seven_card.evaluate(hand)] for hand in hands]
+
+
+def vectorized_hand_ranks(hands):
+    "hand_rank of the best 5 cards of every hand, in NumPy batches."
+    if not len(hands):
+        return []
+    classes = hand_lookup.CLASSES
+    return [classes[score]
+            for score in batch.evaluate(batch.encode(hands)).tolist()]
+
+
+if batch is not None:
+    register(Backend('vectorized', hand_lookup.hand_rank,
+                     seven_card.best_hand, vectorized_hand_ranks))
+register(Backend('lookup', hand_lookup.hand_rank, seven_card.best_hand,
+                 lookup_hand_ranks))
+register(Backend('reference', poker.hand_rank, reference_best_hand,
+                 reference_hand_ranks))
+if os.path.exists(rank_table.TABLE_PATH):  # mapped on first use
+    register(Backend('table', rank_table.hand_rank, rank_table.best_hand,
+                     rank_table.hand_ranks))
+
+
+def verified(backend, check):
+    """Return a Backend that runs backend and check side by side and
+    raises AssertionError when their hand ranks differ."""
+    def compare(what, hand, got, expected):
+        if got != expected:
+            raise AssertionError('%s and %s disagree on %s of %r: %r != %r'
+                                 % (backend.name, check.name, what, hand,
+                                    got, expected))
+
+    def hand_rank(hand):
+        result = backend.hand_rank(hand)
+        compare('hand_rank', hand, result, check.hand_rank(hand))
+        return result
+
+    def best_hand(hand):
+        # Equal hands may be made of different cards, so compare ranks.
+        result = backend.best_hand(hand)
+        compare('best_hand', hand, poker.hand_rank(result),
+                poker.hand_rank(check.best_hand(hand)))
+        return result
+
+    def hand_ranks(hands):
+        result = backend.hand_ranks(hands)
+        for hand, got, expected in zip(hands, result,
+                                       check.hand_ranks(hands)):
+            compare('hand_ranks', hand, got, expected)
+        return result
+
+    return Backend('%s+%s' % (backend.name, check.name), hand_rank,
+                   best_hand, hand_ranks)
+
+
+_backend = None
+
+
+def use(name=None, verify=None):
+    """Select a backend by name (None for the fastest available), checked
+    against the verify backend if given. Return the Backend in use."""
+    global _backend
+    name = name or PREFERENCE[0]
+    for wanted in (name, verify):
+        if wanted is not None and wanted not in BACKENDS:
+            raise ValueError('unknown evaluator backend %r (choose from %s)'
+                             % (wanted, ', '.join(PREFERENCE)))
+    backend = BACKENDS[name]
+    if verify is not None:
+        backend = verified(backend, BACKENDS[verify])
+    _backend = backend
+    return backend
+
+
+def current():
+    "Return the Backend in use."
+    return _backend
+
+
+def hand_rank(hand):
+    "Return a value indicating the ranking of a hand."
+    return _backend.hand_rank(hand)
+
+
+def best_hand(hand):
+    "From a 5 to 7 card hand, return the best 5 card hand."
+    return _backend.best_hand(hand)
+
+
+def hand_ranks(hands):
+    "Return the hand_rank of the best 5 cards of each of many hands."
+    return _backend.hand_ranks(hands)
+
+
+use(os.environ.get('POKER_BACKEND') or None,
+    os.environ.get('POKER_VERIFY') or None)
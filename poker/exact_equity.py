@@ -0,0 +1,221 @@
+'''Exact equity by exhaustive enumeration, and a preflop lookup table.
+
+enumerate_equity() walks every possible completion of the board, scoring
+each player's best 5 of 7 cards as get_best_hand.best_hand would. Boards
+that are the same up to a relabelling of suits that leaves every
+player's hole cards (and the known board) unchanged are only evaluated
+once and counted with their multiplicity.
+
+Preflop heads-up spots take minutes each to enumerate, so
+build_preflop_table() enumerates all 169 x 169 starting-hand classes once
+and writes the equities as 16-bit fixed point numbers to a small binary
+file. preflop_equity() memory-maps that file on first use, which makes
+the exact equity of one class against another a single lookup. To build
+the table run
+
+    python exact_equity.py [path]
+'''
+import itertools
+import os
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import RANKS, parse
+from equity import Equity
+from incremental import board_profile, board_scores
+from mapped_table import MappedTable
+from poker import winners
+
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'preflop_equity.bin')
+MAGIC = b'PFEQ'
+HEADER = struct.Struct('<4sH')
+SCALE = 65535
+
+
+def relabel(cards, perm):
+    "Return the cards with every suit j replaced by perm[j]."
+    return [card & ~3 | perm[card & 3] for card in cards]
+
+
+def stabilizer(groups):
+    """Return the suit permutations that map every group of cards (each
+    player's hole cards, the board, the dead cards) onto itself."""
+    return [perm for perm in SUIT_PERMUTATIONS
+            if all(sorted(relabel(group, perm)) == sorted(group)
+                   for group in groups)]
+
+
+def enumerate_equity(holes, board=(), dead=(), symmetry=True):
+    """Return one Equity tuple per player, computed exactly over every
+    completion of the board. trials is the number of distinct boards and
+    low == high == equity."""
+    holes = [parse(hole) for hole in holes]
+    board, dead = parse(board), parse(dead)
+    known = board + dead + [card for hole in holes for card in hole]
+    if len(set(known)) != len(known):
+        raise ValueError('duplicate cards in %r' % known)
+    deck = [card for card in range(52) if card not in set(known)]
+    perms = stabilizer(holes + [board, dead]) if symmetry else []
+    perms = [perm for perm in perms if perm != (0, 1, 2, 3)]
+    tallies = [[0, 0, 0.0] for _ in holes]
+    total = 0
+    for runout in itertools.combinations(deck, 5 - len(board)):
+        weight = 1
+        if perms:
+            images = {tuple(sorted(relabel(runout, perm))) for perm in perms}
+            if min(images) < runout:
+                continue  # counted with its canonical representative
+            images.add(runout)
+            weight = len(images)
+        full_board = board + list(runout)
+        scores = board_scores(board_profile(full_board), holes)
+        positions = winners(scores, indices=True)[2]
+        for i in positions:
+            tallies[i][0 if len(positions) == 1 else 1] += weight
+            tallies[i][2] += weight / len(positions)
+        total += weight
+    return [Equity(total, wins / total, ties / total,
+                   (total - wins - ties) / total, share / total,
+                   share / total, share / total)
+            for wins, ties, share in tallies]
+
+
+def class_index(hole):
+    """Return the 0-168 index of a 2-card starting hand in the 13 x 13
+    grid: pairs on the diagonal, suited hands above it, offsuit below."""
+    a, b = sorted(parse(hole), reverse=True)
+    high, low = 12 - (a >> 2), 12 - (b >> 2)
+    if (a & 3) == (b & 3):
+        return 13 * high + low
+    return 13 * low + high
+
+
+def class_name(index):
+    "Return the name ('AA', 'AKs', 'AKo', ...) of a class index."
+    row, col = divmod(index, 13)
+    first, second = RANKS[12 - min(row, col)], RANKS[12 - max(row, col)]
+    if row == col:
+        return first + second
+    return first + second + ('s' if row < col else 'o')
+
+
+def class_combos(index):
+    "Return the list of hole card pairs (as ids) in a class."
+    row, col = divmod(index, 13)
+    high, low = 12 - min(row, col), 12 - max(row, col)
+    if row == col:
+        return [(4 * high + s1, 4 * high + s2)
+                for s1, s2 in itertools.combinations(range(4), 2)]
+    return [(4 * high + s1, 4 * low + s2)
+            for s1 in range(4) for s2 in range(4)
+            if (s1 == s2) == (row < col)]
+
+
+CLASS_INDEX = {class_name(i): i for i in range(169)}
+
+
+def matchups(first, second):
+    """Return {(hole1, hole2): weight} for the non-conflicting combo pairs
+    of two classes, one entry per suit-isomorphic group."""
+    counts = {}
+    for hole1 in class_combos(first):
+        for hole2 in class_combos(second):
+            if set(hole1) & set(hole2):
+                continue
+            key = min((tuple(sorted(relabel(hole1, perm))),
+                       tuple(sorted(relabel(hole2, perm))))
+                      for perm in SUIT_PERMUTATIONS)
+            counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+def class_equity(pair, dead=()):
+    """Return the exact preflop equity of class pair[0] against pair[1],
+    averaged over their non-conflicting combos. dead cards are out of the
+    deck; they must be whole ranks (all four suits), so that relabelling
+    suits leaves them alone."""
+    first, second = pair
+    dead = parse(dead)
+    if len(stabilizer([dead])) != len(SUIT_PERMUTATIONS):
+        raise ValueError('dead cards must be whole ranks')
+    total = share = 0
+    for (hole1, hole2), weight in matchups(first, second).items():
+        if set(dead).intersection(hole1 + hole2):
+            continue
+        share += weight * enumerate_equity([hole1, hole2], (), dead)[0].equity
+        total += weight
+    if not total:
+        raise ValueError('no combos of %s against %s are left'
+                         % (class_name(first), class_name(second)))
+    return share / total
+
+
+def build_preflop_table(path=TABLE_PATH, workers=None, classes=None,
+                        dead=()):
+    """Enumerate every heads-up class matchup and write the 169 x 169
+    equity matrix to path. classes limits the table to some class indices
+    (the other cells stay 0) and dead is passed to class_equity. workers
+    is as in equity.equity()."""
+    classes = sorted(range(169) if classes is None else classes)
+    pairs = [(i, j) for i in classes for j in classes if i <= j]
+    values = [0] * (169 * 169)
+    if workers == 1:
+        results = [class_equity(pair, dead) for pair in pairs]
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(class_equity, pairs,
+                                        [dead] * len(pairs)))
+    for (i, j), value in zip(pairs, results):
+        values[169 * i + j] = round(value * SCALE)
+        if i != j:
+            values[169 * j + i] = SCALE - values[169 * i + j]
+    write_table(path, values)
+
+
+def write_table(path, values):
+    "Write a list of 169 * 169 fixed point equities to path."
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, 169))
+        f.write(struct.pack('<%dH' % len(values), *values))
+
+
+def read_table(table, path):
+    "Check a mapped preflop table and return it."
+    magic, size = HEADER.unpack_from(table)
+    if magic != MAGIC or size != 169:
+        raise ValueError('%s is not a preflop equity table' % path)
+    return table
+
+
+_table = MappedTable(read_table)
+
+
+def load_table(path=TABLE_PATH):
+    "Memory-map the preflop table at path, once."
+    return _table.load(path)
+
+
+def close_table():
+    "Unmap the preflop table, if it is mapped."
+    _table.close()
+
+
+def preflop_equity(first, second, path=TABLE_PATH):
+    """Return the exact heads-up equity of one starting-hand class against
+    another, averaged over all their non-conflicting combos. Each is a
+    class name such as 'AKs' or a pair of cards, which stands for its
+    class: how the two hands block each other's suits (KsQs against AsAh,
+    say) is not taken into account; enumerate_equity gives that."""
+    table = load_table(path)
+    i, j = [CLASS_INDEX[hand] if isinstance(hand, str) and hand in CLASS_INDEX
+            else class_index(hand) for hand in (first, second)]
+    offset = HEADER.size + 2 * (169 * i + j)
+    return struct.unpack_from('<H', table, offset)[0] / SCALE
+
+
+if __name__ == '__main__':
+    build_preflop_table(*sys.argv[1:2])
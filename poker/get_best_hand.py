@@ -1,12 +1,14 @@
 import itertools
+from collections import namedtuple
 
+import evaluators
+from cards import parse, to_strings
+from evaluators import hand_rank
+from hand_lookup import CATEGORIES, CLASSES
+from incremental import Evaluator
+from poker import allmax  # noqa
 
-def allmax(iterable, key=None):
-    "Return a list of all items equal to the max of the iterable."
-    maximum = max(iterable, key=key)
-    return list(filter(
-        lambda hand: hand_rank(hand) == hand_rank(maximum),
-        iterable))
+Draws = namedtuple('Draws', 'category outs turn river')
 
 
 # def group_by(hands):
@@ -37,71 +39,55 @@ def allmax(iterable, key=None):
 
 
 # Simpler than using the above three functions to do the same
-def best_hand(hand):
+def best_hand_combinations(hand):
     return max(itertools.combinations(hand, 5), key=hand_rank)
 
 
-def hand_rank(hand):
-    "Return a value indicating the ranking of a hand."
-    ranks = card_ranks(hand)
-    if straight(ranks) and flush(hand):
-        return (8, max(ranks))
-    elif kind(4, ranks):
-        return (7, kind(4, ranks), kind(1, ranks))
-    elif kind(3, ranks) and kind(2, ranks):
-        return (6, kind(3, ranks), kind(2, ranks))
-    elif flush(hand):
-        return (5, ranks)
-    elif straight(ranks):
-        return (4, max(ranks))
-    elif kind(3, ranks):
-        return (3, kind(3, ranks), ranks)
-    elif two_pair(ranks):
-        return (2, two_pair(ranks), ranks)
-    elif kind(2, ranks):
-        return (1, kind(2, ranks), ranks)
-    else:
-        return (0, ranks)
-
-
-def card_ranks(hand):
-    "Return a list of the ranks, sorted with higher first."
-    ranks = ['--23456789TJQKA'.index(r) for r, s in hand]
-    ranks.sort(reverse=True)
-    return [5, 4, 3, 2, 1] if (ranks == [14, 5, 4, 3, 2]) else ranks
-
-
-def flush(hand):
-    "Return True if all the cards have the same suit."
-    suits = [s for r, s in hand]
-    return len(set(suits)) == 1
-
-
-def straight(ranks):
-    """Return True if the ordered
-    ranks form a 5-card straight."""
-    return (max(ranks) - min(ranks) == 4) and len(set(ranks)) == 5
-
-
-def kind(n, ranks):
-    """Return the first rank that this hand has
-    exactly n-of-a-kind of. Return None if there
-    is no n-of-a-kind in the hand."""
-    for r in ranks:
-        if ranks.count(r) == n:
-            return r
-    return None
-
-
-def two_pair(ranks):
-    """If there are two pair here, return the two
-    ranks of the two pairs, else None."""
-    pair = kind(2, ranks)
-    lowpair = kind(2, list(reversed(ranks)))
-    if pair and lowpair != pair:
-        return (pair, lowpair)
+# The selected evaluator backend tallies the 7 cards once instead of
+# ranking all 21 combinations
+def best_hand(hand):
+    "From a 7-card hand, return the best 5 card hand."
+    return evaluators.best_hand(hand)
+
+
+def draws(hole, board, dead=()):
+    """Analyse the draws of hole cards on a flop or turn board.
+
+    Returns Draws(category, outs, turn, river): the current category name,
+    {better category: [cards]} for every unseen card that improves the
+    category on the next card, and the probabilities of having improved
+    by the turn (None on the turn) and by the river. Unseen cards are
+    added to one incremental Evaluator and undone, instead of ranking the
+    21 combinations of every candidate hand."""
+    hole, board, dead = parse(hole), parse(board), parse(dead)
+    if len(board) not in (3, 4):
+        raise ValueError('draws need a flop or a turn board')
+    table = Evaluator([hole], board)
+    current = CLASSES[table.scores()[0]][0]
+    known = set(hole + board + dead)
+    unseen = [card for card in range(52) if card not in known]
+    outs = {}
+    runouts = improved = 0
+    for i, card in enumerate(unseen):
+        table.add(card)
+        category = CLASSES[table.scores()[0]][0]
+        if category > current:
+            outs.setdefault(CATEGORIES[category], []).append(card)
+        if len(board) == 3:
+            for river in unseen[i + 1:]:
+                table.add(river)
+                runouts += 1
+                improved += CLASSES[table.scores()[0]][0] > current
+                table.undo()
+        table.undo()
+    hits = sum(map(len, outs.values()))
+    if len(board) == 3:
+        turn, river = hits / len(unseen), improved / runouts
     else:
-        return None
+        turn, river = None, hits / len(unseen)
+    return Draws(CATEGORIES[current],
+                 {name: to_strings(cards) for name, cards in outs.items()},
+                 turn, river)
 
 
 def test_best_hand():
@@ -113,4 +99,5 @@ def test_best_hand():
             == ['8C', '8S', 'TC', 'TD', 'TH'])
     return 'test_best_hand passes'
 
-print test_best_hand()
+if __name__ == '__main__':
+    print(test_best_hand())
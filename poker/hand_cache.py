@@ -0,0 +1,120 @@
+'''Suit-isomorphic memoization of hand evaluation.
+
+Hands that only differ by a relabelling of suits ('AS KS' and 'AH KH')
+always evaluate the same way. canonical() maps a hand to a key made of
+its per-suit rank masks in a canonical suit order, together with the
+relabelling it applied. memoize() wraps an evaluation function in a
+size-bounded functools.lru_cache keyed by that canonical key; functions
+that return cards get them mapped back to the caller's suits, so a cache
+hit is indistinguishable from a fresh evaluation.
+
+The joker-aware canonical_wild() only swaps suits of the same colour, or
+both colours at once along with the '?B' and '?R' jokers.
+'''
+import functools
+
+import get_best_hand
+import poker
+import replace_wild_cards
+from cards import RANKS, SUITS, RANK_OF, SUIT_OF, DECK
+
+BLACK, RED = (0, 3), (1, 2)  # suit indices of SC and HD in 'SHDC'
+
+
+def suit_masks(hand, jokers=None):
+    "Return the per-suit rank masks of the cards that are not jokers."
+    masks = [0, 0, 0, 0]
+    for card in hand:
+        if jokers is None or card not in jokers:
+            masks[SUIT_OF[card]] |= 1 << RANK_OF[card]
+    return masks
+
+
+def canonical(hand):
+    """Return (key, suit_map): key is the tuple of per-suit rank masks with
+    the suits sorted by mask, suit_map[j] the canonical index of suit j."""
+    masks = suit_masks(hand)
+    order = sorted(range(4), key=lambda j: masks[j], reverse=True)
+    suit_map = [0] * 4
+    for canon, j in enumerate(order):
+        suit_map[j] = canon
+    return tuple(masks[j] for j in order), suit_map
+
+
+def canonical_wild(hand):
+    """Like canonical(), for hands holding '?B' and '?R' jokers: the key is
+    (masks, black jokers, red jokers) and only colour-preserving or
+    colour-swapping relabellings are used."""
+    jokers = {'?B': 0, '?R': 0}
+    for card in hand:
+        if card in jokers:
+            jokers[card] += 1
+    masks = suit_masks(hand, jokers)
+    black = sorted(BLACK, key=lambda j: masks[j], reverse=True)
+    red = sorted(RED, key=lambda j: masks[j], reverse=True)
+    # Canonical suits are filled in 'SHDC' order: S, C black and H, D red.
+    keep = (black[0], red[0], red[1], black[1])
+    swap = (red[0], black[0], black[1], red[1])
+    options = [(tuple(masks[j] for j in keep), jokers['?B'], jokers['?R'],
+                keep),
+               (tuple(masks[j] for j in swap), jokers['?R'], jokers['?B'],
+                swap)]
+    masks, blacks, reds, order = min(options)
+    suit_map = [0] * 4
+    for canon, j in enumerate(order):
+        suit_map[j] = canon
+    return (masks, blacks, reds), suit_map
+
+
+def from_masks(masks):
+    "Return the card strings described by per-suit rank masks."
+    return [RANKS[r] + SUITS[j] for j, mask in enumerate(masks)
+            for r in range(13) if mask >> r & 1]
+
+
+def from_wild_key(key):
+    "Return a hand, jokers included, for a canonical_wild() key."
+    masks, blacks, reds = key
+    return from_masks(masks) + ['?B'] * blacks + ['?R'] * reds
+
+
+def restore(result, suit_map, ids):
+    "Map cards in canonical suits back to the caller's suits."
+    inverse = [0] * 4
+    for j, canon in enumerate(suit_map):
+        inverse[canon] = j
+    restored = [4 * RANK_OF[card] + inverse[SUIT_OF[card]] for card in result]
+    return restored if ids else [DECK[card] for card in restored]
+
+
+def memoize(fn, maxsize=65536, returns_cards=False, jokers=False):
+    """Wrap fn(hand) in an LRU cache keyed by the hand's canonical form.
+    Set returns_cards if fn returns cards that must be mapped back to the
+    caller's suits, and jokers if hands may hold '?B'/'?R' jokers. The
+    wrapper has the cache_info() and cache_clear() methods of
+    functools.lru_cache."""
+    canon, rebuild = ((canonical_wild, from_wild_key) if jokers
+                      else (canonical, from_masks))
+
+    @functools.lru_cache(maxsize)
+    def evaluate(key):
+        return fn(rebuild(key))
+
+    @functools.wraps(fn)
+    def wrapper(hand):
+        key, suit_map = canon(hand)
+        result = evaluate(key)
+        if returns_cards:
+            ids = any(type(card) is int for card in hand)
+            return restore(result, suit_map, ids)
+        return result
+
+    wrapper.cache_info = evaluate.cache_info
+    wrapper.cache_clear = evaluate.cache_clear
+    return wrapper
+
+
+hand_rank = memoize(poker.hand_rank)
+best_hand = memoize(get_best_hand.best_hand, returns_cards=True)
+best_wild_hand = memoize(replace_wild_cards.best_wild_hand,
+                         returns_cards=True, jokers=True)
@@ -0,0 +1,93 @@
+'''Table-driven 5-card hand evaluator.
+
+Every 5-card hand falls into one of 7,462 equivalence classes. The classes
+are enumerated once at import time, ranked with poker.hand_rank, and stored
+in two tables keyed by the product of the cards' rank primes: one for
+flushes and one for everything else. evaluate(hand) is then five dict
+lookups, a product and a flush check; it returns an integer score
+(0 = 7-5-4-3-2 offsuit, 7461 = royal flush) that orders hands exactly
+like the hand_rank tuples do.
+'''
+import itertools
+
+from cards import RANKS, SUITS, RANK_OF, SUIT_OF
+from poker import allmax
+from poker import hand_rank as reference_hand_rank
+
+PRIMES = [2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41]
+
+# Names of the hand categories, indexed by the first hand_rank element.
+CATEGORIES = ['high card', 'pair', 'two pair', 'three of a kind', 'straight',
+              'flush', 'full house', 'four of a kind', 'straight flush']
+
+# Per-card prime and suit bit, keyed by card string and card id.
+CARD_PRIME = {card: PRIMES[r] for card, r in RANK_OF.items()}
+CARD_SUIT = {card: 1 << j for card, j in SUIT_OF.items()}
+
+
+def representatives():
+    """Yield (ranks, is_flush, hand) for one hand of every class, where
+    ranks is the sorted tuple of rank indices (0 = deuce, 12 = ace)."""
+    for ranks in itertools.combinations_with_replacement(range(13), 5):
+        if any(ranks.count(r) > 4 for r in ranks):
+            continue
+        # Cycling the suits never yields a flush and never repeats a card.
+        hand = [RANKS[r] + SUITS[i % 4] for i, r in enumerate(ranks)]
+        yield ranks, False, hand
+    for ranks in itertools.combinations(range(13), 5):
+        yield ranks, True, [RANKS[r] + 'S' for r in ranks]
+
+
+def prime_product(ranks):
+    "Return the product of the primes of a sequence of rank indices."
+    product = 1
+    for r in ranks:
+        product *= PRIMES[r]
+    return product
+
+
+def build_tables():
+    """Rank every class with the reference hand_rank and return
+    (classes, class_ranks, flushes, others): the hand_rank tuples and the
+    (ranks, is_flush) pairs indexed by score, and the flush/non-flush
+    tables mapping prime products to scores."""
+    entries = sorted(
+        ((reference_hand_rank(hand), ranks, is_flush)
+         for ranks, is_flush, hand in representatives()),
+        key=lambda entry: entry[0])
+    classes, class_ranks, flushes, others = [], [], {}, {}
+    for score, (rank, ranks, is_flush) in enumerate(entries):
+        classes.append(rank)
+        class_ranks.append((ranks, is_flush))
+        table = flushes if is_flush else others
+        table[prime_product(ranks)] = score
+    return classes, class_ranks, flushes, others
+
+
+CLASSES, CLASS_RANKS, FLUSHES, OTHERS = build_tables()
+
+
+def evaluate(hand):
+    "Return the integer score (0-7461) of a 5-card hand."
+    a, b, c, d, e = hand
+    key = (CARD_PRIME[a] * CARD_PRIME[b] * CARD_PRIME[c]
+           * CARD_PRIME[d] * CARD_PRIME[e])
+    if (CARD_SUIT[a] & CARD_SUIT[b] & CARD_SUIT[c] & CARD_SUIT[d]
+            & CARD_SUIT[e]):
+        return FLUSHES[key]
+    return OTHERS[key]
+
+
+def rank_tuple(score):
+    "Convert a score back to the poker.hand_rank tuple of its class."
+    return CLASSES[score]
+
+
+def hand_rank(hand):
+    "Drop-in replacement for poker.hand_rank backed by the lookup tables."
+    return CLASSES[evaluate(hand)]
+
+
+def poker(hands):
+    '''Return a list of winning hands: poker([hand,...]) => [hand,...]'''
+    return allmax(hands, key=evaluate) or None
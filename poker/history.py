@@ -0,0 +1,174 @@
+'''Score hand-history files: one showdown per line.
+
+Each line lists the players' cards separated by '|':
+
+    AS KS QS JS TS | 9D 9H 9S 9C 7D | TD TC TH 7C 7H
+
+Five cards per player are ranked like poker.hand_rank, six or seven
+like get_best_hand.best_hand (hold'em hole cards plus the board). No
+card may be dealt twice, except that the board cards, those every
+player holds, appear in every hand of six or seven cards. For every
+input line one output line gives the winning player indices and the
+winning hand_rank tuple, separated by a tab, e.g. '0 2\\t(6, 10, 7)'.
+
+Lines that cannot be scored give 'error' and the reason instead, and
+blank lines stay blank, so output line n always belongs to input line n.
+
+The input is memory-mapped and split into chunks that end on line
+boundaries. Workers map the file themselves and get only (start, end)
+offsets; results are written in input order as they come back, with at
+most a few chunks per worker in flight, so memory stays bounded however
+big the file is:
+
+    python history.py hands.txt winners.txt --workers 8
+'''
+import argparse
+import mmap
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import hand_lookup
+import seven_card
+from poker import winners
+
+CHUNK_SIZE = 1 << 22  # bytes per chunk
+AHEAD = 2             # chunks in flight per worker
+
+EVALUATORS = {5: hand_lookup.evaluate, 6: seven_card.evaluate,
+              7: seven_card.evaluate}
+
+
+def score_line(line):
+    "Return the output line (without newline) for one input line."
+    hands = [hand.split() for hand in line.split('|')]
+    n = len(hands[0])
+    if n not in EVALUATORS or any(len(hand) != n for hand in hands):
+        raise ValueError('players need 5, 6 or 7 cards each')
+    board = set.intersection(*map(set, hands)) if n > 5 else set()
+    cards = [card for hand in hands for card in hand if card not in board]
+    if len(set(cards)) != len(cards) or \
+            any(len(set(hand)) != n for hand in hands):
+        raise ValueError('a card is dealt twice')
+    evaluate = EVALUATORS[n]
+    best, _, positions = winners([evaluate(hand) for hand in hands],
+                                 indices=True)
+    return '%s\t%r' % (' '.join(map(str, positions)),
+                       hand_lookup.rank_tuple(best))
+
+
+def score_lines(text):
+    "Score every line of text; return the output text and line count."
+    out = []
+    lines = text.split('\n')
+    if lines[-1] == '':
+        lines.pop()
+    for line in lines:
+        line = line.strip()
+        if not line:
+            out.append('')
+            continue
+        try:
+            out.append(score_line(line))
+        except (KeyError, ValueError) as e:
+            out.append('error\t%s' % (e,))
+    return ''.join(line + '\n' for line in out), len(lines)
+
+
+def chunks(path, size=CHUNK_SIZE):
+    "Return (start, end) byte offsets of line-aligned chunks of the file."
+    length = os.path.getsize(path)
+    if not length:
+        return []
+    result = []
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        start = 0
+        while start < length:
+            end = data.find(b'\n', min(start + size, length) - 1)
+            end = length if end < 0 else end + 1
+            result.append((start, end))
+            start = end
+    return result
+
+
+def score_chunk(path, start, end):
+    "Score the lines between two byte offsets of the file."
+    with open(path, 'rb') as f, \
+            mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        # A stray byte spoils only its own line, which cannot be scored.
+        return score_lines(data[start:end].decode('ascii', 'replace'))
+
+
+def results(path, workers=None, chunk_size=CHUNK_SIZE):
+    """Yield (output text, lines, bytes) for every chunk of the file, in
+    order, scoring the chunks across workers processes as in
+    equity.equity()."""
+    spans = chunks(path, chunk_size)
+    if workers == 1:
+        for start, end in spans:
+            yield score_chunk(path, start, end) + (end - start,)
+        return
+    limit = AHEAD * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(workers) as executor:
+        pending = deque()
+        spans = iter(spans)
+        for start, end in spans:
+            pending.append((executor.submit(score_chunk, path, start, end),
+                            end - start))
+            if len(pending) >= limit:
+                future, size = pending.popleft()
+                yield future.result() + (size,)
+        while pending:
+            future, size = pending.popleft()
+            yield future.result() + (size,)
+
+
+def process(path, out, workers=None, chunk_size=CHUNK_SIZE, progress=None):
+    """Score the file at path and write the results to the file object
+    out. If progress is a file object, a throughput report is written to
+    it after every chunk. Return the number of lines scored."""
+    total_bytes = os.path.getsize(path)
+    done_lines = done_bytes = 0
+    t0 = time.perf_counter()
+    for text, lines, size in results(path, workers, chunk_size):
+        out.write(text)
+        done_lines += lines
+        done_bytes += size
+        if progress is not None:
+            elapsed = max(time.perf_counter() - t0, 1e-9)
+            progress.write('\r%d lines  %.0f lines/s  %5.1f%%' % (
+                done_lines, done_lines / elapsed,
+                100.0 * done_bytes / total_bytes))
+            progress.flush()
+    if progress is not None:
+        progress.write('\n')
+    return done_lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Write the winners of every showdown in a file.')
+    parser.add_argument('input')
+    parser.add_argument('output', help="output file, or '-' for stdout")
+    parser.add_argument('--workers', type=int,
+                        help='worker processes (default: one per CPU)')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE,
+                        help='bytes per chunk')
+    parser.add_argument('--quiet', action='store_true',
+                        help='no progress report')
+    options = parser.parse_args(argv)
+    progress = None if options.quiet else sys.stderr
+    if options.output == '-':
+        process(options.input, sys.stdout, options.workers,
+                options.chunk_size, progress)
+    else:
+        with open(options.output, 'w') as out:
+            process(options.input, out, options.workers, options.chunk_size,
+                    progress)
+
+
+if __name__ == '__main__':
+    main()
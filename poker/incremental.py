@@ -0,0 +1,156 @@
+'''Incremental evaluation as the board is dealt street by street.
+
+An Evaluator holds every player's hole cards and the shared board as
+seven_card tallies (a rank histogram and four per-suit rank masks per
+player). Adding or removing a board card updates each tally with one
+increment and one bit operation instead of re-ranking 21 combinations,
+and every change is recorded so undo() can step back, which is what
+tree searches and runout enumerations need:
+
+    table = Evaluator(['AS KS', 'QH QD'], 'QS JS 2C')
+    table.add('TS')      # turn
+    table.winners()      # [0]
+    table.undo()         # back to the flop
+
+Scores are seven_card / hand_lookup scores, recomputed lazily after a
+change.
+
+showdown() settles a single hold'em board: the board is tallied once and
+every player's hole cards are scored as a small change to that tally.
+'''
+from cards import RANK_OF, SUIT_OF, parse
+from hand_lookup import rank_tuple
+from poker import winners
+from seven_card import group_masks, score, score_groups, tally
+
+
+class Evaluator:
+    """Tallies of the hole cards of every player plus a shared board.
+
+    holes is a list of hands (lists or strings of cards in either form);
+    board the cards already dealt. Cards are kept as ids."""
+
+    def __init__(self, holes, board=()):
+        self.holes = [parse(hole) for hole in holes]
+        self.board = []
+        self.tallies = []
+        self.history = []
+        self.known = set()
+        for hole in self.holes:
+            counts, suits = [0] * 13, [0, 0, 0, 0]
+            for card in hole:
+                self.claim(card)
+                counts[RANK_OF[card]] += 1
+                suits[SUIT_OF[card]] |= 1 << RANK_OF[card]
+            self.tallies.append((counts, suits))
+        self._scores = None
+        for card in parse(board):
+            self.add(card)
+        self.history = []
+
+    def claim(self, card):
+        "Mark a card as dealt, refusing a card dealt before."
+        if card in self.known:
+            raise ValueError('card %r is dealt twice' % card)
+        self.known.add(card)
+
+    def _add(self, card):
+        self.claim(card)
+        r, bit = RANK_OF[card], 1 << RANK_OF[card]
+        j = SUIT_OF[card]
+        for counts, suits in self.tallies:
+            counts[r] += 1
+            suits[j] |= bit
+        self.board.append(card)
+        self._scores = None
+
+    def _remove(self, card):
+        if card not in self.board:
+            raise ValueError('card %r is not on the board' % card)
+        r, bit = RANK_OF[card], 1 << RANK_OF[card]
+        j = SUIT_OF[card]
+        for counts, suits in self.tallies:
+            counts[r] -= 1
+            suits[j] &= ~bit
+        self.board.remove(card)
+        self.known.discard(card)
+        self._scores = None
+
+    def add(self, card):
+        "Deal a card (in either form) to the board."
+        card = parse([card])[0]
+        self._add(card)
+        self.history.append((self._remove, card))
+
+    def remove(self, card):
+        "Take a card (in either form) off the board."
+        card = parse([card])[0]
+        self._remove(card)
+        self.history.append((self._add, card))
+
+    def undo(self):
+        "Reverse the last add() or remove()."
+        inverse, card = self.history.pop()
+        inverse(card)
+
+    def scores(self):
+        "Return every player's score; each needs at least 5 cards."
+        if self._scores is None:
+            if len(self.board) + min(map(len, self.holes)) < 5:
+                raise ValueError('a player has fewer than 5 cards')
+            self._scores = [score(counts, suits)
+                            for counts, suits in self.tallies]
+        return self._scores
+
+    def ranks(self):
+        "Return every player's best hand as a poker.hand_rank tuple."
+        return [rank_tuple(s) for s in self.scores()]
+
+    def winners(self):
+        "Return the positions of the players with the best hand."
+        return winners(self.scores(), indices=True)[2]
+
+
+def board_profile(board):
+    """Return (counts, suits, groups) of a board: its rank histogram,
+    per-suit rank masks and seven_card.group_masks."""
+    counts, suits = tally(board)
+    return counts, suits, group_masks(counts)
+
+
+def scores(board, holes):
+    """Return the score of every player's best hand on a shared board,
+    tallying the board once. Each player may hold up to 7 cards in all."""
+    board = parse(board)
+    holes = [parse(hole) for hole in holes]
+    if len(board) + max(map(len, holes)) > 7 or \
+            len(board) + min(map(len, holes)) < 5:
+        raise ValueError('players need 5 to 7 cards with the board')
+    return board_scores(board_profile(board), holes)
+
+
+def board_scores(profile, holes):
+    """Return the scores of lists of hole cards on a board given by its
+    board_profile(), without checking them."""
+    counts, suits, groups = profile
+    result = []
+    for hole in holes:
+        s, g = suits[:], groups[:]
+        held = {}
+        for card in hole:
+            r = RANK_OF[card]
+            bit = 1 << r
+            c = counts[r] + held.get(r, 0)
+            held[r] = held.get(r, 0) + 1
+            g[c] ^= bit
+            g[c + 1] |= bit
+            s[SUIT_OF[card]] |= bit
+        result.append(score_groups(s, g))
+    return result
+
+
+def showdown(board, holes):
+    """Return the positions of the players whose hole cards make the best
+    hand with the shared board: showdown('AS KD 7H 7C 2S', ['AH AD',
+    'KS QS']) => [0]."""
+    return winners(scores(board, holes), indices=True)[2]
@@ -0,0 +1,237 @@
+'''Opt-in instrumentation of the evaluators and the zebra solvers.
+
+enable() replaces the functions listed in TARGETS with wrappers, on the
+modules themselves, and disable() puts the originals back; nothing is
+wrapped until then, so instrumentation costs nothing while it is off.
+While it is on, every wrapped function records
+
+    calls        how many times it was called
+    time_ns      cumulative time, counted once across recursive calls
+    nested       how many wrapped calls it issued, directly or not,
+                 by callee (e.g. evaluate calls per poker())
+    fanout       a histogram of those counts per call (e.g. how many
+                 candidate joker substitutions one best_wild_hand()
+                 checked with fits())
+    categories   a histogram of the hand categories it returned
+
+and the zebra solvers' solutions() record node visits per search level.
+snapshot() also reports hand_cache hit rates since the last reset():
+
+    with instrument.recording() as stats:
+        poker.poker(hands)
+    stats['nested']['poker.poker']['hand_lookup.evaluate']
+
+Only calls that go through the module attribute are seen: a name bound
+with 'from module import fn' before enable() keeps the original.
+'''
+import contextlib
+import functools
+import importlib
+import inspect
+import sys
+import time
+from collections import Counter, defaultdict
+
+from hand_lookup import CATEGORIES, CLASSES
+from hand_lookup import evaluate as _evaluate
+
+# (module, function, what it returns): 'rank' for hand_rank tuples,
+# 'score' for hand_lookup scores, 'hand' for cards, 'levels' for the zebra
+# solvers' solutions() generators and None for anything else.
+TARGETS = [
+    ('poker', 'poker', None),
+    ('poker', 'hand_rank', 'rank'),
+    ('hand_lookup', 'poker', None),
+    ('hand_lookup', 'hand_rank', 'rank'),
+    ('hand_lookup', 'evaluate', 'score'),
+    ('seven_card', 'evaluate', 'score'),
+    ('seven_card', 'best_hand', 'hand'),
+    ('get_best_hand', 'best_hand', 'hand'),
+    ('get_best_hand', 'best_hand_combinations', 'hand'),
+    ('get_best_hand', 'hand_rank', 'rank'),
+    ('replace_wild_cards', 'best_wild_hand', 'hand'),
+    ('replace_wild_cards', 'best_wild_hand_teacher', 'hand'),
+    ('replace_wild_cards', 'fits', None),
+    ('replace_wild_cards', 'best_hand', 'hand'),
+    ('replace_wild_cards', 'hand_rank', 'rank'),
+    ('csp', 'solutions', 'levels'),
+    ('bitset', 'solutions', 'levels'),
+]
+
+CACHES = [('hand_cache', 'hand_rank'), ('hand_cache', 'best_hand'),
+          ('hand_cache', 'best_wild_hand')]
+
+_originals = {}  # (module, function) -> original function
+_stack = []      # (name, Counter of calls issued) of the running calls
+_active = Counter()
+_calls = Counter()
+_time_ns = Counter()
+_nested = defaultdict(Counter)
+_fanout = defaultdict(lambda: defaultdict(Counter))
+_categories = defaultdict(Counter)
+_levels = {}
+_cache_base = {}
+
+
+def category(kind, result):
+    "Return the category index of a wrapped function's result, or None."
+    if result is None:
+        return None
+    if kind == 'rank':
+        return result[0]
+    if kind == 'score':
+        return CLASSES[result][0]
+    if kind == 'hand' and len(result) == 5:
+        return CLASSES[_evaluate(result)][0]
+    return None
+
+
+def wrap(name, fn, kind):
+    "Return fn wrapped to record its calls under name."
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for parent, issued in _stack:
+            if parent != name:
+                issued[name] += 1
+        issued = Counter()
+        _stack.append((name, issued))
+        outermost = not _active[name]
+        _active[name] += 1
+        t0 = time.perf_counter_ns()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter_ns() - t0
+            _active[name] -= 1
+            _stack.pop()
+            _calls[name] += 1
+            if outermost:
+                _time_ns[name] += elapsed
+                for child, n in issued.items():
+                    _nested[name][child] += n
+                    _fanout[name][child][n] += 1
+        c = category(kind, result)
+        if c is not None:
+            _categories[name][CATEGORIES[c]] += 1
+        return result
+    return wrapper
+
+
+def wrap_solutions(name, fn):
+    """Return a zebra solutions() generator wrapped to add the search
+    nodes it visits at each level to the totals of name."""
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        stats = bound.arguments['stats']
+        if stats is None:
+            stats = bound.arguments['stats'] = {}
+        before = list(stats.get('levels', []))
+        _calls[name] += 1
+        try:
+            for solution in fn(*bound.args, **bound.kwargs):
+                yield solution
+        finally:
+            levels = _levels.setdefault(name, [])
+            for depth, count in enumerate(stats.get('levels', [])):
+                if depth < len(before):
+                    count -= before[depth]
+                if len(levels) <= depth:
+                    levels.append(0)
+                levels[depth] += count
+    return wrapper
+
+
+def enable(targets=TARGETS):
+    """Wrap every target whose module can be imported. Return the names
+    of the wrapped functions."""
+    wrapped = []
+    for module_name, attribute, kind in targets:
+        if (module_name, attribute) in _originals:
+            continue
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError:
+            continue
+        fn = getattr(module, attribute)
+        name = '%s.%s' % (module_name, attribute)
+        _originals[module_name, attribute] = fn
+        setattr(module, attribute, wrap_solutions(name, fn)
+                if kind == 'levels' else wrap(name, fn, kind))
+        wrapped.append(name)
+    return wrapped
+
+
+def disable():
+    "Put back every original function."
+    for (module_name, attribute), fn in _originals.items():
+        setattr(sys.modules[module_name], attribute, fn)
+    _originals.clear()
+
+
+def enabled():
+    "Return True while the targets are wrapped."
+    return bool(_originals)
+
+
+def cache_info():
+    "Return {name: functools cache_info} of the loaded hand_cache caches."
+    result = {}
+    for module_name, attribute in CACHES:
+        module = sys.modules.get(module_name)
+        if module is not None:
+            result['%s.%s' % (module_name, attribute)] = getattr(
+                module, attribute).cache_info()
+    return result
+
+
+def reset():
+    "Clear every counter and start counting cache hits afresh."
+    for table in (_active, _calls, _time_ns, _nested, _fanout, _categories,
+                  _levels):
+        table.clear()
+    _cache_base.clear()
+    _cache_base.update(cache_info())
+
+
+def snapshot():
+    "Return a copy of everything recorded since the last reset()."
+    caches = {}
+    for name, info in cache_info().items():
+        base = _cache_base.get(name)
+        hits = info.hits - (base.hits if base else 0)
+        misses = info.misses - (base.misses if base else 0)
+        caches[name] = {'hits': hits, 'misses': misses,
+                        'hit_rate': hits / (hits + misses)
+                        if hits + misses else 0.0,
+                        'size': info.currsize}
+    return {
+        'calls': dict(_calls),
+        'time_ns': dict(_time_ns),
+        'nested': {name: dict(c) for name, c in _nested.items()},
+        'fanout': {name: {child: dict(h) for child, h in children.items()}
+                   for name, children in _fanout.items()},
+        'categories': {name: dict(c) for name, c in _categories.items()},
+        'levels': {name: list(levels) for name, levels in _levels.items()},
+        'caches': caches,
+    }
+
+
+@contextlib.contextmanager
+def recording(targets=TARGETS):
+    """Record the calls made inside a with block. The yielded dict is
+    filled with snapshot() on exit; instrumentation is switched off again
+    unless it was already on."""
+    was_enabled = enabled()
+    enable(targets)
+    reset()
+    stats = {}
+    try:
+        yield stats
+    finally:
+        stats.update(snapshot())
+        if not was_enabled:
+            disable()
@@ -0,0 +1,43 @@
+'''Binary table files that are memory-mapped on first use.
+
+exact_equity's preflop table and rank_table's 5-card table are read the
+same way: the file is mapped read-only when it is first needed, checked,
+and kept mapped until another path is asked for or close() is called.
+The pages are shared with every other process mapping the same file.
+'''
+import mmap
+
+
+class MappedTable:
+    """One mapped table at a time. read(data, path) checks a fresh
+    mapping and returns what load() hands out, raising ValueError if the
+    file is not a table; release(value), if given, frees whatever read()
+    built on the mapping (such as memoryviews) before it is closed."""
+
+    def __init__(self, read, release=None):
+        self.read = read
+        self.release = release
+        self.path = self.data = self.value = None
+
+    def load(self, path):
+        "Map the table at path unless it is mapped already; return it."
+        if self.data is None or self.path != path:
+            self.close()
+            with open(path, 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                value = self.read(data, path)
+            except Exception:
+                data.close()
+                raise
+            self.path, self.data, self.value = path, data, value
+        return self.value
+
+    def close(self):
+        "Unmap the table, if one is mapped."
+        if self.data is not None:
+            data, value = self.data, self.value
+            self.path = self.data = self.value = None
+            if self.release is not None:
+                self.release(value)
+            data.close()
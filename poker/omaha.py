@@ -0,0 +1,142 @@
+'''Best hands under rules on how many hole cards must be used.
+
+A rule is (fewest, most) hole cards a five-card hand may use, the rest
+coming from the board:
+
+    holdem   (0, 2)   any 5 of the 2 hole cards and 5 board cards
+    omaha    (2, 2)   exactly 2 of the hole cards and 3 of the board
+
+Omaha with 4 hole cards has 6 x 10 = 60 candidate hands per player and
+five-card Omaha 10 x 10 = 100. Instead of ranking each of them, every
+subset of the board and of the hole cards is reduced once to a part: the
+product of its rank primes, the suit its cards share (if any) and
+whether it holds a pair. A candidate is then one multiplication and one
+hand_lookup table lookup. Flushes are only looked up for hole and board
+parts that share a suit, and once a flush is found only parts holding a
+pair are tried again, since nothing else can make a full house or four
+of a kind. The board's parts are shared by every player at the table:
+
+    best_hand('AS KS 7D 2C', 'QS JS TS 3H 3D')   # ('AS', 'KS', 'QS', ...)
+    showdown('QS JS TS 3H 3D', ['AH AD 3S 9C', 'KS 8S 3C 2D'])   # [1]
+'''
+import itertools
+from collections import namedtuple
+
+from cards import RANK_OF, parse
+from hand_lookup import CARD_PRIME, CARD_SUIT, CLASSES, FLUSHES, OTHERS
+from poker import winners
+
+VARIANTS = {'holdem': (0, 2), 'omaha': (2, 2)}
+
+# The lowest flush score: every better hand is a flush, a full house, four
+# of a kind or a straight flush.
+FLUSH = min(FLUSHES.values())
+
+Part = namedtuple('Part', 'product suit paired cards')
+
+
+def rule_of(variant):
+    "Return the (fewest, most) hole cards rule of a variant name or rule."
+    if isinstance(variant, str):
+        if variant not in VARIANTS:
+            raise ValueError('unknown variant %r (choose from %s)'
+                             % (variant, ', '.join(sorted(VARIANTS))))
+        return VARIANTS[variant]
+    return tuple(variant)
+
+
+def parts(cards, sizes):
+    "Return {size: [Part]} for the subsets of cards of every size."
+    result = {}
+    for k in sizes:
+        result[k] = []
+        for combo in itertools.combinations(cards, k):
+            product, suit = 1, 15
+            for card in combo:
+                product *= CARD_PRIME[card]
+                suit &= CARD_SUIT[card]
+            paired = len(set(RANK_OF[card] for card in combo)) < k
+            result[k].append(Part(product, suit, paired, combo))
+    return result
+
+
+def sizes(rule, holes, board):
+    """Return the numbers of hole cards a hand may use, or raise
+    ValueError if some player cannot make a hand."""
+    fewest, most = rule
+    fewest = max(fewest, 5 - len(board))
+    if not 0 <= fewest <= most <= 5 or \
+            any(len(hole) < fewest for hole in holes):
+        raise ValueError('no 5-card hand uses %d to %d of the hole cards'
+                         % rule)
+    return range(fewest, most + 1)
+
+
+def board_parts(board, rule):
+    "Return the parts of a board under a rule, shared by all players."
+    return parts(board, [5 - k for k in range(rule[0], rule[1] + 1)
+                         if 0 <= 5 - k <= len(board)])
+
+
+def best(hole_parts, board_parts):
+    "Return (score, cards) of the best hand made of a hole and board part."
+    score, cards = -1, None
+    pairs = [(h, b) for k, holes in hole_parts.items()
+             for h in holes for b in board_parts.get(5 - k, ())]
+    for h, b in pairs:
+        if h.suit & b.suit:
+            s = FLUSHES[h.product * b.product]
+            if s > score:
+                score, cards = s, h.cards + b.cards
+    if score >= FLUSH:
+        pairs = [(h, b) for h, b in pairs if h.paired or b.paired]
+    for h, b in pairs:
+        s = OTHERS[h.product * b.product]
+        if s > score:
+            score, cards = s, h.cards + b.cards
+    return score, cards
+
+
+def deal_parts(board, holes, variant):
+    """Check a deal and return the parts of every player's hole cards and
+    the shared board parts."""
+    board = board.split() if isinstance(board, str) else list(board)
+    holes = [hole.split() if isinstance(hole, str) else list(hole)
+             for hole in holes]
+    dealt = parse(board) + [card for hole in holes for card in parse(hole)]
+    if len(set(dealt)) != len(dealt):
+        raise ValueError('a card is dealt twice')
+    rule = rule_of(variant)
+    allowed = sizes(rule, holes, board)
+    return ([parts(hole, [k for k in allowed if k <= len(hole)])
+             for hole in holes], board_parts(board, rule))
+
+
+def scores(board, holes, variant='omaha'):
+    """Return the hand_lookup score of every player's best hand on a
+    shared board. Cards may be strings or ids, lists or 'AS KS ...'."""
+    hole_parts, shared = deal_parts(board, holes, variant)
+    return [best(player, shared)[0] for player in hole_parts]
+
+
+def score(hole, board, variant='omaha'):
+    "Return the hand_lookup score of the best hand of one player."
+    return scores(board, [hole], variant)[0]
+
+
+def best_hand(hole, board, variant='omaha'):
+    "Return the best 5 cards one player can make under the variant's rule."
+    hole_parts, shared = deal_parts(board, [hole], variant)
+    return best(hole_parts[0], shared)[1]
+
+
+def hand_rank(hole, board, variant='omaha'):
+    "Return the poker.hand_rank tuple of a player's best hand."
+    return CLASSES[score(hole, board, variant)]
+
+
+def showdown(board, holes, variant='omaha'):
+    """Return the positions of the players with the best hand on a shared
+    board: showdown('QS JS TS 3H 3D', ['AH AD 3S 9C', 'KS 8S 3C 2D'])
+    => [1]."""
+    return winners(scores(board, holes, variant), indices=True)[2]
@@ -1,5 +1,7 @@
 import random
 
+from cards import DECK, RANK_OF, SUIT_OF
+
 
 def shuffle(deck):
     '''Knuth's Algorithum P.'''
@@ -15,17 +17,30 @@ def swap(deck, i, j):
 
 def poker(hands):
     '''Return a list of winning hands: poker([hand,...]) => [hand,...]'''
-    if hands:
-        return allmax(hands, key=hand_rank)
-    return None
+    return allmax(hands, key=hand_lookup.evaluate) or None
 
 
 def allmax(iterable, key=None):
     "Return a list of all items equal to the max of the iterable."
-    maximum = max(iterable, key=key)
-    return list(filter(
-        lambda hand: hand_rank(hand) == hand_rank(maximum),
-        iterable))
+    return winners(iterable, key)[1]
+
+
+def winners(iterable, key=None, indices=False):
+    '''Rank every item of any iterable exactly once and return
+    (best rank, [winning items]), plus the list of winning positions
+    if indices is true. The rank is None for an empty iterable.'''
+    key = key or (lambda item: item)
+    result, positions, maxval = [], [], None
+    for i, item in enumerate(iterable):
+        value = key(item)
+        if not result or value > maxval:
+            result, positions, maxval = [item], [i], value
+        elif value == maxval:
+            result.append(item)
+            positions.append(i)
+    if indices:
+        return maxval, result, positions
+    return maxval, result
 
 
 def card_ranks(hand):
@@ -43,7 +58,7 @@ def card_ranks(hand):
     #     ranks)
     # )
 
-    ranks = ['--23456789TJQKA'.index(r) for r, s in hand]
+    ranks = [RANK_OF[card] + 2 for card in hand]
     ranks.sort(reverse=True)
     if ranks == [14, 5, 4, 3, 2]:
         ranks = [5, 4, 3, 2, 1]
@@ -57,7 +72,7 @@ def straight(ranks):
 
 def flush(hand):
     "Return True if all the cards have the same suit."
-    return len({suit for rank, suit in hand}) == 1
+    return len({SUIT_OF[card] for card in hand}) == 1
 
 
 def kind(number, ranks):
@@ -98,6 +113,8 @@ def two_pair(ranks):
 
 
 def hand_rank(hand):
+    '''The reference ranking of a 5-card hand. hand_lookup builds its
+    tables from it; poker() uses those tables instead.'''
     ranks = card_ranks(hand)
     if straight(ranks) and flush(hand):            # straight flush
         return (8, max(ranks))
@@ -119,14 +136,31 @@ def hand_rank(hand):
         return (0, ranks)
 
 
-def deal(numhands, n=5, deck=[r + s for r in '23456789TJQKA' for s in 'SHDC']):
-    # random.shuffle(deck)
-    shuffle(deck)
+def draw(deck, k, rng=random):
+    '''Return k cards drawn at random from deck, leaving deck untouched:
+    Knuth's Algorithm P stopped after its first k swaps.'''
+    deck = list(deck)
+    n = len(deck)
+    if k > n:
+        raise ValueError('cannot draw %d cards from %d' % (k, n))
+    for i in range(k):
+        swap(deck, i, rng.randrange(i, n))
+    return deck[:k]
+
+
+def deal(numhands, n=5, deck=DECK, rng=random):
+    '''Deal numhands hands of n cards each. Only the cards dealt are
+    drawn and deck itself is never changed.'''
+    cards = draw(deck, numhands * n, rng)
     return [
-        deck[n * index: n * index + 5]
+        cards[n * index: n * index + n]
         for index in range(numhands)]
 
 
+# Imported last: hand_lookup builds its tables from hand_rank above.
+import hand_lookup  # noqa: E402
+
+
 def main():
     assert card_ranks(['AC', '3D', '4S', 'KH']) == [14, 13, 4, 3]
     sf1 = "6C 7C 8C 9C TC".split()  # Straight Flush
@@ -0,0 +1,198 @@
+'''Hand ranges and range-vs-range equity.
+
+A range is written the way players write them, as comma-separated
+tokens:
+
+    QQ        one pair               QQ+       QQ, KK, AA
+    AKs AKo   suited / offsuit       AK        both
+    ATs+      ATs, AJs, AQs, AKs     QQ-88     QQ down to 88
+    T9s-65s   T9s, 98s, 87s, 76s, 65s
+    A9o-A5o   A9o down to A5o        AsKs      one combo (or 'AS KS')
+
+Any token can end in ':weight' (0 to 1) to keep only part of it, e.g.
+'AKo:0.5'; a later token overrides the weight of an earlier one.
+parse_range() expands a range into {combo: weight}, combos being pairs
+of card ids, highest first.
+
+range_equity() pairs every combo of one range with every combo of the
+other, drops pairs that share a card or hit the board or dead cards,
+folds pairs that are the same up to a relabelling of suits fixing the
+board into one weighted matchup, and evaluates the distinct matchups
+across a process pool: exactly with exact_equity.enumerate_equity, or
+by Monte Carlo with equity.simulate if trials is given (preflop exact
+enumeration takes minutes per matchup).
+'''
+import itertools
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from cards import RANKS, parse
+from equity import simulate
+from exact_equity import CLASS_INDEX, class_combos, enumerate_equity
+from exact_equity import relabel, stabilizer
+
+RangeEquity = namedtuple('RangeEquity', 'combos matchups win tie loss equity')
+
+CHUNK = 16  # matchups per task
+
+
+def rank(char):
+    "Return the rank index (0 = deuce) of a rank character."
+    r = RANKS.find(char.upper())
+    if r < 0:
+        raise ValueError('bad rank %r' % char)
+    return r
+
+
+def hand_class(high, low, kind):
+    """Return the combos of a class given rank indices and kind ('' for a
+    pair or both suited and offsuit, 's' or 'o')."""
+    if high == low:
+        names = [RANKS[high] * 2]
+    else:
+        names = [RANKS[high] + RANKS[low] + k for k in (kind or 'so')]
+    return [tuple(sorted(combo, reverse=True))
+            for name in names for combo in class_combos(CLASS_INDEX[name])]
+
+
+def split_class(token):
+    "Return (high, low, kind) of a class token such as 'AKs' or '88'."
+    if len(token) not in (2, 3) or token[2:] not in ('', 's', 'o'):
+        raise ValueError('bad hand class %r' % token)
+    high, low = rank(token[0]), rank(token[1])
+    if high < low:
+        high, low = low, high
+    if high == low and token[2:]:
+        raise ValueError('a pair cannot be %r' % token)
+    return high, low, token[2:]
+
+
+def expand(token):
+    "Return the combos of one range token (without its weight)."
+    if len(token) == 4 and token[1] in 'shdcSHDC':
+        combo = parse([token[:2].upper(), token[2:].upper()])
+        if combo[0] == combo[1]:
+            raise ValueError('bad combo %r' % token)
+        return [tuple(sorted(combo, reverse=True))]
+    if token.endswith('+'):
+        high, low, kind = split_class(token[:-1])
+        if high == low:
+            return [c for r in range(low, 13) for c in hand_class(r, r, '')]
+        return [c for r in range(low, high) for c in hand_class(high, r, kind)]
+    if '-' in token:
+        first, last = token.split('-')
+        (h1, l1, k1), (h2, l2, k2) = split_class(first), split_class(last)
+        if k1 != k2 or (h1 == l1) != (h2 == l2):
+            raise ValueError('bad span %r' % token)
+        if h1 == l1:
+            return [c for r in range(min(h1, h2), max(h1, h2) + 1)
+                    for c in hand_class(r, r, '')]
+        if h1 == h2:
+            return [c for r in range(min(l1, l2), max(l1, l2) + 1)
+                    for c in hand_class(h1, r, k1)]
+        if h1 - l1 == h2 - l2:
+            gap = h1 - l1
+            return [c for r in range(min(l1, l2), max(l1, l2) + 1)
+                    for c in hand_class(r + gap, r, k1)]
+        raise ValueError('bad span %r' % token)
+    high, low, kind = split_class(token)
+    return hand_class(high, low, kind)
+
+
+def parse_range(text):
+    """Return {combo: weight} for a range such as 'QQ+, AKs, T9s-65s'.
+    A combo is a pair of card ids, highest first."""
+    result = {}
+    for token in text.split(','):
+        token = token.strip()
+        if not token:
+            continue
+        token, _, weight = token.partition(':')
+        weight = float(weight) if weight else 1.0
+        if not 0 <= weight <= 1:
+            raise ValueError('weight out of range in %r' % token)
+        for combo in expand(token.replace(' ', '')):
+            result[combo] = weight
+    return {combo: w for combo, w in result.items() if w}
+
+
+def as_range(hand_range):
+    "Accept a range as text or as a {combo: weight} dict."
+    if isinstance(hand_range, str):
+        return parse_range(hand_range)
+    return dict(hand_range)
+
+
+def matchups(first, second, board=(), dead=()):
+    """Return {(hole1, hole2): weight} for every pair of combos from two
+    ranges that shares no card with each other, the board or the dead
+    cards, one entry per suit-isomorphic group."""
+    first, second = as_range(first), as_range(second)
+    board, dead = parse(board), parse(dead)
+    known = set(board) | set(dead)
+    perms = stabilizer([board, dead])
+    counts = {}
+    for hole1, w1 in first.items():
+        if known.intersection(hole1):
+            continue
+        for hole2, w2 in second.items():
+            if known.intersection(hole2) or set(hole1) & set(hole2):
+                continue
+            key = min((tuple(sorted(relabel(hole1, perm))),
+                       tuple(sorted(relabel(hole2, perm))))
+                      for perm in perms)
+            counts[key] = counts.get(key, 0) + w1 * w2
+    return counts
+
+
+def evaluate_matchups(keys, board, dead, trials, seed):
+    """Return (win, tie, share) of the first hand for every matchup, from
+    exact enumeration or, if trials is given, Monte Carlo trials."""
+    results = []
+    for i, (hole1, hole2) in enumerate(keys):
+        holes = [list(hole1), list(hole2)]
+        if trials is None:
+            e = enumerate_equity(holes, board, dead)[0]
+            results.append((e.win, e.tie, e.equity))
+        else:
+            wins, ties, share, _ = simulate(holes, board, trials,
+                                            '%s:%d' % (seed, i), dead)[0]
+            results.append((wins / trials, ties / trials, share / trials))
+    return results
+
+
+def range_equity(first, second, board=(), dead=(), trials=None,
+                 workers=None, seed=None, chunk=CHUNK):
+    """Return a RangeEquity for each of two ranges (text or dicts) on a
+    board. trials=None enumerates every runout exactly; otherwise each
+    distinct matchup is simulated trials times. workers is as in
+    equity.equity()."""
+    board, dead = parse(board), parse(dead)
+    counts = matchups(first, second, board, dead)
+    if not counts:
+        raise ValueError('the ranges have no compatible combos')
+    if seed is None:
+        seed = random.randrange(1 << 63)
+    keys = sorted(counts)
+    tasks = [keys[start:start + chunk] for start in range(0, len(keys), chunk)]
+    args = ([board] * len(tasks), [dead] * len(tasks),
+            [trials] * len(tasks),
+            ['%s:%d' % (seed, i) for i in range(len(tasks))])
+    if workers == 1:
+        results = map(evaluate_matchups, tasks, *args)
+        results = list(itertools.chain.from_iterable(results))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(itertools.chain.from_iterable(
+                executor.map(evaluate_matchups, tasks, *args)))
+    total = sum(counts.values())
+    win = tie = share = 0.0
+    for key, (w, t, s) in zip(keys, results):
+        weight = counts[key] / total
+        win += weight * w
+        tie += weight * t
+        share += weight * s
+    loss = 1 - win - tie
+    return [RangeEquity(total, len(keys), win, tie, loss, share),
+            RangeEquity(total, len(keys), loss, tie, win, 1 - share)]
@@ -0,0 +1,190 @@
+'''A memory-mapped table of the score of every 5-card hand.
+
+build_table() ranks all C(52, 5) = 2,598,960 hands with poker.hand_rank
+once and writes their hand_lookup scores as 16-bit numbers to a binary
+file, in colexicographic order of the hands' card ids: the hand with
+ids a < b < c < d < e sits at
+
+    C(a, 1) + C(b, 2) + C(c, 3) + C(d, 4) + C(e, 5)
+
+The file is about 5 MB. It is memory-mapped on the first lookup, not at
+import, so importing stays fast and every process of a pool shares the
+same pages through the page cache instead of building tables of its own.
+evaluate(hand) is then a sort, five additions and one read, and with
+NumPy evaluate_array() looks up whole (N, 5) arrays of card ids at once.
+To build the table, which takes about half a minute per core, run
+
+    python rank_table.py [path] [--workers N]
+
+Because colex order puts the hands made of the first n cards of the deck
+first, build_table(path, cards=n) writes just that prefix, which is what
+the tests use.
+'''
+import argparse
+import bisect
+import itertools
+import os
+import struct
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from math import comb
+
+import poker
+from cards import CARD_ID, DECK
+from hand_lookup import CLASSES
+from mapped_table import MappedTable
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is not installed
+    np = None
+
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          'rank_table.bin')
+MAGIC = b'P5RT'
+HEADER = struct.Struct('<4sHH')  # magic, cards covered, padding
+
+# OFFSETS[i][c] is the colex contribution of card id c in sorted place i.
+OFFSETS = [[comb(c, i + 1) for c in range(52)] for i in range(5)]
+
+# Card ids keyed by card string and card id.
+ID = dict(CARD_ID)
+ID.update((i, i) for i in range(52))
+
+if np is not None:
+    OFFSET_ARRAYS = [np.array(offsets, dtype=np.int64) for offsets in OFFSETS]
+
+
+def index(ids):
+    "Return the colex index of 5 sorted card ids."
+    a, b, c, d, e = ids
+    o1, o2, o3, o4, o5 = OFFSETS
+    return o1[a] + o2[b] + o3[c] + o4[d] + o5[e]
+
+
+def reference_score(hand):
+    "Return the hand_lookup score of a 5-card hand, from poker.hand_rank."
+    rank = poker.hand_rank(hand)
+    score = bisect.bisect_left(CLASSES, rank)
+    if CLASSES[score] != rank:
+        raise ValueError('no class has rank %r' % (rank,))
+    return score
+
+
+def score_block(top):
+    """Return the scores of every hand whose highest card id is top, in
+    colex order, as little-endian bytes."""
+    lowers = sorted(itertools.combinations(range(top), 4),
+                    key=lambda lower: lower[::-1])
+    scores = array('H', [reference_score([DECK[c] for c in lower]
+                                         + [DECK[top]])
+                         for lower in lowers])
+    if sys.byteorder == 'big':
+        scores.byteswap()
+    return scores.tobytes()
+
+
+def build_table(path=TABLE_PATH, cards=52, workers=None):
+    """Rank every hand of the first cards card ids and write the table to
+    path, with workers processes as in equity.equity()."""
+    tops = range(4, cards)
+    with open(path + '.tmp', 'wb') as f:
+        f.write(HEADER.pack(MAGIC, cards, 0))
+        if workers == 1:
+            for block in map(score_block, tops):
+                f.write(block)
+        else:
+            with ProcessPoolExecutor(workers) as executor:
+                for block in executor.map(score_block, tops):
+                    f.write(block)
+    os.replace(path + '.tmp', path)
+
+
+def read_table(data, path):
+    "Check a mapped table; return (cards covered, scores)."
+    magic, cards, _ = HEADER.unpack_from(data)
+    if magic != MAGIC or data.size() != HEADER.size + 2 * comb(cards, 5):
+        raise ValueError('%s is not a 5-card rank table' % path)
+    scores = memoryview(data)[HEADER.size:].cast('H')
+    if sys.byteorder == 'big':  # the file is little-endian
+        scores = array('H', scores)
+        scores.byteswap()
+    return cards, scores
+
+
+def release_table(table):
+    "Drop the view of a table's mapping so that it can be closed."
+    if isinstance(table[1], memoryview):
+        table[1].release()
+
+
+_table = MappedTable(read_table, release_table)
+
+
+def load_table(path=TABLE_PATH):
+    """Memory-map the table at path, once; return (cards covered, scores)
+    with scores indexable by colex index."""
+    return _table.load(path)
+
+
+def close_table():
+    "Unmap the table, if it is mapped."
+    _table.close()
+
+
+def evaluate(hand, path=TABLE_PATH):
+    "Return the integer score (0-7461) of a 5-card hand."
+    cards, scores = _table.value if _table.path == path else load_table(path)
+    a, b, c, d, e = sorted([ID[card] for card in hand])
+    if not a < b < c < d < e < cards:
+        raise ValueError('need 5 different cards among the first %d, got %r'
+                         % (cards, hand))
+    return scores[index((a, b, c, d, e))]
+
+
+def evaluate_array(cards, path=TABLE_PATH):
+    """Return an N-length NumPy array of scores for an (N, 5) array of
+    card ids (see batch.encode)."""
+    count, scores = load_table(path)
+    cards = np.sort(np.asarray(cards, dtype=np.int64), axis=1)
+    if cards.ndim != 2 or cards.shape[1] != 5:
+        raise ValueError('need an (N, 5) array of card ids')
+    if len(cards) and (cards[:, 0].min() < 0 or cards[:, 4].max() >= count
+                       or (cards[:, 1:] == cards[:, :-1]).any()):
+        raise ValueError('need 5 different cards among the first %d' % count)
+    index = sum(OFFSET_ARRAYS[i][cards[:, i]] for i in range(5))
+    return np.asarray(scores)[index].astype(np.int64)
+
+
+def hand_rank(hand):
+    "Drop-in replacement for poker.hand_rank backed by the table."
+    return CLASSES[evaluate(hand)]
+
+
+def best_hand(hand):
+    "From a 5 to 7 card hand, return the best 5 card hand, as a list."
+    return list(max(itertools.combinations(hand, 5), key=evaluate))
+
+
+def hand_ranks(hands):
+    "hand_rank of the best 5 cards of every hand of 5 to 7 cards."
+    if np is not None and hands and all(len(hand) == 5 for hand in hands):
+        return [CLASSES[score] for score in evaluate_array(
+            [[ID[card] for card in hand] for hand in hands]).tolist()]
+    return [CLASSES[max(map(evaluate, itertools.combinations(hand, 5)))]
+            for hand in hands]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Build the 5-card rank table.')
+    parser.add_argument('path', nargs='?', default=TABLE_PATH)
+    parser.add_argument('--workers', type=int,
+                        help='worker processes (default: one per CPU)')
+    options = parser.parse_args(argv)
+    build_table(options.path, workers=options.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -26,102 +26,169 @@
 
 import itertools
 
-
-def hand_rank(hand):
-    "Return a value indicating the ranking of a hand."
-    ranks = card_ranks(hand)
-    if straight(ranks) and flush(hand):
-        return (8, max(ranks))
-    elif kind(4, ranks):
-        return (7, kind(4, ranks), kind(1, ranks))
-    elif kind(3, ranks) and kind(2, ranks):
-        return (6, kind(3, ranks), kind(2, ranks))
-    elif flush(hand):
-        return (5, ranks)
-    elif straight(ranks):
-        return (4, max(ranks))
-    elif kind(3, ranks):
-        return (3, kind(3, ranks), ranks)
-    elif two_pair(ranks):
-        return (2, two_pair(ranks), ranks)
-    elif kind(2, ranks):
-        return (1, kind(2, ranks), ranks)
-    else:
-        return (0, ranks)
-
-
-def card_ranks(hand):
-    "Return a list of the ranks, sorted with higher first."
-    ranks = ['--23456789TJQKA'.index(r) for r, s in hand]
-    ranks.sort(reverse=True)
-    return [5, 4, 3, 2, 1] if (ranks == [14, 5, 4, 3, 2]) else ranks
-
-
-def flush(hand):
-    "Return True if all the cards have the same suit."
-    suits = [s for r, s in hand]
-    return len(set(suits)) == 1
-
-
-def straight(ranks):
-    """Return True if the ordered
-    ranks form a 5-card straight."""
-    return (max(ranks) - min(ranks) == 4) and len(set(ranks)) == 5
-
-
-def kind(n, ranks):
-    """Return the first rank that this hand has
-    exactly n-of-a-kind of. Return None if there
-    is no n-of-a-kind in the hand."""
-    for r in ranks:
-        if ranks.count(r) == n:
-            return r
+import seven_card
+from cards import DECK, RANK_OF, SUIT_OF, parse, to_strings
+from evaluators import best_hand, hand_rank
+
+
+# my solution: instead of trying every substitution, go through the
+# categories from the best down (straight flush, four of a kind, ...).
+# Each one is settled from the fixed cards of every rank and suit and the
+# cards the wild cards can stand for, choosing ranks from the highest
+# down, so the first category the hand can make comes with its best ranks.
+STRAIGHTS = [list(range(top - 4, top + 1)) for top in range(12, 3, -1)]
+STRAIGHTS.append([12, 0, 1, 2, 3])  # the wheel, A-2-3-4-5
+
+# Rank counts of the categories without a flush or a straight.
+FOUR_OF_A_KIND = (4, 1)
+FULL_HOUSE = (3, 2)
+BELOW_STRAIGHT = [(3, 1, 1), (2, 2, 1), (2, 1, 1, 1), (1, 1, 1, 1, 1)]
+
+
+def best_wild_hand(hand, wilds=None):
+    """Return the best 5 card hand (as card strings) from a hand that may
+    hold wild cards. wilds maps each wild card to the list of cards it can
+    stand for; it defaults to the black and red jokers."""
+    wilds = wilds or cards
+    wild = [card for card in hand if card in wilds]
+    fixed = parse([card for card in hand if card not in wilds])
+    if not wild:
+        return to_strings(seven_card.best_hand(fixed))
+    allowed = [set(parse(wilds[card])) - set(fixed) for card in wild]
+    by_rank = [[card for card in fixed if RANK_OF[card] == r]
+               for r in range(13)]
+    free = [set(range(4 * r, 4 * r + 4)) - set(by_rank[r])
+            for r in range(13)]
+    # Only suits with 5 cards among the fixed and the wild cards can flush.
+    by_suit = [set(card for card in fixed if SUIT_OF[card] == j)
+               for j in range(4)]
+    suits = [j for j in range(4) if len(by_suit[j]) + sum(
+        any(SUIT_OF[card] == j for card in a) for a in allowed) >= 5]
+    found = (straight_flush(suits, by_suit, allowed)
+             or of_a_kind(FOUR_OF_A_KIND, by_rank, free, allowed)
+             or of_a_kind(FULL_HOUSE, by_rank, free, allowed)
+             or flush(suits, by_suit, allowed)
+             or straight(by_rank, free, allowed))
+    for counts in BELOW_STRAIGHT:
+        if found:
+            break
+        found = of_a_kind(counts, by_rank, free, allowed)
+    used, slots = found
+    return to_strings(used + substitute(slots, allowed))
+
+
+def straight_flush(suits, by_suit, allowed):
+    """Return (fixed cards, slots) of the best straight flush in one of
+    suits, or None. A slot is the set of cards that may fill one place of
+    the hand."""
+    for ranks in STRAIGHTS:
+        for j in suits:
+            hand = [4 * r + j for r in ranks]
+            slots = [{card} for card in hand if card not in by_suit[j]]
+            if fits(slots, allowed):
+                return [card for card in hand if card in by_suit[j]], slots
+
+
+def flush(suits, by_suit, allowed):
+    "Return (fixed cards, slots) of the best flush in one of suits, or None."
+    best = None
+    for j in suits:
+        ranks = pick_flush(j, by_suit[j], allowed)
+        if ranks and (best is None or ranks > best[0]):
+            best = ranks, j
+    if best:
+        ranks, j = best
+        hand = [4 * r + j for r in ranks]
+        return ([card for card in hand if card in by_suit[j]],
+                [{card} for card in hand if card not in by_suit[j]])
+
+
+def pick_flush(j, held, allowed, ranks=(), slots=()):
+    """Return the 5 highest ranks, highest first, of a flush in suit j
+    that extends ranks, where held are the fixed cards of suit j, or None
+    if there is none."""
+    if len(ranks) == 5:
+        return list(ranks)
+    for r in range(ranks[-1] - 1 if ranks else 12, 3 - len(ranks), -1):
+        # Stop once the cards left at rank r or below cannot make 5.
+        below = sum(1 for card in held if card <= 4 * r + j)
+        if below + len(allowed) - len(slots) < 5 - len(ranks):
+            break
+        card = 4 * r + j
+        more = slots if card in held else slots + ({card},)
+        if fits(more, allowed):
+            found = pick_flush(j, held, allowed, ranks + (r,), more)
+            if found:
+                return found
+
+
+def straight(by_rank, free, allowed):
+    "Return (fixed cards, slots) of the best straight, or None."
+    for ranks in STRAIGHTS:
+        slots = [free[r] for r in ranks if not by_rank[r]]
+        if fits(slots, allowed):
+            return [by_rank[r][0] for r in ranks if by_rank[r]], slots
+
+
+def of_a_kind(counts, by_rank, free, allowed):
+    """Return (fixed cards, slots) of the best hand with one rank for each
+    of counts (such as (3, 2) for a full house), or None."""
+    ranks = pick_ranks(counts, by_rank, free, allowed)
+    if ranks:
+        used, slots = [], []
+        for r, count in zip(ranks, counts):
+            used += by_rank[r][:count]
+            slots += [free[r]] * (count - len(by_rank[r][:count]))
+        return used, slots
+
+
+def pick_ranks(counts, by_rank, free, allowed, ranks=(), slots=()):
+    """Return the best ranks for counts, after the ranks already picked,
+    or None. Ranks with the same count are picked highest first."""
+    if len(ranks) == len(counts):
+        return list(ranks)
+    count = counts[len(ranks)]
+    top = 12
+    if ranks and counts[len(ranks) - 1] == count:
+        top = ranks[-1] - 1
+    for r in range(top, -1, -1):
+        if r in ranks:
+            continue
+        missing = count - len(by_rank[r])
+        more = slots + (free[r],) * missing if missing > 0 else slots
+        if fits(more, allowed):
+            found = pick_ranks(counts, by_rank, free, allowed, ranks + (r,),
+                               more)
+            if found:
+                return found
+
+
+def fits(slots, allowed):
+    """Can different wild cards fill the slots with different cards? Every
+    candidate substitution best_wild_hand considers is checked here."""
+    return len(slots) <= len(allowed) and (
+        not slots or substitute(list(slots), allowed) is not None)
+
+
+def substitute(slots, allowed, chosen=(), taken=()):
+    """Pick one card from each slot (a set of acceptable cards) so that all
+    the cards differ and each is allowed by a different wild card. Return
+    the picked cards, or None if there is no way to do it."""
+    if not slots:
+        return []
+    for i, cards_allowed in enumerate(allowed):
+        if i in taken:
+            continue
+        for card in sorted(slots[0] & cards_allowed, reverse=True):
+            if card in chosen:
+                continue
+            rest = substitute(slots[1:], allowed, chosen + (card,),
+                              taken + (i,))
+            if rest is not None:
+                return [card] + rest
     return None
 
 
-def two_pair(ranks):
-    """If there are two pair here, return the two
-    ranks of the two pairs, else None."""
-    pair = kind(2, ranks)
-    lowpair = kind(2, list(reversed(ranks)))
-    if pair and lowpair != pair:
-        return (pair, lowpair)
-    else:
-        return None
-
-
-def best_hand(hand):
-    return max(itertools.combinations(hand, 5), key=hand_rank)
-
-# my solution
-def best_wild_hand(hand):
-    """Try all values for jokers in all 5-card selections."""
-    joker = filter(lambda card: '?' in card, hand)
-    left = filter(lambda card: '?' not in card, hand)
-
-    # get combinations of wild cards when they are more
-    new_cards = []
-    for joker_card in joker:
-        ranks = 'AKQJT98765432'
-        suits = {
-            'B': 'CS',
-            'R': 'HD',
-        }
-        ranks = ranks[:ranks.index(left[-1][0]) + 1]
-        new_cards.append([
-            t[0] + t[1] for t in itertools.product(ranks, suits[joker_card[1]])])
-
-    if joker:
-        all_cards = [list(i) for i in itertools.product(*new_cards)]
-        result = []
-        for card_set in all_cards:
-            if len(filter(lambda x: x not in left, card_set)) == len(joker):
-                new_hand = list(itertools.chain(left, card_set))
-                result.append(best_hand(new_hand))
-        return max(result, key=hand_rank)
-    return best_hand(left)
-
-
 # teacher's solution
 allranks = '23456789TJQKA'
 cards = {
@@ -132,10 +199,16 @@ cards = {
 
 def best_wild_hand_teacher(hand):
     hands = set(
-        best_hand(h) for h in itertools.product(*map(replacements, hand)))
+        tuple(best_hand(h))
+        for h in itertools.product(*map(replacements, hand))
+        if len(set(h)) == len(h))
     return max(hands, key=hand_rank)
 
 
+# any deuce can stand for any card
+deuces_wild = {'2' + s: DECK for s in 'SHDC'}
+
+
 def replacements(card):
     """Return list of all possible replacements for a card."""
     if card in cards:
@@ -153,4 +226,5 @@ def test_best_wild_hand():
     return 'test_best_wild_hand passes'
 
 
-print(test_best_wild_hand())
+if __name__ == '__main__':
+    print(test_best_wild_hand())
@@ -0,0 +1,391 @@
+'''A batching evaluation server and its client, over JSON lines.
+
+Every request is one JSON object on one line and gets one JSON line
+back, tagged with the request's id (replies may come out of order):
+
+    {"id": 1, "op": "hand_rank", "hand": ["AS", "KS", "QS", "JS", "TS"]}
+    {"id": 1, "result": [8, 14]}
+
+The operations are
+
+    hand_rank       hand          poker.hand_rank of a 5-card hand
+    best_hand       hand          best 5 cards of 5 to 7 cards
+    best_wild_hand  hand          best 5 cards, with '?B'/'?R' jokers
+    poker           hands         winning positions among 5-card hands
+    showdown        board, holes  winning positions on a hold'em board
+    stats           -             request, batch and latency figures
+
+Failed requests get {"id": ..., "error": "..."} instead.
+
+The server puts requests on a bounded queue. A batcher takes whatever
+arrives within a short window (up to a maximum batch size), groups it by
+operation and hands each group to the backend in one call: a process
+pool, or this process with workers=1. hand_rank batches go through the
+vectorized batch module when NumPy is installed. When the queue is full,
+connections stop being read until it drains, so clients slow down
+instead of the server running out of memory; at most two batches per
+worker are in flight. Everything listens on localhost only:
+
+    python service.py serve --port 8765
+    python service.py bench --port 8765 --requests 20000 --concurrency 200
+'''
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import hand_cache
+import hand_lookup
+import incremental
+import replace_wild_cards
+import seven_card
+from cards import DECK, parse, to_strings
+from poker import winners
+
+try:
+    import batch
+except ImportError:  # NumPy is not installed
+    batch = None
+
+HOST = '127.0.0.1'
+PORT = 8765
+WINDOW = 0.002     # seconds to wait for a batch to fill
+MAX_BATCH = 1024   # requests per batch
+QUEUE_SIZE = 10000
+LATENCIES = 10000  # latencies kept for the percentiles
+VECTOR_MIN = 64    # hand_rank batches at least this big use NumPy
+
+
+def checked(hand, sizes=(5, 6, 7), wilds=()):
+    """Return hand after checking it is a list of a valid number of cards
+    in which no card other than a wild card repeats."""
+    if not isinstance(hand, list) or len(hand) not in sizes:
+        raise ValueError('need a list of %s cards'
+                         % ' or '.join(map(str, sizes)))
+    fixed = parse([card for card in hand if card not in wilds])
+    if len(set(fixed)) != len(fixed):
+        raise ValueError('a card is dealt twice')
+    return hand
+
+
+def poker_positions(hands):
+    "Return the positions of the best 5-card hands."
+    if not isinstance(hands, list) or not hands:
+        raise ValueError('need a list of hands')
+    checked([card for hand in hands for card in checked(hand, (5,))],
+            range(5, 53))
+    return winners([hand_lookup.evaluate(hand) for hand in hands],
+                   indices=True)[2]
+
+
+def showdown_positions(board, holes):
+    "Return the winning positions on a hold'em board."
+    if not isinstance(board, list) or not isinstance(holes, list) or \
+            not holes or not all(isinstance(hole, list) for hole in holes):
+        raise ValueError('need a board and a list of hole cards')
+    checked(board + [card for hole in holes for card in hole], range(5, 53))
+    return incremental.showdown(board, holes)
+
+
+OPS = {
+    'hand_rank': lambda request: hand_lookup.hand_rank(
+        checked(request['hand'], (5,))),
+    'best_hand': lambda request: to_strings(
+        seven_card.best_hand(checked(request['hand']))),
+    'best_wild_hand': lambda request: hand_cache.best_wild_hand(
+        checked(request['hand'], wilds=replace_wild_cards.cards)),
+    'poker': lambda request: poker_positions(request['hands']),
+    'showdown': lambda request: showdown_positions(request['board'],
+                                                   request['holes']),
+}
+
+
+def run_one(op, request):
+    "Return {'result': ...} or {'error': ...} for one request."
+    try:
+        return {'result': OPS[op](request)}
+    except Exception as e:  # a bad request fails alone, not its batch
+        return {'error': '%s: %s' % (type(e).__name__, e)}
+
+
+def run_batch(op, requests):
+    "Evaluate a batch of requests for the same operation."
+    if op == 'hand_rank' and batch is not None and \
+            len(requests) >= VECTOR_MIN:
+        try:
+            hands = [checked(request['hand'], (5,)) for request in requests]
+            scores = batch.evaluate(batch.encode(hands))
+        except (KeyError, TypeError, ValueError):
+            pass  # some hand is malformed: fall back to one at a time
+        else:
+            return [{'result': hand_lookup.rank_tuple(score)}
+                    for score in scores.tolist()]
+    return [run_one(op, request) for request in requests]
+
+
+class Server:
+    """The batching server. workers sizes the pool that evaluates batches
+    as in equity.equity(), except that 1 runs them in a thread."""
+
+    def __init__(self, workers=None, window=WINDOW, max_batch=MAX_BATCH,
+                 queue_size=QUEUE_SIZE):
+        self.workers = workers
+        self.window = window
+        self.max_batch = max_batch
+        self.queue_size = queue_size
+        self.latencies = deque(maxlen=LATENCIES)
+        self.requests = self.batches = 0
+
+    async def start(self, host=HOST, port=PORT):
+        "Start listening; return the asyncio server (port 0 picks one)."
+        self.queue = asyncio.Queue(self.queue_size)
+        if self.workers == 1:
+            self.executor = ThreadPoolExecutor(1)
+        else:
+            self.executor = ProcessPoolExecutor(self.workers)
+        workers = 1 if self.workers == 1 else self.workers or os.cpu_count()
+        self.slots = asyncio.Semaphore(2 * (workers or 1))
+        self.batcher = asyncio.ensure_future(self.batch_loop())
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server
+
+    async def close(self):
+        "Stop listening, stop batching and shut the backend down."
+        self.server.close()
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+        self.executor.shutdown()
+
+    async def handle(self, reader, writer):
+        "Serve one connection."
+        pending = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                t0 = time.perf_counter()
+                request = None
+                try:
+                    request = json.loads(line)
+                    op = request['op']
+                    if op != 'stats' and op not in OPS:
+                        raise KeyError(op)
+                except (ValueError, KeyError, TypeError) as e:
+                    request_id = (request.get('id')
+                                  if isinstance(request, dict) else None)
+                    self.reply(writer, request_id,
+                               {'error': 'bad request: %r' % e})
+                    continue
+                if op == 'stats':
+                    self.reply(writer, request.get('id'),
+                               {'result': self.stats()})
+                    continue
+                future = asyncio.get_running_loop().create_future()
+                await self.queue.put((op, request, future))
+                task = asyncio.ensure_future(
+                    self.respond(writer, request.get('id'), future, t0))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+                if writer.transport.get_write_buffer_size() > 1 << 16:
+                    await writer.drain()
+            if pending:
+                await asyncio.gather(*pending)
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, writer, request_id, future, t0):
+        "Wait for a request's result and send it."
+        response = await future
+        self.latencies.append(time.perf_counter() - t0)
+        self.reply(writer, request_id, response)
+
+    def reply(self, writer, request_id, response):
+        "Write one response line."
+        if not writer.is_closing():
+            writer.write((json.dumps(dict(response, id=request_id)) + '\n')
+                         .encode())
+
+    async def batch_loop(self):
+        "Gather requests into batches and hand them to the backend."
+        loop = asyncio.get_running_loop()
+        while True:
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.window
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(),
+                                                        timeout))
+                except asyncio.TimeoutError:
+                    break
+            groups = {}
+            for op, request, future in items:
+                groups.setdefault(op, []).append((request, future))
+            for op, group in groups.items():
+                await self.slots.acquire()
+                task = loop.run_in_executor(
+                    self.executor, run_batch, op,
+                    [request for request, _ in group])
+                task.add_done_callback(
+                    lambda done, group=group: self.finish(done, group))
+            self.requests += len(items)
+            self.batches += len(groups)
+
+    def finish(self, done, group):
+        "Pass a batch's results to the waiting requests."
+        self.slots.release()
+        try:
+            results = done.result()
+        except Exception as e:  # the whole batch failed, e.g. a dead worker
+            results = [{'error': '%s: %s' % (type(e).__name__, e)}] * len(
+                group)
+        for (_, future), result in zip(group, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        "Return request and batch counts and latency percentiles in ms."
+        latencies = sorted(self.latencies)
+        result = {'requests': self.requests, 'batches': self.batches,
+                  'mean_batch': self.requests / self.batches
+                  if self.batches else 0.0,
+                  'queued': self.queue.qsize()}
+        if latencies:
+            for p in (50, 90, 99):
+                index = min(len(latencies) - 1, len(latencies) * p // 100)
+                result['p%d_ms' % p] = 1000 * latencies[index]
+            result['mean_ms'] = 1000 * statistics.fmean(latencies)
+        return result
+
+
+class Client:
+    """Client for the server. Requests can be pipelined: every call sends
+    one line and waits for the reply with the matching id.
+
+        client = await Client.connect(port=port)
+        await client.request('best_hand', hand=['AS', ...])
+    """
+
+    def __init__(self, reader, writer):
+        self.reader, self.writer = reader, writer
+        self.ids = itertools.count()
+        self.waiting = {}
+        self.listener = asyncio.ensure_future(self.listen())
+
+    @classmethod
+    async def connect(cls, host=HOST, port=PORT):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def listen(self):
+        "Pass every response line to the request waiting for it."
+        while True:
+            line = await self.reader.readline()
+            if not line:
+                break
+            response = json.loads(line)
+            future = self.waiting.pop(response['id'], None)
+            if future is not None and not future.done():
+                future.set_result(response)
+        for future in self.waiting.values():
+            future.set_exception(ConnectionError('server closed'))
+
+    async def call(self, op, **fields):
+        "Send a request and return the whole response dict."
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        self.writer.write((json.dumps(dict(fields, id=request_id, op=op))
+                           + '\n').encode())
+        await self.writer.drain()
+        return await future
+
+    async def request(self, op, **fields):
+        "Send a request and return its result; raise ValueError on errors."
+        response = await self.call(op, **fields)
+        if 'error' in response:
+            raise ValueError(response['error'])
+        return response['result']
+
+    async def close(self):
+        self.writer.close()
+        self.listener.cancel()
+        try:
+            await self.listener
+        except asyncio.CancelledError:
+            pass
+
+
+async def bench(host=HOST, port=PORT, requests=10000, concurrency=100,
+                op='best_hand', seed=0):
+    """Send requests random requests from concurrency pipelined senders
+    and return (requests per second, server stats)."""
+    rng = random.Random(seed)
+    size = {'hand_rank': 5, 'best_hand': 7}.get(op, 7)
+    hands = [rng.sample(DECK, size) for _ in range(requests)]
+    client = await Client.connect(host, port)
+    t0 = time.perf_counter()
+
+    async def sender(start):
+        for hand in hands[start::concurrency]:
+            await client.request(op, hand=hand)
+
+    await asyncio.gather(*[sender(i) for i in range(concurrency)])
+    elapsed = time.perf_counter() - t0
+    stats = await client.request('stats')
+    await client.close()
+    return requests / elapsed, stats
+
+
+async def serve(host, port, **options):
+    server = Server(**options)
+    listener = await server.start(host, port)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('command', choices=['serve', 'bench'])
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--window', type=float, default=WINDOW)
+    parser.add_argument('--max-batch', type=int, default=MAX_BATCH)
+    parser.add_argument('--queue-size', type=int, default=QUEUE_SIZE)
+    parser.add_argument('--requests', type=int, default=10000)
+    parser.add_argument('--concurrency', type=int, default=100)
+    parser.add_argument('--op', default='best_hand',
+                        choices=['hand_rank', 'best_hand'])
+    options = parser.parse_args(argv)
+    if options.command == 'serve':
+        asyncio.run(serve(options.host, options.port,
+                          workers=options.workers, window=options.window,
+                          max_batch=options.max_batch,
+                          queue_size=options.queue_size))
+    else:
+        rate, stats = asyncio.run(bench(options.host, options.port,
+                                        options.requests, options.concurrency,
+                                        options.op))
+        print('%.0f requests/s' % rate)
+        print(json.dumps(stats, indent=2, sort_keys=True))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+'''Native evaluator for hands of 5 to 7 cards.
+
+Instead of ranking all 21 5-card combinations of a 7-card hand, the cards
+are tallied once into a rank histogram and four per-suit rank bitmasks.
+The best category and its kickers are read straight off those, turned
+into a prime product and looked up in the hand_lookup tables, so scores
+are the same integers hand_lookup.evaluate returns for 5-card hands.
+The winning 5 cards are only reconstructed when best_hand asks for them.
+'''
+from cards import RANK_OF, SUIT_OF
+from hand_lookup import (
+    PRIMES, CLASS_RANKS, FLUSHES, OTHERS, prime_product)
+
+WHEEL = 0b1000000001111  # A-5-4-3-2
+
+
+def top_ranks(mask, n):
+    "Return the n highest rank indices set in a 13-bit rank mask."
+    ranks = []
+    r = 12
+    while len(ranks) < n and r >= 0:
+        if mask >> r & 1:
+            ranks.append(r)
+        r -= 1
+    return ranks
+
+
+def straight_high(mask):
+    """Return the rank index of the highest straight in a rank mask
+    (3 for the wheel), or -1 if there is none."""
+    for high in range(12, 3, -1):
+        if mask >> (high - 4) & 0b11111 == 0b11111:
+            return high
+    return 3 if mask & WHEEL == WHEEL else -1
+
+
+def straight_ranks(high):
+    "Return the rank indices of the straight topped by rank index high."
+    if high == 3:
+        return (12, 3, 2, 1, 0)
+    return tuple(range(high, high - 5, -1))
+
+
+# Per-mask tables over all 8192 rank masks.
+POPCOUNT = [bin(mask).count('1') for mask in range(1 << 13)]
+STRAIGHT = [straight_high(mask) for mask in range(1 << 13)]
+STRAIGHT_KEY = {high: prime_product(straight_ranks(high))
+                for high in range(3, 13)}
+TOP = {n: [prime_product(top_ranks(mask, n)) for mask in range(1 << 13)]
+       for n in (1, 2, 3, 5)}
+
+
+def tally(hand):
+    "Return (counts, suits): the rank histogram and per-suit rank masks."
+    counts = [0] * 13
+    suits = [0, 0, 0, 0]
+    for card in hand:
+        r = RANK_OF[card]
+        counts[r] += 1
+        suits[SUIT_OF[card]] |= 1 << r
+    return counts, suits
+
+
+def score(counts, suits):
+    """Return the score of the best 5-card hand that can be made from
+    the cards described by a rank histogram and per-suit rank masks."""
+    flush = 0
+    for mask in suits:
+        if POPCOUNT[mask] >= 5:
+            flush = mask
+            high = STRAIGHT[mask]
+            if high >= 0:
+                return FLUSHES[STRAIGHT_KEY[high]]
+    groups = sorted(((c, r) for r, c in enumerate(counts) if c),
+                    reverse=True)
+    most, first = groups[0]
+    second = groups[1][0] if len(groups) > 1 else 0
+    ranks = suits[0] | suits[1] | suits[2] | suits[3]
+    if most == 4:
+        return OTHERS[PRIMES[first] ** 4 * TOP[1][ranks & ~(1 << first)]]
+    if most == 3 and second >= 2:
+        return OTHERS[PRIMES[first] ** 3 * PRIMES[groups[1][1]] ** 2]
+    if flush:
+        return FLUSHES[TOP[5][flush]]
+    high = STRAIGHT[ranks]
+    if high >= 0:
+        return OTHERS[STRAIGHT_KEY[high]]
+    if most == 3:
+        return OTHERS[PRIMES[first] ** 3 * TOP[2][ranks & ~(1 << first)]]
+    if most == 2 and second == 2:
+        low = groups[1][1]
+        rest = ranks & ~(1 << first) & ~(1 << low)
+        return OTHERS[PRIMES[first] ** 2 * PRIMES[low] ** 2 * TOP[1][rest]]
+    if most == 2:
+        return OTHERS[PRIMES[first] ** 2 * TOP[3][ranks & ~(1 << first)]]
+    return OTHERS[TOP[5][ranks]]
+
+
+def group_masks(counts):
+    """Return groups: groups[c] is the rank mask of the ranks held exactly
+    c times, for c from 0 to 4."""
+    groups = [0] * 5
+    for r, c in enumerate(counts):
+        groups[c] |= 1 << r
+    return groups
+
+
+def score_groups(suits, groups):
+    """Like score(), from per-suit rank masks and group_masks(counts).
+    No sorting is needed, and adding a card of rank r only moves bit r
+    from groups[c] to groups[c + 1], so callers can keep groups up to
+    date incrementally. Holds for up to 7 cards."""
+    flush = 0
+    for mask in suits:
+        if POPCOUNT[mask] >= 5:
+            flush = mask
+            high = STRAIGHT[mask]
+            if high >= 0:
+                return FLUSHES[STRAIGHT_KEY[high]]
+            break
+    pairs, trips, quads = groups[2], groups[3], groups[4]
+    ranks = suits[0] | suits[1] | suits[2] | suits[3]
+    if quads:
+        first = quads.bit_length() - 1
+        return OTHERS[PRIMES[first] ** 4 * TOP[1][ranks & ~(1 << first)]]
+    if trips:
+        first = trips.bit_length() - 1
+        rest = trips & ~(1 << first) | pairs
+        if rest:
+            second = rest.bit_length() - 1
+            return OTHERS[PRIMES[first] ** 3 * PRIMES[second] ** 2]
+    if flush:
+        return FLUSHES[TOP[5][flush]]
+    high = STRAIGHT[ranks]
+    if high >= 0:
+        return OTHERS[STRAIGHT_KEY[high]]
+    if trips:
+        return OTHERS[PRIMES[first] ** 3 * TOP[2][ranks & ~(1 << first)]]
+    if pairs:
+        first = pairs.bit_length() - 1
+        rest = pairs & ~(1 << first)
+        if rest:
+            low = rest.bit_length() - 1
+            rest = ranks & ~(1 << first) & ~(1 << low)
+            return OTHERS[PRIMES[first] ** 2 * PRIMES[low] ** 2
+                          * TOP[1][rest]]
+        return OTHERS[PRIMES[first] ** 2 * TOP[3][ranks & ~(1 << first)]]
+    return OTHERS[TOP[5][ranks]]
+
+
+def evaluate(hand):
+    "Return the score of the best 5-card hand within a 5 to 7 card hand."
+    return score(*tally(hand))
+
+
+def best_hand(hand):
+    "From a 5 to 7 card hand, return the best 5 card hand."
+    ranks, is_flush = CLASS_RANKS[evaluate(hand)]
+    if is_flush:
+        suit = max(range(4), key=lambda j: sum(
+            SUIT_OF[card] == j for card in hand))
+        return [card for card in hand
+                if SUIT_OF[card] == suit and RANK_OF[card] in ranks]
+    needed = list(ranks)
+    result = []
+    for card in hand:
+        if RANK_OF[card] in needed:
+            needed.remove(RANK_OF[card])
+            result.append(card)
+    return result
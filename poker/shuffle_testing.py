@@ -1,5 +1,9 @@
+import math
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from math import factorial
+
 from poker import *  # noqa
-from collections import defaultdict
 
 
 def shuffle2(deck):  # O(n^2) OK
@@ -17,22 +21,111 @@ def shuffle3(deck):  # O(n) BAD
         swap(deck, i, random.randrange(n))
 
 
-def test_shuffler(shuffler, deck='abcd', n=10000):
-    counts = defaultdict(int)
-    for _ in range(n):
-        input = list(deck)
-        shuffler(input)
-        counts[''.join(input)] += 1
-    expected = n * 1. / factorial(len(deck))  # expected count
-    ok = all(
-        (0.9 <= counts[item] / expected <= 1.1)
-        for item in counts)
+# Beyond this many cards a table of counts per permutation gets too big,
+# and only the position counts are checked.
+MAX_PERMUTATION_DECK = 9
+
+Stats = namedtuple('Stats', 'trials permutations positions bias')
+ChiSquare = namedtuple('ChiSquare', 'statistic df p')
+
+
+def lehmer_index(perm):
+    """Return the position (0 to n! - 1) of a permutation of range(n) in
+    lexicographic order, computed from its Lehmer code."""
+    n = len(perm)
+    index = 0
+    for i, item in enumerate(perm):
+        smaller = sum(1 for later in perm[i + 1:] if later < item)
+        index += smaller * factorial(n - 1 - i)
+    return index
+
+
+def chi_square(observed, expected):
+    """Return the ChiSquare of counts against one expected count per cell,
+    with degrees of freedom len(observed) - 1. The p-value uses the
+    Wilson-Hilferty normal approximation."""
+    statistic = sum((count - expected) ** 2 for count in observed) / expected
+    return ChiSquare(statistic, len(observed) - 1,
+                     chi_square_p(statistic, len(observed) - 1))
+
+
+def chi_square_p(statistic, df):
+    "Return the upper tail probability of a chi-square statistic."
+    if df < 1:
+        return 1.0
+    k = 2.0 / (9 * df)
+    z = ((statistic / df) ** (1.0 / 3) - (1 - k)) / math.sqrt(k)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def count_shuffles(shuffler, n, trials, seed):
+    """Shuffle range(n) trials times and return (permutation counts indexed
+    by Lehmer code, or None for big decks; card-by-position counts).
+    The shufflers draw from the random module, which is seeded with seed
+    and restored to its previous state afterwards."""
+    state = random.getstate()
+    random.seed(seed)
+    positions = [0] * (n * n)
+    permutations = [0] * factorial(n) if n <= MAX_PERMUTATION_DECK else None
+    try:
+        for _ in range(trials):
+            deck = list(range(n))
+            shuffler(deck)
+            for position, card in enumerate(deck):
+                positions[card * n + position] += 1
+            if permutations is not None:
+                permutations[lehmer_index(deck)] += 1
+    finally:
+        random.setstate(state)
+    return permutations, positions
+
+
+def shuffle_stats(shuffler, n, trials, workers=None, seed=0, chunk=50000):
+    """Shuffle an n card deck trials times, in chunks spread over a process
+    pool, and return Stats: chi-square tests of the permutation counts
+    (None above MAX_PERMUTATION_DECK cards) and of the card-by-position
+    counts, and the largest relative deviation of a position count."""
+    sizes = [min(chunk, trials - start) for start in range(0, trials, chunk)]
+    args = ([shuffler] * len(sizes), [n] * len(sizes), sizes,
+            ['%s:%d' % (seed, i) for i in range(len(sizes))])
+    if workers == 1:
+        results = list(map(count_shuffles, *args))
+    else:
+        with ProcessPoolExecutor(workers) as executor:
+            results = list(executor.map(count_shuffles, *args))
+    positions = [sum(cells) for cells in zip(*[r[1] for r in results])]
+    expected = trials / float(n)
+    # Every row and column of the card-by-position table sums to trials,
+    # so each cell's variance is expected * (n - 1) / n and the sum has
+    # (n - 1) ** 2 degrees of freedom once scaled by (n - 1) / n.
+    statistic = sum((count - expected) ** 2 for count in positions) / expected
+    statistic *= (n - 1) / float(n)
+    df = (n - 1) ** 2
+    bias = max(abs(count / expected - 1) for count in positions)
+    permutations = None
+    if results[0][0] is not None:
+        counts = [sum(cells) for cells in zip(*[r[0] for r in results])]
+        permutations = chi_square(counts, trials / float(factorial(n)))
+    return Stats(trials, permutations,
+                 ChiSquare(statistic, df, chi_square_p(statistic, df)), bias)
+
+
+def test_shuffler(shuffler, deck='abcd', n=10000, alpha=0.001, workers=1):
+    """Shuffle deck n times and report whether the permutation and position
+    counts are consistent with a uniform shuffle at significance alpha."""
+    stats = shuffle_stats(shuffler, len(deck), n, workers=workers)
+    tests = [stats.positions]
+    if stats.permutations is not None:
+        tests.append(stats.permutations)
+    ok = all(test.p >= alpha for test in tests)
     name = shuffler.__name__
     print('%s(%s) %s' % (name, deck, ('ok' if ok else '*** BAD ***')))
-    print('    ')
-    for item, count in sorted(counts.items()):
-        print('%s:%4.1f' % (item, count * 100.0 / n))
+    for label, test in zip(('positions', 'permutations'), tests):
+        print('    %s: chi2 = %.1f, df = %d, p = %.4f' % (
+            label, test.statistic, test.df, test.p))
+    print('    max position bias: %.2f%%' % (stats.bias * 100))
     print()
+    return ok
 
 
 def test_shufflers(
@@ -43,9 +136,5 @@ def test_shufflers(
             test_shuffler(func, deck)
 
 
-def factorial(n):
-    return 1 if n < 2 else n * factorial(n - 1)
-
-
 if __name__ == '__main__':
     test_shufflers()
@@ -0,0 +1,83 @@
+import random
+import unittest
+import seven_card
+
+try:
+    import batch
+except ImportError:  # NumPy is not installed
+    batch = None
+
+
+@unittest.skipIf(batch is None, 'requires numpy')
+class TestBatchEvaluate(unittest.TestCase):
+    '''Test evaluate() against the per-hand evaluator.'''
+
+    def test_keys_are_sorted(self):
+        '''Test class keys are strictly increasing with score'''
+        self.assertTrue(all(a < b for a, b in
+                            zip(batch.KEYS.tolist(), batch.KEYS[1:].tolist())))
+
+    def test_random_hands(self):
+        '''Test random 5, 6 and 7 card hands'''
+        rng = random.Random(3)
+        deck = [r + s for r in '23456789TJQKA' for s in 'SHDC']
+        for n in (5, 6, 7):
+            hands = [rng.sample(deck, n) for _ in range(3000)]
+            self.assertEqual(
+                batch.evaluate(batch.encode(hands)).tolist(),
+                [seven_card.evaluate(hand) for hand in hands])
+
+    def test_encode_decode(self):
+        '''Test encode() and decode() round trip'''
+        hands = ['AS KH QD JC TS'.split(), '2S 2H 2D 2C 3S'.split()]
+        self.assertEqual(batch.decode(batch.encode(hands)), hands)
+
+    def test_bad_shape(self):
+        '''Test evaluate() rejects 4-card hands'''
+        with self.assertRaises(ValueError):
+            batch.evaluate(batch.encode(['AS KH QD JC'.split()]))
+
+
+@unittest.skipIf(batch is None, 'requires numpy')
+class TestBatchPoker(unittest.TestCase):
+    '''Test the batched poker() returns winner indices per table.'''
+
+    def test_poker(self):
+        '''Test ties and single winners'''
+        sf1 = '6C 7C 8C 9C TC'.split()
+        sf2 = '6D 7D 8D 9D TD'.split()
+        fk = '9D 9H 9S 9C 7D'.split()
+        fh = 'TD TC TH 7C 7D'.split()
+        tables = batch.encode([sf1, sf2, fk, fk, fh, sf2]).reshape(2, 3, 5)
+        result = batch.poker(tables)
+        self.assertEqual([list(row) for row in result], [[0, 1], [2]])
+
+
+@unittest.skipIf(batch is None, 'requires numpy')
+class TestBatchDeal(unittest.TestCase):
+    '''Test deal() deals many independent deals at once.'''
+
+    def test_distinct_cards(self):
+        '''Test every deal holds distinct cards'''
+        deals = batch.deal(500, 4, 7, rng=1)
+        self.assertEqual(deals.shape, (500, 4, 7))
+        for cards in deals.reshape(500, 28).tolist():
+            self.assertEqual(len(set(cards)), 28)
+            self.assertTrue(all(0 <= card < 52 for card in cards))
+
+    def test_into_preallocated_array(self):
+        '''Test deal() fills an array passed as out'''
+        out = batch.np.zeros((10, 2, 5), dtype=batch.np.int16)
+        self.assertIs(batch.deal(10, 2, out=out, rng=3), out)
+        self.assertEqual(batch.deal(10, 2, rng=3).tolist(), out.tolist())
+
+    def test_remaining_deck(self):
+        '''Test dealing from a partial deck'''
+        deck = batch.np.arange(10)
+        deals = batch.deal(100, 2, 5, deck=deck, rng=2)
+        self.assertEqual(sorted(deals[0].ravel().tolist()), list(range(10)))
+        self.assertEqual(deck.tolist(), list(range(10)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+import cards
+import poker
+import hand_lookup
+import seven_card
+
+
+class TestCards(unittest.TestCase):
+    '''Test conversions between card strings, ids and masks.'''
+
+    def test_deck_order(self):
+        '''Test card ids follow the 4 * rank + suit layout'''
+        self.assertEqual(cards.card_id('2S'), 0)
+        self.assertEqual(cards.card_id('2C'), 3)
+        self.assertEqual(cards.card_id('AC'), 51)
+        self.assertEqual(cards.card_str(48), 'AS')
+
+    def test_parse(self):
+        '''Test parse() accepts strings, lists and ids'''
+        self.assertEqual(cards.parse('AS KH'), [48, 45])
+        self.assertEqual(cards.parse(['AS', 45]), [48, 45])
+        self.assertEqual(cards.to_strings([48, 'KH']), ['AS', 'KH'])
+
+    def test_masks(self):
+        '''Test to_mask() and from_mask() round trip'''
+        hand = cards.parse('2S TD AC')
+        self.assertEqual(cards.to_mask(hand), 1 | 1 << 34 | 1 << 51)
+        self.assertEqual(cards.from_mask(cards.to_mask(hand)), hand)
+
+
+class TestEitherForm(unittest.TestCase):
+    '''Test evaluators give the same answer for strings and ids.'''
+
+    def setUp(self):
+        self.hands = ['6C 7C 8C 9C TC'.split(), 'TD TC TH 7C 7D'.split(),
+                      '6C 7D 7C 6D TC'.split(), 'AS 2D 3C 4H 5S'.split()]
+
+    def test_hand_rank(self):
+        '''Test poker.hand_rank() and hand_lookup.evaluate()'''
+        for hand in self.hands:
+            ids = cards.parse(hand)
+            self.assertEqual(poker.hand_rank(ids), poker.hand_rank(hand))
+            self.assertEqual(hand_lookup.evaluate(ids),
+                             hand_lookup.evaluate(hand))
+
+    def test_best_hand(self):
+        '''Test seven_card.best_hand() returns cards in the given form'''
+        ids = cards.parse('JD TC TH 7C 7D 7S 7H')
+        self.assertEqual(sorted(cards.to_strings(seven_card.best_hand(ids))),
+                         ['7C', '7D', '7H', '7S', 'JD'])
+
+
+if __name__ == '__main__':
+    unittest.main()
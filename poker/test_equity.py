@@ -0,0 +1,55 @@
+import unittest
+from equity import equity
+
+
+class TestEquity(unittest.TestCase):
+    '''Test the Monte Carlo equity simulator.'''
+
+    def test_complete_board(self):
+        '''Test a fully dealt board has a certain result'''
+        result = equity(['AS AH', 'KS KH'], board='AD KD 2C 7S 9H',
+                        trials=50, workers=1, seed=1)
+        self.assertEqual([e.win for e in result], [1.0, 0.0])
+        self.assertEqual([e.loss for e in result], [0.0, 1.0])
+
+    def test_split_pot(self):
+        '''Test a board that plays splits the pot'''
+        result = equity(['2S 3H', '2D 3C'], board='AS KS QS JS TS',
+                        trials=20, workers=1, seed=1)
+        self.assertEqual([e.tie for e in result], [1.0, 1.0])
+        self.assertEqual([e.equity for e in result], [0.5, 0.5])
+
+    def test_reproducible_across_workers(self):
+        '''Test a seed gives the same answer in and out of process'''
+        args = (['AS AH', 'KS KH'],)
+        kwargs = dict(trials=3000, seed=42, chunk=1000)
+        self.assertEqual(equity(*args, workers=1, **kwargs),
+                         equity(*args, workers=2, **kwargs))
+
+    def test_aces_beat_kings(self):
+        '''Test the confidence interval holds the known equity'''
+        result = equity(['AS AH', 'KS KH'], trials=4000, workers=1, seed=7)
+        self.assertTrue(result[0].low < 0.82 < result[0].high)
+
+    def test_precision_stops_early(self):
+        '''Test precision mode stops before the trial limit'''
+        result = equity(['AS AH', '7C 2D'], trials=100000, workers=1,
+                        seed=3, precision=0.02, chunk=500)
+        self.assertLess(result[0].trials, 100000)
+        self.assertLessEqual(result[0].high - result[0].equity, 0.02)
+
+    def test_no_trials(self):
+        '''Test zero trials or an empty chunk size is refused'''
+        for kwargs in (dict(trials=0), dict(trials=0, precision=0.01),
+                       dict(trials=100, chunk=0)):
+            with self.assertRaises(ValueError):
+                equity(['AS AH', 'KS KH'], workers=1, **kwargs)
+
+    def test_duplicate_cards(self):
+        '''Test duplicate cards are rejected'''
+        with self.assertRaises(ValueError):
+            equity(['AS AH', 'AS KH'], trials=10, workers=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
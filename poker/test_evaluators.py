@@ -0,0 +1,78 @@
+import random
+import unittest
+import evaluators
+import poker
+from cards import DECK
+from evaluators import Backend
+
+
+class TestEvaluators(unittest.TestCase):
+    '''Test every backend against the reference and the registry itself.'''
+
+    def setUp(self):
+        self.previous = evaluators.current()
+
+    def tearDown(self):
+        evaluators._backend = self.previous
+
+    def test_backends_agree(self):
+        '''Test every backend ranks random hands like the reference'''
+        rng = random.Random(23)
+        fives = [rng.sample(DECK, 5) for _ in range(300)]
+        sevens = [rng.sample(DECK, 7) for _ in range(100)]
+        reference = evaluators.BACKENDS['reference']
+        expected5 = [poker.hand_rank(hand) for hand in fives]
+        expected7 = reference.hand_ranks(sevens)
+        for name in evaluators.PREFERENCE:
+            backend = evaluators.BACKENDS[name]
+            self.assertEqual([backend.hand_rank(hand) for hand in fives],
+                             expected5, name)
+            self.assertEqual(backend.hand_ranks(sevens), expected7, name)
+            self.assertEqual(backend.hand_ranks([]), [], name)
+            best = [backend.best_hand(hand) for hand in sevens]
+            self.assertEqual([poker.hand_rank(hand) for hand in best],
+                             expected7, name)
+            self.assertTrue(all(type(hand) is list for hand in best), name)
+
+    def test_use(self):
+        '''Test switching backends by name'''
+        self.assertEqual(evaluators.use('reference').name, 'reference')
+        self.assertIs(evaluators.current(), evaluators.BACKENDS['reference'])
+        self.assertEqual(evaluators.hand_rank('AS KS QS JS TS'.split()),
+                         (8, 14))
+        self.assertEqual(evaluators.use().name, evaluators.PREFERENCE[0])
+        self.assertRaises(ValueError, evaluators.use, 'abacus')
+        self.assertRaises(ValueError, evaluators.use, None, 'abacus')
+
+    def test_verify(self):
+        '''Test verify mode catches a backend that disagrees'''
+        lookup = evaluators.BACKENDS['lookup']
+        broken = Backend('broken', lambda hand: (0, 2), lookup.best_hand,
+                         lookup.hand_ranks)
+        evaluators.register(broken)
+        try:
+            hand = 'AS KS QS JS TS'.split()
+            evaluators.use('lookup', verify='reference')
+            self.assertEqual(evaluators.hand_rank(hand), (8, 14))
+            self.assertEqual(evaluators.hand_ranks([hand]), [(8, 14)])
+            evaluators.use('broken', verify='reference')
+            self.assertRaises(AssertionError, evaluators.hand_rank, hand)
+            self.assertEqual(evaluators.hand_ranks([hand]), [(8, 14)])
+        finally:
+            del evaluators.BACKENDS['broken']
+            evaluators.PREFERENCE.remove('broken')
+
+    def test_register_fastest(self):
+        '''Test a backend registered as fastest becomes the default'''
+        reference = evaluators.BACKENDS['reference']
+        evaluators.register(reference._replace(name='copy'), fastest=True)
+        try:
+            self.assertEqual(evaluators.PREFERENCE[0], 'copy')
+            self.assertEqual(evaluators.use().name, 'copy')
+        finally:
+            del evaluators.BACKENDS['copy']
+            evaluators.PREFERENCE.remove('copy')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,132 @@
+import os
+import tempfile
+import unittest
+import exact_equity
+
+
+class TestEnumerateEquity(unittest.TestCase):
+    '''Test exact enumeration of board completions.'''
+
+    def test_river(self):
+        '''Test a complete board has a single outcome'''
+        result = exact_equity.enumerate_equity(
+            ['AS AH', 'KS KH'], board='AD KD 2C 7S 9H')
+        self.assertEqual(result[0].trials, 1)
+        self.assertEqual([e.equity for e in result], [1.0, 0.0])
+
+    def test_turn(self):
+        '''Test one card to come against a hand count'''
+        # 9 hearts, 3 aces and 3 kings out of 44 unseen cards
+        result = exact_equity.enumerate_equity(
+            ['AH KH', 'QS QD'], board='2H 7H 9C TD')
+        self.assertEqual(result[0].trials, 44)
+        self.assertAlmostEqual(result[0].win, 15 / 44.)
+
+    def test_symmetry_matches_full_enumeration(self):
+        '''Test suit-isomorphic boards are weighted correctly'''
+        holes, board = ['AS AH', 'KS KH'], '2C 7D'
+        self.assertEqual(
+            len(exact_equity.stabilizer(
+                [exact_equity.parse(h) for h in holes]
+                + [exact_equity.parse(board), []])), 2)
+        fast = exact_equity.enumerate_equity(holes, board)
+        slow = exact_equity.enumerate_equity(holes, board, symmetry=False)
+        self.assertEqual(fast[0].trials, slow[0].trials)
+        for a, b in zip(fast, slow):
+            self.assertAlmostEqual(a.equity, b.equity)
+            self.assertAlmostEqual(a.tie, b.tie)
+
+
+class TestPreflopTable(unittest.TestCase):
+    '''Test starting-hand classes and the preflop table file.'''
+
+    def test_classes(self):
+        '''Test the 169 classes cover all 1326 starting hands'''
+        combos = [exact_equity.class_combos(i) for i in range(169)]
+        self.assertEqual(sum(map(len, combos)), 1326)
+        self.assertEqual(exact_equity.class_name(0), 'AA')
+        self.assertEqual(exact_equity.class_index('AS KS'), 1)
+        self.assertEqual(exact_equity.class_name(13), 'AKo')
+
+    def test_matchups_are_deduplicated(self):
+        '''Test AA against KK reduces to three distinct matchups'''
+        counts = exact_equity.matchups(exact_equity.CLASS_INDEX['AA'],
+                                       exact_equity.CLASS_INDEX['KK'])
+        self.assertEqual(len(counts), 3)
+        self.assertEqual(sum(counts.values()), 36)
+
+    def test_table_round_trip(self):
+        '''Test a written table is read back through the memory map'''
+        values = list(range(169 * 169))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.bin')
+            exact_equity.write_table(path, values)
+            i = exact_equity.CLASS_INDEX['AKs']
+            j = exact_equity.CLASS_INDEX['QQ']
+            self.assertEqual(
+                exact_equity.preflop_equity('AKs', 'QH QD', path),
+                values[169 * i + j] / 65535.)
+            exact_equity.close_table()
+
+    def test_remap_closes(self):
+        '''Test mapping another table unmaps the previous one'''
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = [os.path.join(tmp, name) for name in ('a.bin', 'b.bin')]
+            for path in paths:
+                exact_equity.write_table(path, [0] * (169 * 169))
+            first = exact_equity.load_table(paths[0])
+            exact_equity.load_table(paths[1])
+            self.assertTrue(first.closed)
+            exact_equity.close_table()
+
+
+class TestClassEquity(unittest.TestCase):
+    '''Test class equities on a deck stripped of the ranks 2 to 9.'''
+
+    DEAD = list(range(32))
+
+    def test_against_enumeration(self):
+        '''Test the deduplicated matchups average like every combo'''
+        aa, kk = exact_equity.CLASS_INDEX['AA'], exact_equity.CLASS_INDEX['KK']
+        equities = [exact_equity.enumerate_equity([h1, h2], (), self.DEAD)[0]
+                    .equity
+                    for h1 in exact_equity.class_combos(aa)
+                    for h2 in exact_equity.class_combos(kk)]
+        self.assertAlmostEqual(
+            exact_equity.class_equity((aa, kk), self.DEAD),
+            sum(equities) / len(equities))
+        self.assertRaises(ValueError, exact_equity.class_equity, (aa, kk),
+                          [0, 1])
+        self.assertRaises(ValueError, exact_equity.class_equity, (aa, kk),
+                          range(44, 48))  # the kings
+
+    def test_build_table(self):
+        '''Test a partial table is mirrored and its diagonal kept'''
+        names = ['AA', 'KK', 'AKs']
+        classes = [exact_equity.CLASS_INDEX[name] for name in names]
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'table.bin')
+            exact_equity.build_preflop_table(path, workers=1, classes=classes,
+                                             dead=self.DEAD)
+            try:
+                for first in names:
+                    for second in names:
+                        value = exact_equity.preflop_equity(first, second,
+                                                            path)
+                        pair = (exact_equity.CLASS_INDEX[first],
+                                exact_equity.CLASS_INDEX[second])
+                        self.assertAlmostEqual(
+                            value, exact_equity.class_equity(pair, self.DEAD),
+                            places=4)
+                        self.assertAlmostEqual(
+                            value + exact_equity.preflop_equity(
+                                second, first, path),
+                            1.0 if first != second else 2 * value)
+                self.assertEqual(exact_equity.preflop_equity('AA', 'QQ',
+                                                             path), 0)
+            finally:
+                exact_equity.close_table()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+import itertools
+import unittest
+import poker
+from cards import DECK
+from get_best_hand import best_hand_combinations, draws
+
+
+def category(cards):
+    return poker.hand_rank(best_hand_combinations(cards))[0]
+
+
+class TestDraws(unittest.TestCase):
+    '''Test draw analysis against ranking every runout from scratch.'''
+
+    def test_flush_draw(self):
+        '''Test nine flush outs on the flop'''
+        result = draws('AH KH', 'QH 7H 2C')
+        self.assertEqual(result.category, 'high card')
+        self.assertEqual(len(result.outs['flush']), 9)
+        self.assertAlmostEqual(result.turn, (9 + 14) / 47.)
+
+    def test_brute_force(self):
+        '''Test outs and probabilities match brute force'''
+        hole, board = '9S 8S'.split(), 'TD 7C 2S'.split()
+        result = draws(hole, board)
+        unseen = [card for card in DECK if card not in hole + board]
+        current = category(hole + board)
+        outs = sorted(card for card in unseen
+                      if category(hole + board + [card]) > current)
+        self.assertEqual(sorted(sum(result.outs.values(), [])), outs)
+        self.assertAlmostEqual(result.turn, len(outs) / 47.)
+        improved = sum(category(hole + board + list(pair)) > current
+                       for pair in itertools.combinations(unseen, 2))
+        self.assertAlmostEqual(result.river, improved / 1081.)
+
+    def test_turn(self):
+        '''Test a turn board only has the river to come'''
+        result = draws('9S 8S', 'TD 7C 2H 3S', dead='JD')
+        self.assertIsNone(result.turn)
+        self.assertEqual(len(result.outs['straight']), 7)
+        self.assertAlmostEqual(result.river, 25 / 45.)
+
+    def test_board_size(self):
+        '''Test draws need a flop or a turn'''
+        with self.assertRaises(ValueError):
+            draws('AS KS', 'QS JS TS 2C 3D')
+
+
+if __name__ == '__main__':
+    unittest.main()
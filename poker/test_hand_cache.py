@@ -0,0 +1,79 @@
+import unittest
+import poker
+import hand_cache
+from replace_wild_cards import best_wild_hand
+
+
+def relabel(hand, suits):
+    "Rename the suits 'SHDC' to suits."
+    return [card[0] + suits['SHDC'.index(card[1])] for card in hand]
+
+
+class TestCanonical(unittest.TestCase):
+    '''Test suit-isomorphic hands share a canonical key.'''
+
+    def test_relabelled_hands(self):
+        '''Test every relabelling of a hand gets the same key'''
+        hand = 'AS KS 7H 7D 2C'.split()
+        key = hand_cache.canonical(hand)[0]
+        for suits in ('HSCD', 'CDHS', 'DCSH'):
+            self.assertEqual(hand_cache.canonical(relabel(hand, suits))[0],
+                             key)
+
+    def test_different_hands(self):
+        '''Test hands that are not isomorphic get different keys'''
+        self.assertNotEqual(hand_cache.canonical('AS KS'.split())[0],
+                            hand_cache.canonical('AS KH'.split())[0])
+
+    def test_wild_keeps_colours(self):
+        '''Test jokers only allow colour-preserving relabellings'''
+        key = hand_cache.canonical_wild('AS KS ?B'.split())[0]
+        self.assertEqual(hand_cache.canonical_wild('AC KC ?B'.split())[0],
+                         key)
+        self.assertEqual(hand_cache.canonical_wild('AH KH ?R'.split())[0],
+                         key)
+        self.assertNotEqual(hand_cache.canonical_wild('AH KH ?B'.split())[0],
+                            key)
+
+
+class TestMemoize(unittest.TestCase):
+    '''Test the memoized evaluators.'''
+
+    def test_hand_rank_hits(self):
+        '''Test isomorphic hands are cache hits'''
+        hand_rank = hand_cache.memoize(poker.hand_rank)
+        hand = '6C 7C 8C 9C TC'.split()
+        self.assertEqual(hand_rank(hand), (8, 10))
+        self.assertEqual(hand_rank(relabel(hand, 'HSCD')), (8, 10))
+        info = hand_rank.cache_info()
+        self.assertEqual((info.hits, info.misses), (1, 1))
+
+    def test_best_hand_restores_suits(self):
+        '''Test cards of a cached result are in the caller's suits'''
+        hand = 'TD TC TH 7C 7D 8C 8S'.split()
+        first = hand_cache.best_hand(hand)
+        other = relabel(hand, 'CDSH')
+        self.assertEqual(sorted(hand_cache.best_hand(other)),
+                         sorted(relabel(first, 'CDSH')))
+        self.assertTrue(set(hand_cache.best_hand(other)) <= set(other))
+
+    def test_best_wild_hand(self):
+        '''Test a cached wild hand matches the uncached one'''
+        hand = '6C 7C 8C 9C TC 5C ?B'.split()
+        self.assertEqual(sorted(hand_cache.best_wild_hand(hand)),
+                         sorted(best_wild_hand(hand)))
+        hand = '6D 7D 8D 9D TD 5D ?R'.split()
+        self.assertEqual(sorted(hand_cache.best_wild_hand(hand)),
+                         ['7D', '8D', '9D', 'JD', 'TD'])
+        self.assertEqual(hand_cache.best_wild_hand.cache_info().hits, 1)
+
+    def test_maxsize(self):
+        '''Test the cache is bounded'''
+        hand_rank = hand_cache.memoize(poker.hand_rank, maxsize=2)
+        for hand in ('AS KS QS JS TS', 'AS AH 2C 3D 4S', '7C 7D 7H 2S 2C'):
+            hand_rank(hand.split())
+        self.assertEqual(hand_rank.cache_info().currsize, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import random
+import unittest
+import poker
+import hand_lookup
+
+
+class TestLookupTables(unittest.TestCase):
+    '''Test the precomputed 5-card class tables.'''
+
+    def test_number_of_classes(self):
+        '''Test there are 7462 distinct classes'''
+        self.assertEqual(len(hand_lookup.CLASSES), 7462)
+        self.assertEqual(len(hand_lookup.FLUSHES), 1287)
+        self.assertEqual(len(hand_lookup.OTHERS), 6175)
+
+    def test_classes_are_sorted(self):
+        '''Test scores order hands like hand_rank tuples'''
+        classes = hand_lookup.CLASSES
+        self.assertTrue(all(a < b for a, b in zip(classes, classes[1:])))
+
+    def test_extremes(self):
+        '''Test the worst and best hands'''
+        self.assertEqual(hand_lookup.evaluate('7D 5C 4S 3H 2S'.split()), 0)
+        self.assertEqual(
+            hand_lookup.evaluate('AH KH QH JH TH'.split()), 7461)
+
+
+class TestEvaluate(unittest.TestCase):
+    '''Test evaluate() and hand_rank() against poker.hand_rank().'''
+
+    def test_representatives(self):
+        '''Test one hand of every class in every suit'''
+        for ranks, is_flush, hand in hand_lookup.representatives():
+            for suit in 'SHDC':
+                if is_flush:
+                    hand = [card[0] + suit for card in hand]
+                self.assertEqual(
+                    hand_lookup.hand_rank(hand), poker.hand_rank(hand))
+
+    def test_random_hands(self):
+        '''Test random hands'''
+        rng = random.Random(212)
+        deck = [r + s for r in '23456789TJQKA' for s in 'SHDC']
+        for _ in range(2000):
+            hand = rng.sample(deck, 5)
+            self.assertEqual(
+                hand_lookup.hand_rank(hand), poker.hand_rank(hand))
+
+    def test_poker(self):
+        '''Test poker() picks the same winners'''
+        sf = '6C 7C 8C 9C TC'.split()
+        fk = '9D 9H 9S 9C 7D'.split()
+        fh = 'TD TC TH 7C 7D'.split()
+        self.assertEqual(hand_lookup.poker([sf, fk, fh]), [sf])
+        self.assertEqual(hand_lookup.poker([fh, fh]), [fh, fh])
+        self.assertEqual(hand_lookup.poker([]), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
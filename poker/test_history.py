@@ -0,0 +1,110 @@
+import io
+import os
+import random
+import tempfile
+import unittest
+import history
+import poker
+from get_best_hand import best_hand_combinations
+
+
+class TestScoreLine(unittest.TestCase):
+    '''Test scoring single showdowns.'''
+
+    def test_five_cards(self):
+        '''Test 5-card hands are ranked like poker.hand_rank'''
+        self.assertEqual(history.score_line(
+            '6C 7C 8C 9C TC | 6D 7D 8D 9D TD | 9H 9S 2S 2H 7H'),
+            '0 1\t(8, 10)')
+
+    def test_seven_cards(self):
+        '''Test 7-card hands are ranked by their best 5 cards'''
+        self.assertEqual(history.score_line(
+            'AS AH 2C 5D 9H JS KD | QS QH 2C 5D 9H JS KD'), '0\t(1, 14, '
+            '[14, 14, 13, 11, 9])')
+
+    def test_errors(self):
+        '''Test bad lines are reported in place'''
+        text, lines = history.score_lines('AS KS\n\nXX 2S 3S 4S 5S\n')
+        self.assertEqual(lines, 3)
+        out = text.split('\n')
+        self.assertTrue(out[0].startswith('error'))
+        self.assertEqual(out[1], '')
+        self.assertTrue(out[2].startswith('error'))
+
+    def test_repeated_cards(self):
+        '''Test a card held twice, or by two players, is an error'''
+        for line in ('AS AS KD 9C 2C 3D 4H | 5S 6S 7S 8S 9S TD JD',
+                     'AS KS QS JS TS | AS 2D 3D 4D 5D',
+                     'AS KH 2C 5D 9H JS KD | QS KH 2C 5D 9H JS KD | '
+                     '3S 3H 2C 5D 9H JS KD'):
+            self.assertEqual(history.score_lines(line)[0],
+                             'error\ta card is dealt twice\n')
+
+
+class TestProcess(unittest.TestCase):
+    '''Test scoring whole files in line-aligned chunks.'''
+
+    def setUp(self):
+        rng = random.Random(5)
+        self.tables = []
+        for i in range(300):
+            n = 5 if i % 2 else 7
+            self.tables.append(poker.deal(rng.randint(2, 6), n, rng=rng))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'hands.txt')
+        with open(self.path, 'w') as f:
+            for table in self.tables:
+                f.write(' | '.join(' '.join(hand) for hand in table) + '\n')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def expected(self):
+        lines = []
+        for table in self.tables:
+            if len(table[0]) == 7:
+                table = [best_hand_combinations(hand) for hand in table]
+            best, _, positions = poker.winners(table, key=poker.hand_rank,
+                                               indices=True)
+            lines.append('%s\t%r\n' % (' '.join(map(str, positions)), best))
+        return ''.join(lines)
+
+    def test_chunks_are_line_aligned(self):
+        '''Test chunks cover the file and end on newlines'''
+        spans = history.chunks(self.path, 1000)
+        self.assertGreater(len(spans), 1)
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        self.assertEqual(b''.join(data[a:b] for a, b in spans), data)
+        self.assertTrue(all(data[b - 1:b] == b'\n' for a, b in spans))
+
+    def test_in_process(self):
+        '''Test results match poker.poker in input order'''
+        out, progress = io.StringIO(), io.StringIO()
+        self.assertEqual(history.process(self.path, out, workers=1,
+                                         chunk_size=1000, progress=progress),
+                         300)
+        self.assertEqual(out.getvalue(), self.expected())
+        self.assertIn('100.0%', progress.getvalue())
+
+    def test_bad_bytes(self):
+        '''Test a non-ASCII byte spoils only its own line'''
+        with open(self.path, 'wb') as f:
+            f.write(b'AS KS QS JS TS | 9D 9H 9S 9C 7D\n'
+                    b'AS KS QS JS T\xe9 | 9D 9H 9S 9C 7D\n')
+        out = io.StringIO()
+        self.assertEqual(history.process(self.path, out, workers=1), 2)
+        first, second = out.getvalue().split('\n')[:2]
+        self.assertEqual(first, '0\t(8, 14)')
+        self.assertTrue(second.startswith('error'))
+
+    def test_worker_pool(self):
+        '''Test a pool of workers keeps the output in order'''
+        out = io.StringIO()
+        history.process(self.path, out, workers=2, chunk_size=700)
+        self.assertEqual(out.getvalue(), self.expected())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import random
+import unittest
+import seven_card
+import incremental
+from incremental import Evaluator
+from cards import parse
+
+
+class TestEvaluator(unittest.TestCase):
+    '''Test incremental scores against evaluating from scratch.'''
+
+    def test_streets(self):
+        '''Test flop, turn and river scores and undo'''
+        table = Evaluator(['AS KS', 'QH QD'], 'QS JS 2C')
+        self.assertEqual(table.winners(), [1])
+        table.add('TS')
+        self.assertEqual(table.ranks()[0], (8, 14))
+        table.undo()
+        self.assertEqual(table.board, parse('QS JS 2C'))
+        self.assertEqual(table.winners(), [1])
+
+    def test_random_walk(self):
+        '''Test random adds, removes and undos'''
+        rng = random.Random(4)
+        for _ in range(50):
+            deck = list(range(52))
+            rng.shuffle(deck)
+            holes = [deck[:2], deck[2:4], deck[4:6]]
+            board = deck[6:9]
+            rest = deck[9:]
+            table = Evaluator(holes, board)
+            for _ in range(20):
+                move = rng.random()
+                if move < 0.4 and len(table.board) < 5:
+                    table.add(rest.pop())
+                elif move < 0.7 and len(table.board) > 3:
+                    card = rng.choice(table.board)
+                    table.remove(card)
+                    rest.append(card)
+                elif table.history:
+                    table.undo()
+                    rest = [card for card in deck[9:]
+                            if card not in table.board]
+                self.assertEqual(
+                    table.scores(),
+                    [seven_card.evaluate(hole + table.board)
+                     for hole in holes])
+
+    def test_errors(self):
+        '''Test dealing a card twice and scoring too few cards'''
+        table = Evaluator(['AS KS'], 'QS JS')
+        with self.assertRaises(ValueError):
+            table.add('AS')
+        with self.assertRaises(ValueError):
+            table.remove('2C')
+        with self.assertRaises(ValueError):
+            table.scores()
+
+
+class TestShowdown(unittest.TestCase):
+    '''Test scoring many hole cards on one shared board.'''
+
+    def test_random_tables(self):
+        '''Test nine-handed tables against evaluating every player'''
+        rng = random.Random(6)
+        for _ in range(2000):
+            cards = rng.sample(range(52), 23)
+            board, holes = cards[:5], [cards[5 + 2 * i:7 + 2 * i]
+                                       for i in range(9)]
+            expected = [seven_card.evaluate(hole + board) for hole in holes]
+            self.assertEqual(incremental.scores(board, holes), expected)
+            best = max(expected)
+            self.assertEqual(incremental.showdown(board, holes),
+                             [i for i, s in enumerate(expected) if s == best])
+
+    def test_every_split(self):
+        '''Test holes of up to 7 cards, with trips and quads in the hole'''
+        self.assertEqual(incremental.scores('2C 3D', ['AS AH AD KS KH']),
+                         [seven_card.evaluate('2C 3D AS AH AD KS KH'.split())])
+        rng = random.Random(20)
+        for _ in range(500):
+            # ids of one rank are adjacent, so nine in a row share ranks
+            size = rng.randint(5, 7)
+            start = rng.randrange(0, 44)
+            cards = rng.sample(range(start, start + 9), size)
+            split = rng.randint(0, size)
+            board, hole = cards[:split], cards[split:]
+            self.assertEqual(incremental.scores(board, [hole]),
+                             [seven_card.evaluate(cards)])
+
+    def test_board_plays(self):
+        '''Test a split pot and a partial board'''
+        self.assertEqual(incremental.showdown('AS KS QS JS TS',
+                                              ['2H 3H', '4D 5D']), [0, 1])
+        self.assertEqual(incremental.showdown('AS AD 7C', ['AH 7D', 'KH KD']),
+                         [0])
+        with self.assertRaises(ValueError):
+            incremental.scores('AS', ['KS QS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import os
+import sys
+import unittest
+import evaluators
+import poker
+import get_best_hand
+import hand_cache
+import instrument
+import replace_wild_cards
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                             os.pardir, 'zebra_puzzle'))
+
+
+class TestInstrument(unittest.TestCase):
+    '''Test counters, histograms and switching instrumentation off.'''
+
+    def test_disabled_costs_nothing(self):
+        '''Test the originals are back after recording'''
+        original = poker.hand_rank
+        with instrument.recording():
+            self.assertIsNot(poker.hand_rank, original)
+        self.assertIs(poker.hand_rank, original)
+        self.assertFalse(instrument.enabled())
+
+    def test_poker(self):
+        '''Test evaluate calls per poker() and categories'''
+        hands = ['6C 7C 8C 9C TC'.split(), '9D 9H 9S 9C 7D'.split(),
+                 'TD TC TH 7C 7D'.split()]
+        with instrument.recording() as stats:
+            poker.poker(hands)
+            poker.poker(hands[1:])
+        self.assertEqual(stats['calls']['poker.poker'], 2)
+        self.assertEqual(stats['nested']['poker.poker'],
+                         {'hand_lookup.evaluate': 5})
+        self.assertEqual(
+            stats['fanout']['poker.poker']['hand_lookup.evaluate'],
+            {3: 1, 2: 1})
+        self.assertEqual(stats['categories']['hand_lookup.evaluate'],
+                         {'straight flush': 1, 'four of a kind': 2,
+                          'full house': 2})
+        self.assertGreater(stats['time_ns']['poker.poker'], 0)
+
+    def test_wild_fanout(self):
+        '''Test candidate substitutions are counted per best_wild_hand()'''
+        with instrument.recording() as stats:
+            replace_wild_cards.best_wild_hand('6C 7C 8C 9C ?B'.split())
+            replace_wild_cards.best_wild_hand('AS KS QS JS ?B'.split())
+        self.assertEqual(stats['categories']
+                         ['replace_wild_cards.best_wild_hand'],
+                         {'straight flush': 2})
+        # the straight flushes from ace high down to ten high are checked
+        # for the clubs, the royal flush alone for the spades
+        fanout = stats['fanout']['replace_wild_cards.best_wild_hand']
+        self.assertEqual(fanout, {'replace_wild_cards.fits': {5: 1, 1: 1}})
+
+    def test_cache_hits(self):
+        '''Test cache hit rates since the last reset'''
+        hand = 'AS KS QS JS TS 2H 3D'.split()
+        with instrument.recording() as stats:
+            hand_cache.best_hand(hand)
+            hand_cache.best_hand(hand)
+        cache = stats['caches']['hand_cache.best_hand']
+        self.assertEqual(cache['hits'], 1)
+        self.assertEqual(cache['hit_rate'], 0.5)
+
+    def test_nested_best_hand(self):
+        '''Test calls issued by best_hand() are attributed to it'''
+        previous = evaluators.current()
+        evaluators.use('lookup')
+        try:
+            with instrument.recording() as stats:
+                get_best_hand.best_hand_combinations(
+                    'AS KS QS JS TS 2H 3D'.split())
+        finally:
+            evaluators._backend = previous
+        # get_best_hand.hand_rank is the evaluators dispatcher, which the
+        # 'lookup' backend answers with one hand_lookup.evaluate per call.
+        self.assertEqual(
+            stats['nested']['get_best_hand.best_hand_combinations'],
+            {'get_best_hand.hand_rank': 21, 'hand_lookup.evaluate': 21})
+
+    def test_zebra_levels(self):
+        '''Test node visits per level of both zebra solvers'''
+        import bitset
+        import puzzle
+        with instrument.recording() as stats:
+            puzzle.zebra_puzzle_csp()
+            bitset.solve(puzzle.ZEBRA)
+        mine = {}
+        self.assertEqual(puzzle.zebra_puzzle_csp(mine), (1, 5))
+        self.assertEqual(stats['levels']['csp.solutions'], mine['levels'])
+        self.assertGreater(sum(stats['levels']['bitset.solutions']), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import itertools
+import random
+import unittest
+import omaha
+import poker
+from cards import DECK
+
+
+def brute_force(hole, board, rule):
+    "Rank every allowed hand with poker.hand_rank."
+    fewest, most = rule
+    return max(poker.hand_rank(list(h) + list(b))
+               for k in range(fewest, most + 1)
+               for h in itertools.combinations(hole, k)
+               for b in itertools.combinations(board, 5 - k)
+               if k + len(b) == 5)
+
+
+class TestOmaha(unittest.TestCase):
+    '''Test best hands under hole card rules against brute force.'''
+
+    def test_exactly_two(self):
+        '''Test Omaha must use two hole cards and three board cards'''
+        # Four spades on the board and one in the hand is no flush.
+        self.assertEqual(omaha.hand_rank('AS 9H 8D 2C', 'KS QS JS 4S 3D')[0],
+                         0)
+        self.assertEqual(omaha.hand_rank('AS 9H 8D 2C', 'KS QS JS 4S 3D',
+                                         'holdem')[0], 5)
+        self.assertEqual(omaha.best_hand('AS KS 7D 2C', 'QS JS TS 3H 3D'),
+                         ('AS', 'KS', 'QS', 'JS', 'TS'))
+
+    def test_brute_force(self):
+        '''Test random deals of every size agree with brute force'''
+        rng = random.Random(25)
+        for _ in range(400):
+            holes, boards = rng.choice([(4, 5), (5, 5), (4, 3), (4, 4)])
+            cards = rng.sample(DECK, holes + boards)
+            hole, board = cards[:holes], cards[holes:]
+            self.assertEqual(omaha.hand_rank(hole, board),
+                             brute_force(hole, board, (2, 2)))
+        for _ in range(200):
+            cards = rng.sample(DECK, 7)
+            self.assertEqual(omaha.hand_rank(cards[:2], cards[2:], 'holdem'),
+                             brute_force(cards[:2], cards[2:], (0, 2)))
+
+    def test_flush_pruning(self):
+        '''Test suited deals, where flushes compete with full houses'''
+        rng = random.Random(5)
+        for _ in range(300):
+            suit = rng.choice('SHDC')
+            suited = [card for card in DECK if card[1] == suit]
+            others = [card for card in DECK if card[1] != suit]
+            cards = rng.sample(suited, 5) + rng.sample(others, 4)
+            rng.shuffle(cards)
+            hole, board = cards[:4], cards[4:]
+            self.assertEqual(omaha.hand_rank(hole, board),
+                             brute_force(hole, board, (2, 2)))
+
+    def test_showdown(self):
+        '''Test multi-way showdowns, ties and card ids'''
+        board = 'QS JS TS 3H 3D'
+        self.assertEqual(omaha.showdown(board, ['AH AD 3S 9C',
+                                                'KS 8S 3C 2D']), [1])
+        self.assertEqual(omaha.showdown('AC KD 7H 5S 2C',
+                                        ['QH QD 4H 3D', 'QC QS 4S 3H']),
+                         [0, 1])
+        ids = [DECK.index(card) for card in 'AH AD 3S 9C'.split()]
+        self.assertEqual(omaha.showdown(board.split(), [ids, 'KS 8S 3C 2D']),
+                         [1])
+
+    def test_bad_deals(self):
+        '''Test impossible deals are refused'''
+        self.assertRaises(ValueError, omaha.scores, 'AS KS QS',
+                          ['AS 2C 3D 4H'])
+        self.assertRaises(ValueError, omaha.scores, 'AS KS', ['2C 3D 4H 5H'])
+        self.assertRaises(ValueError, omaha.scores, 'AS KS QS JS TS', ['2C'])
+        self.assertRaises(ValueError, omaha.scores, 'AS KS QS JS TS',
+                          ['2C 3D'], 'razz')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,4 @@
+import random
 import unittest
 from poker import *  # noqa
 
@@ -35,6 +36,38 @@ class TestHighestRankHand(unittest.TestCase):
         self.assertEqual(poker([]), None)
 
 
+class TestWinners(unittest.TestCase):
+    '''Test winners() ranks each hand once and reports the winners.'''
+
+    def setUp(self):
+        self.sf = '6C 7C 8C 9C TC'.split()  # straight flush
+        self.fk = '9D 9H 9S 9C 7D'.split()  # four of a kind
+        self.fh = 'TD TC TH 7C 7D'.split()  # full house
+        self.calls = 0
+
+    def counting_rank(self, hand):
+        self.calls += 1
+        return hand_rank(hand)
+
+    def test_ranks_each_hand_once(self):
+        '''Test the key is called once per hand'''
+        winners([self.fh, self.sf, self.fk, self.sf], self.counting_rank)
+        self.assertEqual(self.calls, 4)
+
+    def test_accepts_a_generator(self):
+        '''Test winners() and poker() accept a generator'''
+        hands = [self.fk, self.sf, self.fh, self.sf]
+        self.assertEqual(
+            winners((hand for hand in hands), hand_rank, indices=True),
+            ((8, 10), [self.sf, self.sf], [1, 3]))
+        self.assertEqual(poker(hand for hand in hands), [self.sf, self.sf])
+
+    def test_empty(self):
+        '''Test winners() of no hands'''
+        self.assertEqual(winners([], hand_rank), (None, []))
+        self.assertEqual(poker(iter([])), None)
+
+
 class TestHighestRankInAHand(unittest.TestCase):
     '''Test hand_rank() returns the highest rank in the hand.'''
 
@@ -169,5 +202,32 @@ class TestHelperFunctions(unittest.TestCase):
         self.assertEqual(two_pair([5, 3, 4, 2, 10]), None)
 
 
+class TestDeal(unittest.TestCase):
+    '''Test deal() draws distinct cards without touching the deck.'''
+
+    def test_hand_sizes(self):
+        '''Test the number and size of hands'''
+        hands = deal(3, 7)
+        self.assertEqual([len(hand) for hand in hands], [7, 7, 7])
+        cards = [card for hand in hands for card in hand]
+        self.assertEqual(len(set(cards)), 21)
+
+    def test_deck_is_not_changed(self):
+        '''Test the deck passed in keeps its order'''
+        deck = list('abcdefgh')
+        deal(2, 3, deck)
+        self.assertEqual(deck, list('abcdefgh'))
+
+    def test_seeded(self):
+        '''Test a seeded generator repeats the deal'''
+        self.assertEqual(deal(2, rng=random.Random(1)),
+                         deal(2, rng=random.Random(1)))
+
+    def test_too_many_cards(self):
+        '''Test dealing more cards than the deck holds'''
+        with self.assertRaises(ValueError):
+            deal(11)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import ranges
+from cards import parse
+from exact_equity import enumerate_equity
+
+
+class TestParseRange(unittest.TestCase):
+    '''Test expanding range text into weighted combos.'''
+
+    def count(self, text):
+        return len(ranges.parse_range(text))
+
+    def test_tokens(self):
+        '''Test the combo count of every kind of token'''
+        self.assertEqual(self.count('QQ+'), 18)
+        self.assertEqual(self.count('AKs'), 4)
+        self.assertEqual(self.count('AKo'), 12)
+        self.assertEqual(self.count('AK'), 16)
+        self.assertEqual(self.count('ATs+'), 16)
+        self.assertEqual(self.count('QQ-88'), 30)
+        self.assertEqual(self.count('T9s-65s'), 20)
+        self.assertEqual(self.count('A9o-A5o'), 60)
+        self.assertEqual(self.count('QQ+, AKs, T9s-65s'), 42)
+
+    def test_combo(self):
+        '''Test a single combo, highest card first'''
+        self.assertEqual(ranges.parse_range('Ks As'),
+                         {tuple(parse('AS KS')): 1.0})
+
+    def test_weights(self):
+        '''Test weights and overriding an earlier token'''
+        weights = ranges.parse_range('AK:0.5, AKs')
+        self.assertEqual(sorted(weights.values()), [0.5] * 12 + [1.0] * 4)
+
+    def test_errors(self):
+        '''Test malformed tokens are rejected'''
+        for text in ('AXs', 'AAs', 'T9s-64s', 'QQ-AKs', 'AK:2'):
+            with self.assertRaises(ValueError):
+                ranges.parse_range(text)
+
+
+class TestRangeEquity(unittest.TestCase):
+    '''Test range-vs-range equity.'''
+
+    def test_conflicts_and_isomorphism(self):
+        '''Test card conflicts are dropped and suit-isomorphic pairs merged'''
+        counts = ranges.matchups('AA', 'AKs')
+        self.assertEqual(sum(counts.values()), 6 * 4 - 12)
+        self.assertEqual(len(counts), 1)
+
+    def test_matches_single_matchups(self):
+        '''Test a range is the weighted average of its combos'''
+        board = 'QS 7H 2C'
+        result = ranges.range_equity('AsAh, KsKh:0.5', 'JJ', board, workers=1)
+        combos = [(parse('AS AH'), 1.0), (parse('KS KH'), 0.5)]
+        share = total = 0
+        for hole, weight in combos:
+            for jacks in ranges.parse_range('JJ'):
+                e = enumerate_equity([hole, list(jacks)], board,
+                                     symmetry=False)[0]
+                share += weight * e.equity
+                total += weight
+        self.assertEqual(result[0].combos, total)
+        self.assertAlmostEqual(result[0].equity, share / total)
+        self.assertAlmostEqual(result[0].equity + result[1].equity, 1.0)
+
+    def test_monte_carlo_and_workers(self):
+        '''Test sampling agrees with enumeration, in and out of process'''
+        board = 'QS 7H 2C 9D'
+        exact = ranges.range_equity('TT+', 'AK, KQs', board, workers=1)
+        pooled = ranges.range_equity('TT+', 'AK, KQs', board, workers=2)
+        self.assertAlmostEqual(exact[0].equity, pooled[0].equity)
+        sampled = ranges.range_equity('TT+', 'AK, KQs', board, trials=400,
+                                      workers=1, seed=3)
+        self.assertAlmostEqual(sampled[0].equity, exact[0].equity, delta=0.03)
+
+
+if __name__ == '__main__':
+    unittest.main()
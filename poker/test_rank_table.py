@@ -0,0 +1,81 @@
+import itertools
+import os
+import tempfile
+import unittest
+from math import comb
+import hand_lookup
+import rank_table
+from cards import DECK
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class TestRankTable(unittest.TestCase):
+    '''Test the table on the prefix made of the first 16 cards.'''
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        cls.path = os.path.join(cls.tmp.name, 'ranks.bin')
+        rank_table.build_table(cls.path, cards=16, workers=1)
+        cls.hands = list(itertools.combinations(DECK[:16], 5))
+
+    @classmethod
+    def tearDownClass(cls):
+        rank_table.close_table()
+        cls.tmp.cleanup()
+
+    def test_colex_index(self):
+        '''Test the index numbers the hands of n cards 0 to C(n, 5) - 1'''
+        indices = sorted(rank_table.index(ids)
+                         for ids in itertools.combinations(range(20), 5))
+        self.assertEqual(indices, list(range(comb(20, 5))))
+
+    def test_scores(self):
+        '''Test every hand of the prefix scores like hand_lookup'''
+        for hand in self.hands:
+            self.assertEqual(rank_table.evaluate(hand, self.path),
+                             hand_lookup.evaluate(hand))
+        self.assertEqual(rank_table.evaluate([15, 0, 4, 8, 12], self.path),
+                         hand_lookup.evaluate([15, 0, 4, 8, 12]))
+
+    def test_bad_hands(self):
+        '''Test repeated cards and cards beyond the prefix are refused'''
+        for hand in ('2S 2S 3H 4D 5C', '2S 3H 4D 5C AS'):
+            self.assertRaises(ValueError, rank_table.evaluate, hand.split(),
+                              self.path)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_evaluate_array(self):
+        '''Test array lookups agree with single lookups'''
+        cards = [[DECK.index(card) for card in hand] for hand in self.hands]
+        self.assertEqual(
+            rank_table.evaluate_array(cards, self.path).tolist(),
+            [rank_table.evaluate(hand, self.path) for hand in self.hands])
+        self.assertRaises(ValueError, rank_table.evaluate_array,
+                          [[0, 0, 1, 2, 3]], self.path)
+
+    def test_not_a_table(self):
+        '''Test a file that is not a table is refused'''
+        path = os.path.join(self.tmp.name, 'other.bin')
+        with open(path, 'wb') as f:
+            f.write(b'\0' * 64)
+        self.assertRaises(ValueError, rank_table.load_table, path)
+
+    def test_remap_closes(self):
+        '''Test mapping another table unmaps the previous one'''
+        other = os.path.join(self.tmp.name, 'small.bin')
+        rank_table.build_table(other, cards=6, workers=1)
+        rank_table.load_table(self.path)
+        mapped = rank_table._table.data
+        self.assertEqual(rank_table.load_table(other)[0], 6)
+        self.assertTrue(mapped.closed)
+        self.assertEqual(rank_table.evaluate(self.hands[0], self.path),
+                         hand_lookup.evaluate(self.hands[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import itertools
+import random
+import time
+import unittest
+import poker
+import seven_card
+from cards import DECK
+from hand_lookup import rank_tuple
+from replace_wild_cards import best_wild_hand, cards, deuces_wild
+from replace_wild_cards import best_wild_hand_teacher
+
+
+def brute_force_rank(hand, wilds):
+    """Rank of the best hand over every substitution of distinct cards."""
+    fixed = [card for card in hand if card not in wilds]
+    options = [wilds[card] for card in hand if card in wilds]
+    best = None
+    for substitution in itertools.product(*options):
+        full = fixed + list(substitution)
+        if len(set(full)) == len(full):
+            score = seven_card.evaluate(full)
+            best = score if best is None else max(best, score)
+    return rank_tuple(best)
+
+
+class TestBestWildHand(unittest.TestCase):
+    '''Test best_wild_hand() against brute-force substitution.'''
+
+    def check(self, hand, wilds):
+        result = best_wild_hand(hand, wilds)
+        fixed = [card for card in hand if card not in wilds]
+        self.assertEqual(len(set(result)), 5)
+        extra = [card for card in result if card not in fixed]
+        self.assertLessEqual(len(extra), len(hand) - len(fixed))
+        self.assertEqual(poker.hand_rank(result),
+                         brute_force_rank(hand, wilds))
+
+    def test_examples(self):
+        '''Test the homework examples'''
+        self.assertEqual(
+            sorted(best_wild_hand('6C 7C 8C 9C TC 5C ?B'.split())),
+            ['7C', '8C', '9C', 'JC', 'TC'])
+        self.assertEqual(
+            sorted(best_wild_hand('TD TC 5H 5C 7C ?R ?B'.split())),
+            ['7C', 'TC', 'TD', 'TH', 'TS'])
+        self.assertEqual(
+            sorted(best_wild_hand('JD TC TH 7C 7D 7S 7H'.split())),
+            ['7C', '7D', '7H', '7S', 'JD'])
+
+    def test_teacher(self):
+        '''Test the teacher's solution agrees with the examples'''
+        for hand in ('6C 7C 8C 9C TC 5C ?B', 'TD TC 5H 5C 7C ?R ?B'):
+            hand = hand.split()
+            self.assertEqual(poker.hand_rank(best_wild_hand_teacher(hand)),
+                             poker.hand_rank(best_wild_hand(hand)))
+
+    def test_jokers_corpus(self):
+        '''Test random hands with one or two jokers'''
+        rng = random.Random(8)
+        for jokers in (['?B'], ['?R'], ['?B', '?R']):
+            for _ in range(15):
+                hand = rng.sample(DECK, 7 - len(jokers)) + jokers
+                self.check(hand, cards)
+
+    def test_deuces_wild_corpus(self):
+        '''Test random hands with deuces wild'''
+        rng = random.Random(2)
+        deuces = list(deuces_wild)
+        others = [card for card in DECK if card not in deuces_wild]
+        for count in (1, 2):
+            for _ in range(6):
+                hand = (rng.sample(others, 7 - count)
+                        + rng.sample(deuces, count))
+                self.check(hand, deuces_wild)
+
+    def test_many_jokers(self):
+        '''Test three jokers of a colour complete a royal flush'''
+        hand = 'AS KS ?B ?R ?B ?B 3D'.split()
+        self.assertEqual(poker.hand_rank(best_wild_hand(hand)), (8, 14))
+        hand = 'AS AH ?B ?R ?B ?R 3D'.split()
+        self.assertEqual(poker.hand_rank(best_wild_hand(hand)), (7, 14, 13))
+
+    def test_faster_than_substitution(self):
+        '''Test one-joker hands are solved faster than by substitution'''
+        rng = random.Random(16)
+        hands = [rng.sample(DECK, 6) + ['?B'] for _ in range(40)]
+
+        def best_time(fn):
+            times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                for hand in hands:
+                    fn(hand)
+                times.append(time.perf_counter() - start)
+            return min(times)
+        self.assertLess(best_time(best_wild_hand),
+                        best_time(best_wild_hand_teacher))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import asyncio
+import random
+import unittest
+import poker
+import service
+from cards import DECK
+from get_best_hand import best_hand_combinations
+
+
+class TestRunBatch(unittest.TestCase):
+    '''Test the backend that evaluates one batch.'''
+
+    def test_hand_rank(self):
+        '''Test vectorized and one-at-a-time batches agree with hand_rank'''
+        rng = random.Random(2)
+        hands = [rng.sample(DECK, 5) for _ in range(200)]
+        requests = [{'hand': hand} for hand in hands]
+        expected = [{'result': poker.hand_rank(hand)} for hand in hands]
+        self.assertEqual(service.run_batch('hand_rank', requests), expected)
+        self.assertEqual(service.run_batch('hand_rank', requests[:3]),
+                         expected[:3])
+
+    def test_errors(self):
+        '''Test a bad request fails alone'''
+        results = service.run_batch('best_hand', [
+            {'hand': 'AS KS QS JS TS 2C 3D'.split()}, {'hand': ['XX']}, {},
+            {'hand': []}, {'hand': 'AS KS QS'.split()},
+            {'hand': 'AS AS QS JS TS'.split()}])
+        self.assertIn('result', results[0])
+        for result in results[1:]:
+            self.assertIn('error', result)
+        hands = [{'hand': DECK[i % 47:i % 47 + 5]} for i in range(70)]
+        hands[3] = {'hand': 'AS AS QS JS TS'.split()}
+        results = service.run_batch('hand_rank', hands)
+        self.assertIn('error', results[3])
+        self.assertEqual(sum('result' in result for result in results), 69)
+        for op, request in [
+                ('poker', {'hands': ['AS KS QS JS TS'.split(), []]}),
+                ('showdown', {'board': 'AS KS QS'.split(),
+                              'holes': [['AS', 'KH']]}),
+                ('best_wild_hand', {'hand': ['?B', '?B']})]:
+            self.assertIn('error', service.run_one(op, request))
+        self.assertIn('result', service.run_one(
+            'best_wild_hand', {'hand': 'AS KS ?B ?B ?R'.split()}))
+
+
+class TestServer(unittest.IsolatedAsyncioTestCase):
+    '''Test the server and client over a localhost socket.'''
+
+    async def asyncSetUp(self):
+        self.server = service.Server(workers=1, window=0.01)
+        listener = await self.server.start(port=0)
+        port = listener.sockets[0].getsockname()[1]
+        self.client = await service.Client.connect(port=port)
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.close()
+
+    async def test_operations(self):
+        '''Test every operation'''
+        hand = 'AS 2S 3S 4S 5S KD KH'.split()
+        self.assertEqual(await self.client.request('best_hand', hand=hand),
+                         'AS 2S 3S 4S 5S'.split())
+        self.assertEqual(await self.client.request('hand_rank',
+                                                   hand=hand[:5]), [8, 5])
+        self.assertEqual(sorted(await self.client.request(
+            'best_wild_hand', hand='JD TC TH 7C 7D 7S ?B'.split())),
+            ['7C', '7D', 'TC', 'TH', 'TS'])
+        self.assertEqual(await self.client.request(
+            'poker', hands=['9D 9H 9S 9C 7D'.split(),
+                            'TD TC TH 7C 7S'.split()]), [0])
+        self.assertEqual(await self.client.request(
+            'showdown', board='AS KD 7H 7C 2S'.split(),
+            holes=[['AH', 'AD'], ['KS', 'QS']]), [0])
+
+    async def test_errors(self):
+        '''Test malformed requests get error replies'''
+        with self.assertRaises(ValueError):
+            await self.client.request('best_hand', hand=['AS'])
+        with self.assertRaises(ValueError):
+            await self.client.request('juggle')
+
+    async def test_batching(self):
+        '''Test concurrent requests share batches and latency is reported'''
+        rng = random.Random(1)
+        hands = [rng.sample(DECK, 7) for _ in range(300)]
+        results = await asyncio.gather(*[
+            self.client.request('best_hand', hand=hand) for hand in hands])
+        for hand, result in zip(hands, results):
+            self.assertEqual(poker.hand_rank(result),
+                             poker.hand_rank(best_hand_combinations(hand)))
+        stats = await self.client.request('stats')
+        self.assertEqual(stats['requests'], 300)
+        # How many requests share a batch depends on the machine's load,
+        # so only check that they are batched at all.
+        self.assertGreater(stats['mean_batch'], 2)
+        self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import itertools
+import random
+import unittest
+import poker
+import hand_lookup
+import seven_card
+
+
+def reference_best_rank(hand):
+    return max(poker.hand_rank(h) for h in itertools.combinations(hand, 5))
+
+
+class TestEvaluate(unittest.TestCase):
+    '''Test evaluate() against the best of all 5-card combinations.'''
+
+    def test_random_hands(self):
+        '''Test random 5, 6 and 7 card hands'''
+        rng = random.Random(7)
+        deck = [r + s for r in '23456789TJQKA' for s in 'SHDC']
+        for n in (5, 6, 7):
+            for _ in range(1000):
+                hand = rng.sample(deck, n)
+                self.assertEqual(
+                    hand_lookup.rank_tuple(seven_card.evaluate(hand)),
+                    reference_best_rank(hand))
+
+    def test_straight_flush_over_quads(self):
+        '''Test a straight flush beats four of a kind'''
+        hand = '9C 9S 9D TD JD QD KD'.split()
+        self.assertEqual(hand_lookup.rank_tuple(seven_card.evaluate(hand)),
+                         (8, 13))
+
+    def test_wheel(self):
+        '''Test the wheel is a 5-high straight'''
+        hand = 'AS 2D 3C 4H 5S 9D 9C'.split()
+        self.assertEqual(hand_lookup.rank_tuple(seven_card.evaluate(hand)),
+                         (4, 5))
+
+
+class TestBestHand(unittest.TestCase):
+    '''Test best_hand() returns 5 of the given cards.'''
+
+    def test_best_hand(self):
+        '''Test straight flush, four of a kind and full house'''
+        self.assertEqual(
+            sorted(seven_card.best_hand('6C 7C 8C 9C TC 5C JS'.split())),
+            ['6C', '7C', '8C', '9C', 'TC'])
+        self.assertEqual(
+            sorted(seven_card.best_hand('JD TC TH 7C 7D 7S 7H'.split())),
+            ['7C', '7D', '7H', '7S', 'JD'])
+        self.assertEqual(
+            sorted(seven_card.best_hand('TD TC TH 7C 7D 8C 8S'.split())),
+            ['8C', '8S', 'TC', 'TD', 'TH'])
+
+    def test_flush_picks_flush_suit(self):
+        '''Test a flush is built from the flush suit only'''
+        hand = 'AH 2S 5S 9S JS QS AS'.split()
+        self.assertEqual(sorted(seven_card.best_hand(hand)),
+                         ['5S', '9S', 'AS', 'JS', 'QS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import itertools
+import random
+import unittest
+import shuffle_testing
+
+
+class TestLehmerIndex(unittest.TestCase):
+    '''Test permutations are indexed in lexicographic order.'''
+
+    def test_all_permutations(self):
+        '''Test every permutation of 5 items gets its own index'''
+        perms = list(itertools.permutations(range(5)))
+        self.assertEqual([shuffle_testing.lehmer_index(p) for p in perms],
+                         list(range(len(perms))))
+
+
+class TestShuffleStats(unittest.TestCase):
+    '''Test the chi-square shuffle checks.'''
+
+    def test_good_shuffle(self):
+        '''Test Knuth's shuffle passes'''
+        stats = shuffle_testing.shuffle_stats(
+            shuffle_testing.shuffle, 4, 20000, workers=1, seed=1)
+        self.assertGreater(stats.permutations.p, 0.001)
+        self.assertGreater(stats.positions.p, 0.001)
+
+    def test_bad_shuffle(self):
+        '''Test the biased shuffle3 fails'''
+        stats = shuffle_testing.shuffle_stats(
+            shuffle_testing.shuffle3, 3, 20000, workers=1, seed=1)
+        self.assertLess(stats.permutations.p, 0.001)
+
+    def test_random_state_kept(self):
+        '''Test the caller's random state is left alone'''
+        random.seed(11)
+        expected = random.random()
+        random.seed(11)
+        shuffle_testing.shuffle_stats(shuffle_testing.shuffle, 4, 100,
+                                      workers=1, seed=1)
+        self.assertEqual(random.random(), expected)
+
+    def test_position_statistic_mean(self):
+        '''Test a fair shuffle's position statistic averages its df'''
+        for n in (2, 3, 5):
+            stats = [shuffle_testing.shuffle_stats(
+                shuffle_testing.shuffle, n, 500, workers=1,
+                seed='%d:%d' % (n, i)).positions for i in range(150)]
+            mean = sum(s.statistic for s in stats) / len(stats)
+            # Without the (n - 1) / n scaling this is n / (n - 1) times df.
+            self.assertAlmostEqual(mean / stats[0].df, 1, delta=0.3)
+
+    def test_full_deck(self):
+        '''Test a 52 card deck only gets position counts'''
+        stats = shuffle_testing.shuffle_stats(
+            shuffle_testing.shuffle, 52, 2000, workers=1, seed=1)
+        self.assertIsNone(stats.permutations)
+        self.assertEqual(stats.positions.df, 51 * 51)
+        self.assertGreater(stats.positions.p, 0.001)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+'''Permutation-bitset solver for zebra-style puzzles.
+
+Takes the same csp.Puzzle declarations as csp.py but works on whole
+groups at a time: every permutation of the houses gets an integer index,
+and a set of permutations is a Python int with one bit per index. Tables
+built once per puzzle say, for every attribute position, relation and
+house, which permutations of another group are compatible with it, so
+filtering a group against everything chosen before it is a handful of
+ANDs. solutions() streams every solution, count_solutions() and
+all_solutions() split the first group's permutations across a process
+pool, which is how uniqueness is checked on the bigger puzzles.
+'''
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from csp import RELATIONS
+
+
+def bits(mask):
+    "Yield the indices of the set bits of mask, lowest first."
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class Tables:
+    """Permutation bitsets for one puzzle.
+
+    perms[k] is the k-th permutation of the houses, at[j][h] the set of
+    permutations that put position j in house h, candidates[g] the
+    permutations of group g allowed by its own constraints, and
+    links[g] the constraints between group g and other groups, as
+    (other group, position in g, position in other, relation, reverse)."""
+
+    def __init__(self, puzzle):
+        houses = range(1, puzzle.houses + 1)
+        self.puzzle = puzzle
+        self.perms = list(itertools.permutations(houses))
+        n = puzzle.houses
+        self.at = [[0] * (n + 1) for _ in range(n)]
+        for k, perm in enumerate(self.perms):
+            for j, house in enumerate(perm):
+                self.at[j][house] |= 1 << k
+        everything = (1 << len(self.perms)) - 1
+        where = {a: (g, j) for g, group in enumerate(puzzle.groups)
+                 for j, a in enumerate(group)}
+        self.candidates = [everything] * len(puzzle.groups)
+        self.links = [[] for _ in puzzle.groups]
+        self.relation_masks = {}
+        for relation, a, b in puzzle.constraints:
+            ga, ja = where[a]
+            if relation == 'at':
+                self.candidates[ga] &= self.at[ja][b]
+                continue
+            gb, jb = where[b]
+            if ga == gb:
+                self.candidates[ga] &= self.within(ja, jb, relation)
+            else:
+                self.links[ga].append((gb, ja, jb, relation, False))
+                self.links[gb].append((ga, jb, ja, relation, True))
+
+    def within(self, ja, jb, relation):
+        "Permutations whose positions ja and jb satisfy relation."
+        test = RELATIONS[relation]
+        n = self.puzzle.houses
+        return sum_masks(self.at[ja][ha] & self.at[jb][hb]
+                         for ha in range(1, n + 1)
+                         for hb in range(1, n + 1) if test(ha, hb))
+
+    def compatible(self, j, relation, reverse, house):
+        """Permutations whose position j is compatible with another group's
+        attribute in house: relation(theirs, house), or relation(house,
+        theirs) if reverse. Built on first use and kept."""
+        key = (j, relation, reverse, house)
+        if key not in self.relation_masks:
+            test = RELATIONS[relation]
+            n = self.puzzle.houses
+            self.relation_masks[key] = sum_masks(
+                self.at[j][h] for h in range(1, n + 1)
+                if (test(house, h) if reverse else test(h, house)))
+        return self.relation_masks[key]
+
+    def order(self):
+        """Return the groups in search order: each time the group with the
+        most links to the groups already placed, fewest candidates first
+        among equals."""
+        remaining = list(range(len(self.puzzle.groups)))
+        order = []
+        while remaining:
+            g = min(remaining, key=lambda g: (
+                -sum(other in order for other, _, _, _, _ in self.links[g]),
+                bin(self.candidates[g]).count('1')))
+            order.append(g)
+            remaining.remove(g)
+        return order
+
+
+def sum_masks(masks):
+    "OR together a sequence of bitsets."
+    result = 0
+    for mask in masks:
+        result |= mask
+    return result
+
+
+def solutions(puzzle, first=None, stats=None):
+    """Generate every solution of the puzzle as a dict {attribute: house}.
+    first, if given, restricts the permutations tried for the first group
+    in search order. stats works as in csp.solutions."""
+    tables = Tables(puzzle)
+    order = tables.order()
+    if first is not None:
+        tables.candidates[order[0]] &= first
+    if stats is not None:
+        stats.setdefault('nodes', 0)
+        stats.setdefault('levels', [])
+    chosen = {}
+    for assignment in search(tables, order, chosen, stats):
+        yield {a: tables.perms[assignment[g]][j]
+               for g, group in enumerate(puzzle.groups)
+               for j, a in enumerate(group)}
+
+
+def search(tables, order, chosen, stats, depth=0):
+    "Depth-first search over the groups in order, one permutation each."
+    if depth == len(order):
+        yield dict(chosen)
+        return
+    g = order[depth]
+    mask = tables.candidates[g]
+    for other, j, j_other, relation, reverse in tables.links[g]:
+        if other in chosen:
+            house = tables.perms[chosen[other]][j_other]
+            mask &= tables.compatible(j, relation, reverse, house)
+    for k in bits(mask):
+        if stats is not None:
+            stats['nodes'] += 1
+            levels = stats['levels']
+            if len(levels) <= depth:
+                levels.append(0)
+            levels[depth] += 1
+        chosen[g] = k
+        for solution in search(tables, order, chosen, stats, depth + 1):
+            yield solution
+        del chosen[g]
+
+
+def solve(puzzle):
+    "Return the first solution of the puzzle, or None if there is none."
+    return next(solutions(puzzle), None)
+
+
+def split(puzzle, parts):
+    """Split the first group's candidate permutations into up to parts
+    bitsets of about the same size."""
+    tables = Tables(puzzle)
+    indices = list(bits(tables.candidates[tables.order()[0]]))
+    size = max(1, -(-len(indices) // parts))
+    return [sum_masks(1 << k for k in indices[start:start + size])
+            for start in range(0, len(indices), size)]
+
+
+def chunk_solutions(puzzle, first):
+    "Return the list of solutions whose first group is in first."
+    return list(solutions(puzzle, first))
+
+
+def chunk_count(puzzle, first):
+    "Return the number of solutions whose first group is in first."
+    return sum(1 for _ in solutions(puzzle, first))
+
+
+def run_chunks(fn, puzzle, workers):
+    "Map fn(puzzle, chunk) over the first-group chunks in a process pool."
+    if workers == 1:
+        return [fn(puzzle, None)]
+    chunks = split(puzzle, 4 * (workers or os.cpu_count() or 1))
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(fn, [puzzle] * len(chunks), chunks))
+
+
+def count_solutions(puzzle, workers=None):
+    "Return the number of solutions, counted across a process pool."
+    return sum(run_chunks(chunk_count, puzzle, workers))
+
+
+def all_solutions(puzzle, workers=None):
+    "Return the list of every solution, found across a process pool."
+    return [s for chunk in run_chunks(chunk_solutions, puzzle, workers)
+            for s in chunk]
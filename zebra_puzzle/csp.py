@@ -0,0 +1,167 @@
+'''Constraint propagation solver for zebra-style puzzles.
+
+A puzzle is declared as groups of attributes plus constraints between
+them. Every group (colours, nationalities, drinks, ...) is a permutation
+of the houses: each attribute lives in exactly one house and no two
+attributes of a group share a house. Constraints are tuples:
+
+    ('same', a, b)      a and b are in the same house
+    ('imright', a, b)   a is immediately right of b
+    ('nextto', a, b)    a and b are next to each other
+    ('at', a, house)    a is in the given house (1-based)
+
+The solver keeps a domain of possible houses per attribute, makes every
+constraint arc-consistent, assigns a house to any attribute that is the
+only one of its group left for that house, and searches with the most
+constrained attribute first, propagating again after each choice.
+'''
+import itertools
+import random
+from collections import namedtuple
+
+Puzzle = namedtuple('Puzzle', 'houses groups constraints')
+
+
+def same(h1, h2):
+    "Two attributes are in the same house."
+    return h1 == h2
+
+
+def imright(h1, h2):
+    "House h1 is immediately right of h2 if h1-h2 == 1."
+    return h1 - h2 == 1
+
+
+def nextto(h1, h2):
+    "Two houses are next to each other if they differ by 1."
+    return abs(h1 - h2) == 1
+
+
+RELATIONS = {'same': same, 'imright': imright, 'nextto': nextto}
+
+
+def arcs(puzzle):
+    """Return {attribute: [(other, test)]} where test(h, h_other) says
+    whether the two houses are compatible; group members must differ."""
+    result = {a: [] for group in puzzle.groups for a in group}
+    for group in puzzle.groups:
+        for a in group:
+            result[a] += [(b, lambda h1, h2: h1 != h2)
+                          for b in group if b != a]
+    for relation, a, b in puzzle.constraints:
+        if relation == 'at':
+            continue
+        test = RELATIONS[relation]
+        result[a].append((b, test))
+        result[b].append((a, lambda h1, h2, test=test: test(h2, h1)))
+    return result
+
+
+def initial_domains(puzzle):
+    "Return the domain of every attribute after the 'at' constraints."
+    domains = {a: set(range(1, puzzle.houses + 1))
+               for group in puzzle.groups for a in group}
+    for relation, a, house in puzzle.constraints:
+        if relation == 'at':
+            domains[a] &= {house}
+    return domains
+
+
+def propagate(domains, neighbours, groups, queue):
+    """Make the domains arc-consistent, starting from the attributes in
+    queue, and fill in houses that only one attribute of a group can
+    take. Changes domains in place; return False on a contradiction."""
+    queue = list(queue)
+    while queue:
+        a = queue.pop()
+        for b, test in neighbours[a]:
+            supported = {hb for hb in domains[b]
+                         if any(test(ha, hb) for ha in domains[a])}
+            if supported != domains[b]:
+                if not supported:
+                    return False
+                domains[b] = supported
+                queue.append(b)
+        if not queue:
+            for group in groups:
+                houses = set().union(*[domains[x] for x in group])
+                if len(houses) < len(group):
+                    return False
+                for house in houses:
+                    holders = [x for x in group if house in domains[x]]
+                    if len(holders) == 1 and len(domains[holders[0]]) > 1:
+                        domains[holders[0]] = {house}
+                        queue.append(holders[0])
+    return True
+
+
+def solutions(puzzle, stats=None):
+    """Generate every solution of the puzzle as a dict {attribute: house}.
+    If stats is a dict, stats['levels'] counts the search nodes visited
+    at each depth and stats['nodes'] their total."""
+    neighbours = arcs(puzzle)
+    domains = initial_domains(puzzle)
+    if stats is not None:
+        stats.setdefault('nodes', 0)
+        stats.setdefault('levels', [])
+    if propagate(domains, neighbours, puzzle.groups, list(domains)):
+        for solution in search(domains, neighbours, puzzle.groups, stats, 0):
+            yield solution
+
+
+def search(domains, neighbours, groups, stats, depth):
+    "Depth-first search, most constrained attribute first."
+    if stats is not None:
+        stats['nodes'] += 1
+        levels = stats['levels']
+        if len(levels) <= depth:
+            levels.append(0)
+        levels[depth] += 1
+    open_attributes = [a for a in domains if len(domains[a]) > 1]
+    if not open_attributes:
+        yield {a: min(houses) for a, houses in domains.items()}
+        return
+    a = min(open_attributes,
+            key=lambda x: (len(domains[x]), -len(neighbours[x])))
+    for house in sorted(domains[a]):
+        child = {x: set(houses) for x, houses in domains.items()}
+        child[a] = {house}
+        if propagate(child, neighbours, groups, [a]):
+            for solution in search(child, neighbours, groups, stats,
+                                   depth + 1):
+                yield solution
+
+
+def solve(puzzle, stats=None):
+    "Return the first solution of the puzzle, or None if there is none."
+    return next(solutions(puzzle, stats), None)
+
+
+def generate(houses, groups, seed=None):
+    """Return a random Puzzle with the given number of houses and groups
+    of attributes (named 'A1', 'A2', ... 'B1', ...) together with its
+    hidden solution. Clues that hold in the solution are added until the
+    solution is unique."""
+    rng = random.Random(seed)
+    names = [[chr(ord('A') + g) + str(i + 1) for i in range(houses)]
+             for g in range(groups)]
+    solution = {}
+    for group in names:
+        for a, house in zip(group, rng.sample(range(1, houses + 1), houses)):
+            solution[a] = house
+    attributes = sorted(solution)
+    constraints = []
+    while True:
+        puzzle = Puzzle(houses, names, list(constraints))
+        if len(list(itertools.islice(solutions(puzzle), 2))) == 1:
+            return puzzle, solution
+        a, b = rng.sample(attributes, 2)
+        if solution[a] < solution[b]:
+            a, b = b, a
+        distance = solution[a] - solution[b]
+        if distance == 0:
+            constraints.append(('same', a, b))
+        elif distance == 1:
+            constraints.append((rng.choice(['imright', 'nextto']), a, b))
+        elif rng.random() < 0.25:
+            constraints.append(('at', a, solution[a]))
@@ -8,15 +8,8 @@
 import time
 import itertools
 
-
-def imright(h1, h2):
-    "House h1 is immediately right of h2 if h1-h2 == 1."
-    return h1 - h2 == 1
-
-
-def nextto(h1, h2):
-    "Two houses are next to each other if they differ by 1."
-    return abs(h1 - h2) == 1
+import csp
+from csp import imright, nextto  # noqa
 
 
 def zebra_puzzle():
@@ -47,11 +40,41 @@ def zebra_puzzle():
     )
 
 
+ZEBRA = csp.Puzzle(5, [
+    ['red', 'green', 'ivory', 'yellow', 'blue'],
+    ['Englishman', 'Spaniard', 'Ukranian', 'Japanese', 'Norwegian'],
+    ['coffee', 'tea', 'milk', 'oj', 'WATER'],
+    ['OldGold', 'Kools', 'Chesterfields', 'LuckyStrike', 'Parliaments'],
+    ['dog', 'snails', 'fox', 'horse', 'ZEBRA'],
+], [
+    ('same', 'Englishman', 'red'),
+    ('same', 'Spaniard', 'dog'),
+    ('same', 'coffee', 'green'),
+    ('same', 'Ukranian', 'tea'),
+    ('imright', 'green', 'ivory'),
+    ('same', 'OldGold', 'snails'),
+    ('same', 'Kools', 'yellow'),
+    ('at', 'milk', 3),
+    ('at', 'Norwegian', 1),
+    ('nextto', 'Chesterfields', 'fox'),
+    ('nextto', 'Kools', 'horse'),
+    ('same', 'LuckyStrike', 'oj'),
+    ('same', 'Japanese', 'Parliaments'),
+    ('nextto', 'Norwegian', 'blue'),
+])
+
+
+def zebra_puzzle_csp(stats=None):
+    "Return a tuple (WATER, ZEBRA) solved by constraint propagation."
+    solution = csp.solve(ZEBRA, stats)
+    return solution['WATER'], solution['ZEBRA']
+
+
 def timedcall(fn, *args):
     "Call function with args; return the time in seconds and result."
-    t0 = time.clock()
+    t0 = time.perf_counter()
     result = fn(*args)
-    t1 = time.clock()
+    t1 = time.perf_counter()
     return t1 - t0, result
 
 
@@ -67,10 +90,11 @@ def timedcalls(n, fn, *args):
     if type(n) is int:
         times = [timedcall(fn, *args)[0] for i in range(n)]
     else:
-        t0 = time.clock()
-        while time.clock() - t0 <= t0:
+        t0 = time.perf_counter()
+        while time.perf_counter() - t0 <= n:
             times.append(timedcall(fn, *args)[0])
     return min(times), average(times), max(times)
 
-print(timedcalls(10, zebra_puzzle))
-print(timedcalls(10.2, zebra_puzzle))
+if __name__ == '__main__':
+    print(timedcalls(10, zebra_puzzle))
+    print(timedcalls(10.2, zebra_puzzle))
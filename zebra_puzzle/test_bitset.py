@@ -0,0 +1,47 @@
+import unittest
+import bitset
+import csp
+import puzzle
+
+
+class TestBitsetSolver(unittest.TestCase):
+    '''Test the permutation-bitset solver against csp.'''
+
+    def test_zebra(self):
+        '''Test the zebra puzzle solution'''
+        solution = bitset.solve(puzzle.ZEBRA)
+        self.assertEqual((solution['WATER'], solution['ZEBRA']),
+                         puzzle.zebra_puzzle())
+
+    def test_all_solutions_match_csp(self):
+        '''Test every solution of an under-constrained puzzle'''
+        p = csp.Puzzle(5, puzzle.ZEBRA.groups, puzzle.ZEBRA.constraints[:-3])
+        found = bitset.all_solutions(p, workers=1)
+        expected = list(csp.solutions(p))
+        self.assertEqual(len(found), len(expected))
+        key = lambda s: sorted(s.items())  # noqa
+        self.assertEqual(sorted(map(key, found)), sorted(map(key, expected)))
+
+    def test_count_in_processes(self):
+        '''Test counting across worker processes'''
+        p = csp.Puzzle(5, puzzle.ZEBRA.groups, puzzle.ZEBRA.constraints[:-3])
+        self.assertEqual(bitset.count_solutions(p, workers=2),
+                         bitset.count_solutions(p, workers=1))
+
+    def test_generated_puzzle(self):
+        '''Test a generated 7 house puzzle is unique'''
+        p, solution = csp.generate(7, 4, seed=3)
+        self.assertEqual(bitset.all_solutions(p, workers=1), [solution])
+
+    def test_split(self):
+        '''Test the chunks partition the first group's candidates'''
+        chunks = bitset.split(puzzle.ZEBRA, 3)
+        tables = bitset.Tables(puzzle.ZEBRA)
+        self.assertEqual(bitset.sum_masks(chunks),
+                         tables.candidates[tables.order()[0]])
+        self.assertEqual(sum(bin(c).count('1') for c in chunks),
+                         bin(bitset.sum_masks(chunks)).count('1'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+import csp
+import puzzle
+
+
+class TestZebraPuzzle(unittest.TestCase):
+    '''Test the declarative zebra puzzle.'''
+
+    def test_solution(self):
+        '''Test the solver agrees with the generator expression'''
+        self.assertEqual(puzzle.zebra_puzzle_csp(), puzzle.zebra_puzzle())
+
+    def test_unique(self):
+        '''Test the puzzle has exactly one solution'''
+        self.assertEqual(len(list(csp.solutions(puzzle.ZEBRA))), 1)
+
+    def test_few_nodes(self):
+        '''Test propagation leaves only a handful of search nodes'''
+        stats = {}
+        csp.solve(puzzle.ZEBRA, stats)
+        self.assertLess(stats['nodes'], 20)
+        self.assertEqual(sum(stats['levels']), stats['nodes'])
+
+
+class TestSolver(unittest.TestCase):
+    '''Test the solver on small and generated puzzles.'''
+
+    def test_unsatisfiable(self):
+        '''Test contradicting clues give no solution'''
+        p = csp.Puzzle(3, [['a', 'b', 'c'], ['x', 'y', 'z']],
+                       [('at', 'a', 1), ('same', 'a', 'x'), ('at', 'x', 2)])
+        self.assertIsNone(csp.solve(p))
+
+    def test_all_solutions(self):
+        '''Test an unconstrained puzzle has every permutation'''
+        p = csp.Puzzle(3, [['a', 'b', 'c']], [])
+        self.assertEqual(len(list(csp.solutions(p))), 6)
+
+    def test_generated_puzzles(self):
+        '''Test 6 and 7 house puzzles are solved'''
+        for houses in (6, 7):
+            p, solution = csp.generate(houses, 5, seed=houses)
+            self.assertEqual(csp.solve(p), solution)
+
+
+if __name__ == '__main__':
+    unittest.main()